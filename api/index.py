@@ -1,25 +1,46 @@
-from flask import Flask, render_template, request, jsonify
-import random
+from flask import Flask, Response, render_template, request, jsonify
+import functools
 import hashlib
+import json
 import secrets
 import os
+import sys
+import time
 from datetime import datetime, date
-from dotenv import load_dotenv
 
-# Load environment variables from .env file (for local development)
-load_dotenv()
+# Make the shared zkp package importable from the serverless function
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zkp import fs_verify, get_params, parse_int
+from zkp.admission import Overloaded, admission_controller
+from zkp.executor import ExecutorBusy, JobTimeout, run_job
+from zkp.handshake import TokenError, finish_handshake, handshake_key, issue_challenge
+from zkp.membership import MODES as MEMBERSHIP_MODES, MemberList, member_tree, membership_proof_steps, or_proof_steps
+from zkp.metrics import (ADMISSION_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS, PHASE_SECONDS, PROOFS,
+                         REGISTRY, REQUEST_SECONDS, ROUNDS)
+from zkp.range_proof import MODES as RANGE_PROOF_MODES, range_proof_steps
+from zkp.registry import UserExists, derive_secret, user_registry
+from zkp.replay import replay_guard
+from zkp.sigma import PASSWORD_ROUND_FIELDS, SigmaProtocol
+from zkp.steps import VERBOSE_MESSAGES, Step, drain_steps, new_summary, render_steps
+
+# Load environment variables from .env file (for local development; Vercel injects them,
+# so a cold start skips importing python-dotenv and searching for the file)
+if not os.environ.get('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# An instance is frozen between invocations, so a background commitment pool would
+# only compete with the request that started it
+os.environ.setdefault('ZKP_COMMITMENT_POOL', '0')
 
 app = Flask(__name__, template_folder='../templates')
 app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(16))
 
-# Shared parameters (large prime p, generator g, modulus q = p-1)
-p = 10007  # Larger prime for demo (real-world: 2048-bit)
-g = 5  # Generator
-q = p - 1
-
 # Demo configurations
 DEMO_CONFIGS = {
     'password': {
+        'username': "demo",
         'registered_password': "SecurePassword123",
         'description': "Prove you know a password without revealing it"
     },
@@ -31,339 +52,159 @@ DEMO_CONFIGS = {
         'min_value': 1000,
         'max_value': 5000,
         'secret_number': 3500,
+        'mode': 'bulletproof',
         'description': "Prove a number is in range [1000, 5000] without revealing it"
     },
     'membership': {
-        'group_members': ["Alice", "Bob", "Charlie", "Diana", "Eve"],
+        'group_members': MemberList(["Alice", "Bob", "Charlie", "Diana", "Eve"]),
         'secret_member': "Charlie",
-        'description': "Prove you're in a group without revealing which member you are"
+        'mode': 'merkle',
+        'description': "Prove you're in a group; the OR-proof mode also hides which member you are"
     }
 }
 
 
-def hash_to_int(password):
-    """
-    Hash password to an integer secret using SHA-256.
-    Converts string password to a numerical secret for ZKP math.
-    """
-    hash_obj = hashlib.sha256(password.encode())
-    return int(hash_obj.hexdigest(), 16) % q
-
-
-def zkp_password_auth(client_password, server_public_key, rounds=3):
-    """ZKP password authentication using Schnorr protocol"""
-    secret = hash_to_int(client_password)
-    steps = []
-    
-    steps.append({
-        'type': 'info',
-        'message': f'🔧 Public parameters: p={p}, g={g}, q={q}'
-    })
-    steps.append({
-        'type': 'info', 
-        'message': f'🔑 Server public key: {server_public_key}'
-    })
+# Registered users' salts and public keys; passwords and secrets are never stored
+users = user_registry()
 
-    for round_num in range(1, rounds + 1):
-        steps.append({
-            'type': 'round',
-            'round': round_num,
-            'message': f'🔄 Round {round_num} - Schnorr Protocol'
-        })
 
-        k = random.randint(1, q - 1)
-        t = pow(g, k, p)
-        steps.append({
-            'type': 'step',
-            'message': f'📤 Client commitment: t = {g}^{k} mod {p} = {t}'
-        })
+def collect_steps(step_iter):
+    """Drain a step generator into (success, formatted step dicts)"""
+    success, steps, _ = drain_steps(step_iter)
+    return success, steps
 
-        e = random.randint(1, q - 1)
-        steps.append({
-            'type': 'step',
-            'message': f'🎯 Server challenge: e = {e}'
-        })
 
-        s = (k + e * secret) % q
-        steps.append({
-            'type': 'step',
-            'message': f'📥 Client response: s = (k + e * secret) mod {q} = {s}'
-        })
+def zkp_password_auth_steps(client_password, user, rounds=3, params=None):
+    """ZKP password authentication using Schnorr protocol, yielding each step as it is computed"""
+    protocol = SigmaProtocol('password', params, rounds, fields=PASSWORD_ROUND_FIELDS)
+    
+    yield Step('info', 'params', protocol.params.summary())
+    yield Step('info', 'password.user', user.username, user.kdf)
+    yield Step('info', 'password.public_key', user.public_key)
 
-        left = pow(g, s, p)
-        right = (t * pow(server_public_key, e, p)) % p
-        steps.append({
-            'type': 'verification',
-            'message': f'✅ Verification: {g}^{s} mod {p} = {left}'
-        })
-        steps.append({
-            'type': 'verification',
-            'message': f'🎯 Expected: t * (public_key)^{e} mod {p} = {right}'
-        })
+    # The client's side: stretch the password with the salt the server stored
+    secret = derive_secret(client_password, user.salt, protocol.params, user.kdf)
+    return (yield from protocol.steps(user.public_key, secret))
 
-        if left != right:
-            steps.append({
-                'type': 'error',
-                'message': f'❌ Round {round_num} FAILED!'
-            })
-            return False, steps
-        else:
-            steps.append({
-                'type': 'success',
-                'message': f'✅ Round {round_num} SUCCESS!'
-            })
 
-    return True, steps
+def zkp_password_auth(client_password, user, rounds=3, params=None):
+    """ZKP password authentication using Schnorr protocol"""
+    return collect_steps(zkp_password_auth_steps(client_password, user, rounds, params))
 
 
-def zkp_age_verification(birth_year, min_age=18, rounds=3):
-    """Prove age >= min_age without revealing exact age"""
+def zkp_age_verification_steps(birth_year, min_age=18, rounds=3, params=None):
+    """Prove age >= min_age without revealing exact age, yielding each step as it is computed"""
+    protocol = SigmaProtocol('age', params, rounds, passed_values=(min_age,))
     current_year = datetime.now().year
     actual_age = current_year - birth_year
-    steps = []
     
-    steps.append({
-        'type': 'info',
-        'message': f'🎂 Age Verification: Proving age >= {min_age} without revealing exact age'
-    })
+    yield Step('info', 'age.intro', min_age)
     
     if actual_age < min_age:
-        steps.append({
-            'type': 'error',
-            'message': f'❌ Age verification failed: You must be at least {min_age} years old'
-        })
-        return False, steps
+        yield Step('error', 'age.too_young', min_age)
+        return False
     
     # Simplified ZKP for age (in practice, would use more complex range proofs)
     secret = actual_age - min_age  # How many years over minimum
-    public_commitment = pow(g, secret, p)
-    
-    steps.append({
-        'type': 'info',
-        'message': f'🔐 Age commitment generated (hiding exact age)'
-    })
+    public_commitment = protocol.statement(secret)
     
-    for round_num in range(1, rounds + 1):
-        steps.append({
-            'type': 'round',
-            'round': round_num,
-            'message': f'🔄 Round {round_num} - Age Range Proof'
-        })
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        
-        steps.append({
-            'type': 'step',
-            'message': f'📤 Prover commitment: C = g^r mod p = {commitment}'
-        })
-        
-        challenge = random.randint(1, q - 1)
-        steps.append({
-            'type': 'step',
-            'message': f'🎯 Verifier challenge: e = {challenge}'
-        })
-        
-        response = (r + challenge * secret) % q
-        steps.append({
-            'type': 'step',
-            'message': f'📥 Prover response: s = (r + e * age_proof) mod q = {response}'
-        })
-        
-        # Verification
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        
-        steps.append({
-            'type': 'verification',
-            'message': f'✅ Verification: g^s = {left}, C * commitment^e = {right}'
-        })
-        
-        if left == right:
-            steps.append({
-                'type': 'success',
-                'message': f'✅ Round {round_num} SUCCESS! Age >= {min_age} verified'
-            })
-        else:
-            steps.append({
-                'type': 'error',
-                'message': f'❌ Round {round_num} FAILED!'
-            })
-            return False, steps
+    yield Step('info', 'age.committed')
     
-    return True, steps
+    return (yield from protocol.steps(public_commitment, secret))
 
 
-def zkp_range_proof(claimed_number, min_val, max_val, secret_number, rounds=3):
-    """Prove a number is in range [min_val, max_val] without revealing it"""
-    steps = []
+def zkp_age_verification(birth_year, min_age=18, rounds=3, params=None):
+    """Prove age >= min_age without revealing exact age"""
+    return collect_steps(zkp_age_verification_steps(birth_year, min_age, rounds, params))
+
+
+def zkp_range_proof_steps(claimed_number, min_val, max_val, secret_number, params=None, mode='bulletproof'):
+    """Prove a number is in range [min_val, max_val] without revealing it, yielding each step as it is computed"""
+    params = get_params(params)
     
-    steps.append({
-        'type': 'info',
-        'message': f'📊 Range Proof: Proving number ∈ [{min_val}, {max_val}] without revealing it'
-    })
+    yield Step('info', 'range.intro', min_val, max_val)
     
     if claimed_number != secret_number:
-        steps.append({
-            'type': 'error',
-            'message': f'❌ Invalid number provided'
-        })
-        return False, steps
+        yield Step('error', 'range.invalid_number')
+        return False
     
     if not (min_val <= secret_number <= max_val):
-        steps.append({
-            'type': 'error',
-            'message': f'❌ Number not in valid range [{min_val}, {max_val}]'
-        })
-        return False, steps
+        yield Step('error', 'range.out_of_range', min_val, max_val)
+        return False
     
-    # Simplified range proof using commitment scheme
-    secret = secret_number - min_val  # Normalize to [0, max_val - min_val]
-    public_commitment = pow(g, secret, p)
-    
-    steps.append({
-        'type': 'info',
-        'message': f'🔐 Range commitment generated for number in [{min_val}, {max_val}]'
-    })
+    if not params.prime_order:
+        yield Step('error', 'range.unsupported_group', params.name)
+        return False
     
-    for round_num in range(1, rounds + 1):
-        steps.append({
-            'type': 'round',
-            'round': round_num,
-            'message': f'🔄 Round {round_num} - Range Proof Protocol'
-        })
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        
-        steps.append({
-            'type': 'step',
-            'message': f'📤 Commitment: C = g^r mod p = {commitment}'
-        })
-        
-        challenge = random.randint(1, q - 1)
-        steps.append({
-            'type': 'step',
-            'message': f'🎯 Challenge: e = {challenge}'
-        })
-        
-        response = (r + challenge * secret) % q
-        steps.append({
-            'type': 'step',
-            'message': f'📥 Response: s = (r + e * normalized_value) mod q = {response}'
-        })
-        
-        # Verification
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        
-        steps.append({
-            'type': 'verification',
-            'message': f'✅ Verification: g^s = {left}, C * public_commitment^e = {right}'
-        })
-        
-        if left == right:
-            steps.append({
-                'type': 'success',
-                'message': f'✅ Round {round_num} SUCCESS! Number in range [{min_val}, {max_val}] verified'
-            })
-        else:
-            steps.append({
-                'type': 'error',
-                'message': f'❌ Round {round_num} FAILED!'
-            })
-            return False, steps
-    
-    return True, steps
+    # Pedersen commitment plus a non-interactive range proof; the verifier never sees the number
+    return (yield from range_proof_steps(secret_number, min_val, max_val, params, mode))
 
 
-def zkp_membership_proof(claimed_member, group_members, secret_member, rounds=3):
-    """Prove membership in a group without revealing which member"""
-    steps = []
+def zkp_range_proof(claimed_number, min_val, max_val, secret_number, params=None, mode='bulletproof'):
+    """Prove a number is in range [min_val, max_val] without revealing it"""
+    return collect_steps(zkp_range_proof_steps(claimed_number, min_val, max_val, secret_number, params, mode))
+
+
+def zkp_membership_proof_steps(claimed_member, group_members, secret_member, rounds=3, params=None, mode='merkle'):
+    """Prove membership in a group without revealing which member, yielding each step as it is computed"""
+    tree = member_tree(group_members, params)
     
-    steps.append({
-        'type': 'info',
-        'message': f'👥 Membership Proof: Proving membership in group {group_members} without revealing identity'
-    })
+    yield Step('info', 'membership.intro', len(tree))
     
     if claimed_member != secret_member:
-        steps.append({
-            'type': 'error',
-            'message': f'❌ Invalid member claim'
-        })
-        return False, steps
-    
-    if secret_member not in group_members:
-        steps.append({
-            'type': 'error',
-            'message': f'❌ Member not in group'
-        })
-        return False, steps
+        yield Step('error', 'membership.invalid_claim')
+        return False
     
-    # Use member index as secret
-    member_index = group_members.index(secret_member)
-    secret = member_index + 1  # Avoid zero
-    public_commitment = pow(g, secret, p)
+    if secret_member not in tree:
+        yield Step('error', 'membership.not_member')
+        return False
     
-    steps.append({
-        'type': 'info',
-        'message': f'🔐 Membership commitment generated (hiding specific identity)'
-    })
-    
-    for round_num in range(1, rounds + 1):
-        steps.append({
-            'type': 'round',
-            'round': round_num,
-            'message': f'🔄 Round {round_num} - Membership Proof Protocol'
-        })
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        
-        steps.append({
-            'type': 'step',
-            'message': f'📤 Commitment: C = g^r mod p = {commitment}'
-        })
-        
-        challenge = random.randint(1, q - 1)
-        steps.append({
-            'type': 'step',
-            'message': f'🎯 Challenge: e = {challenge}'
-        })
-        
-        response = (r + challenge * secret) % q
-        steps.append({
-            'type': 'step',
-            'message': f'📥 Response: s = (r + e * member_proof) mod q = {response}'
-        })
-        
-        # Verification
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        
-        steps.append({
-            'type': 'verification',
-            'message': f'✅ Verification: g^s = {left}, C * membership_commitment^e = {right}'
-        })
-        
-        if left == right:
-            steps.append({
-                'type': 'success',
-                'message': f'✅ Round {round_num} SUCCESS! Group membership verified'
-            })
-        else:
-            steps.append({
-                'type': 'error',
-                'message': f'❌ Round {round_num} FAILED!'
-            })
-            return False, steps
+    if mode == 'or':
+        # One-of-n proof over every member key; hides which key is ours
+        return (yield from or_proof_steps(secret_member, tree))
     
-    return True, steps
+    # Merkle path to the member's key plus a Schnorr proof of its secret
+    return (yield from membership_proof_steps(secret_member, tree, rounds))
+
+
+def zkp_membership_proof(claimed_member, group_members, secret_member, rounds=3, params=None, mode='merkle'):
+    """Prove membership in a group without revealing which member"""
+    return collect_steps(zkp_membership_proof_steps(claimed_member, group_members, secret_member, rounds, params, mode))
+
+
+def get_user(username, params):
+    """A registered user's record, or None; the demo account is registered on first use"""
+    record = users.lookup(username, params)
+    config = DEMO_CONFIGS['password']
+    if record is None and username == config['username']:
+        # A fixed salt gives every worker process the same demo key; its password is public anyway
+        salt = hashlib.sha256(f'zkp-demo/user/{username}'.encode()).digest()[:16]
+        try:
+            record = users.register(username, config['registered_password'], params, salt)
+        except UserExists:
+            record = users.lookup(username, params)
+    return record
+
 
+def statement_public_key(demo_type, data, params):
+    """The y a client proves knowledge of: a registered user's key for password, else sent with the proof"""
+    if demo_type == 'password':
+        user = get_user(data.get('username') or DEMO_CONFIGS['password']['username'], params)
+        if user is None:
+            raise DemoInputError('Unknown user')
+        return user.public_key
 
-# Calculate server public key for password auth
-server_secret = hash_to_int(DEMO_CONFIGS['password']['registered_password'])
-server_public_key = pow(g, server_secret, p)
+    if data.get('public_key') is None:
+        raise DemoInputError('Public key is required')
+    public_key = params.from_wire(data['public_key'])
+    if not params.contains(public_key):
+        raise DemoInputError('Public key is not an element of the group')
+    return public_key
+
+
+def proof_context(demo_type, data):
+    """Bind non-interactive proofs to the demo and an optional client context"""
+    return f'zkp/{demo_type}:{data.get("context", "")}'
 
 
 @app.route('/')
@@ -371,86 +212,524 @@ def index():
     return render_template('index.html', demos=DEMO_CONFIGS)
 
 
+class DemoInputError(Exception):
+    """A demo request is missing its input or names an unknown demo"""
+
+
+def text_field(data, name, label, default=None):
+    """A string field of a demo request; DemoInputError if it is missing (without a default) or not a string"""
+    value = data.get(name) or default
+    if not value:
+        raise DemoInputError(f'{label} is required')
+    if not isinstance(value, str):
+        raise DemoInputError(f'{label} must be a string')
+    return value
+
+
+def integer_field(data, name, label):
+    """An integer field of a demo request, sent as a number or a numeric string"""
+    value = data.get(name)
+    if value is None or value == '':
+        raise DemoInputError(f'{label} is required')
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise DemoInputError(f'{label} must be an integer')
+    try:
+        return int(value)
+    except ValueError:
+        raise DemoInputError(f'{label} must be an integer') from None
+
+
+def prepare_demo(demo_type, data, params):
+    """
+    Validate a demo request and set up its protocol run.
+    Returns (step generator, success message, failure message); nothing is
+    computed until the generator is iterated.
+    """
+    if demo_type == 'password':
+        client_password = text_field(data, 'password', 'Password')
+        username = text_field(data, 'username', 'Username', DEMO_CONFIGS['password']['username'])
+        user = get_user(username, params)
+        if user is None:
+            raise DemoInputError(f'Unknown user: {username}')
+
+        steps = zkp_password_auth_steps(client_password, user, params=params)
+        return (steps,
+                'Password authentication SUCCESS! You proved you know the password.',
+                'Password authentication FAILED! Proof invalid.')
+
+    if demo_type == 'age':
+        birth_year = integer_field(data, 'birth_year', 'Birth year')
+        min_age = DEMO_CONFIGS['age']['min_age']
+        steps = zkp_age_verification_steps(birth_year, min_age, params=params)
+        return (steps,
+                f'Age verification SUCCESS! You proved you are over {min_age}.',
+                'Age verification FAILED!')
+
+    if demo_type == 'range':
+        number = integer_field(data, 'number', 'Number')
+        config = DEMO_CONFIGS['range']
+        mode = data.get('mode', config['mode'])
+        if mode not in RANGE_PROOF_MODES:
+            raise DemoInputError(f'Range proof mode must be one of: {", ".join(RANGE_PROOF_MODES)}')
+        steps = zkp_range_proof_steps(number, config['min_value'], config['max_value'], config['secret_number'], params, mode)
+        return (steps,
+                f'Range proof SUCCESS! Number is in [{config["min_value"]}, {config["max_value"]}].',
+                'Range proof FAILED!')
+
+    if demo_type == 'membership':
+        member = text_field(data, 'member', 'Member name')
+        config = DEMO_CONFIGS['membership']
+        mode = data.get('mode', config['mode'])
+        if mode not in MEMBERSHIP_MODES:
+            raise DemoInputError(f'Membership proof mode must be one of: {", ".join(MEMBERSHIP_MODES)}')
+        steps = zkp_membership_proof_steps(member, config['group_members'], config['secret_member'], params=params, mode=mode)
+        return (steps,
+                'Membership proof SUCCESS! You are a valid group member.',
+                'Membership proof FAILED!')
+
+    raise DemoInputError('Invalid demo type')
+
+
+def metrics_label(demo_type):
+    """Demo label for metrics; unknown demo types share one label to bound cardinality"""
+    return demo_type if demo_type in DEMO_CONFIGS else 'invalid'
+
+
+def record_request(demo, endpoint, outcome, timings, started):
+    """Record one finished request in the /metrics counters and histograms"""
+    for phase, seconds in timings.items():
+        PHASE_SECONDS.inc(demo, phase, amount=seconds)
+    PROOFS.inc(demo, endpoint, outcome)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, demo, endpoint)
+
+
+def trusted_proxies():
+    """How many reverse proxies in front of the app append to X-Forwarded-For (ZKP_TRUST_PROXY)"""
+    value = os.environ.get('ZKP_TRUST_PROXY', '').strip().lower()
+    if value in ('true', 'yes'):
+        return 1
+    return int(value) if value.isdigit() else 0
+
+
+def client_address():
+    """
+    The address rate limits are kept per. Behind n trusted proxies this is
+    the n-th X-Forwarded-For entry from the right, the one our outermost
+    proxy appended; entries left of it come from the client and could be
+    rotated to get a fresh token bucket per request.
+    """
+    proxies = trusted_proxies()
+    if proxies:
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if len(hops) >= proxies:
+            return hops[-proxies]
+    return request.remote_addr
+
+
+def admission_controlled(endpoint):
+    """
+    Run a CPU-heavy view (a /zkp demo, or /register with its scrypt) only if
+    admission control lets the request in, answering 429 with Retry-After
+    otherwise. The proof slot is held until the response is sent, or until
+    a streamed response is closed.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            started = time.perf_counter()
+            try:
+                slot = admission_controller().admit(client_address())
+            except Overloaded as e:
+                ADMISSION_REJECTED.inc(e.reason)
+                demo = metrics_label(kwargs['demo_type']) if 'demo_type' in kwargs else endpoint
+                record_request(demo, endpoint, 'throttled', {}, started)
+                response = jsonify({
+                    'success': False,
+                    'message': str(e),
+                    'steps': []
+                })
+                response.headers['Retry-After'] = e.retry_after_header
+                return response, 429
+
+            ADMISSION_WAIT_SECONDS.observe(slot.waited)
+            try:
+                response = view(**kwargs)
+            except BaseException:
+                slot.release()
+                raise
+            if isinstance(response, Response) and response.is_streamed:
+                response.call_on_close(slot.release)
+            else:
+                slot.release()
+            return response
+        return wrapper
+    return decorator
+
+
+def run_demo_job(demo_type, data, group, verbose):
+    """
+    Run one demo to completion. Called inline or in a worker process, so it
+    takes and returns only picklable values:
+    (group name, success, message, steps, summary, timings)
+    """
+    if group is not None and not isinstance(group, str):
+        raise DemoInputError('Group must be a parameter set name')
+    params = get_params(group)
+    timings = {}
+    step_iter, success_message, failure_message = prepare_demo(demo_type, data, params)
+    success, steps, summary = drain_steps(step_iter, verbose, timings)
+    message = success_message if success else failure_message
+    return params.name, success, message, steps, summary, timings
+
+
 @app.route('/zkp/<demo_type>', methods=['POST'])
+@admission_controlled('demo')
 def zkp_demo(demo_type):
+    started = time.perf_counter()
+    demo = metrics_label(demo_type)
+    timings = {}
+    outcome = 'error'
     data = request.get_json()
     
     try:
-        if demo_type == 'password':
-            client_password = data.get('password', '')
-            if not client_password:
-                return jsonify({
-                    'success': False,
-                    'message': 'Password is required',
-                    'steps': []
-                })
-            
-            success, steps = zkp_password_auth(client_password, server_public_key)
-            message = 'Password authentication SUCCESS! You proved you know the password.' if success else 'Password authentication FAILED! Proof invalid.'
-            
-        elif demo_type == 'age':
-            birth_year = data.get('birth_year')
-            if not birth_year:
-                return jsonify({
-                    'success': False,
-                    'message': 'Birth year is required',
-                    'steps': []
-                })
-            
-            success, steps = zkp_age_verification(int(birth_year), DEMO_CONFIGS['age']['min_age'])
-            message = f'Age verification SUCCESS! You proved you are over {DEMO_CONFIGS["age"]["min_age"]}.' if success else 'Age verification FAILED!'
-            
-        elif demo_type == 'range':
-            number = data.get('number')
-            if number is None:
-                return jsonify({
-                    'success': False,
-                    'message': 'Number is required',
-                    'steps': []
-                })
-            
-            config = DEMO_CONFIGS['range']
-            success, steps = zkp_range_proof(int(number), config['min_value'], config['max_value'], config['secret_number'])
-            message = f'Range proof SUCCESS! Number is in [{config["min_value"]}, {config["max_value"]}].' if success else 'Range proof FAILED!'
-            
-        elif demo_type == 'membership':
-            member = data.get('member', '')
-            if not member:
-                return jsonify({
-                    'success': False,
-                    'message': 'Member name is required',
-                    'steps': []
-                })
-            
-            config = DEMO_CONFIGS['membership']
-            success, steps = zkp_membership_proof(member, config['group_members'], config['secret_member'])
-            message = 'Membership proof SUCCESS! You are a valid group member.' if success else 'Membership proof FAILED!'
-            
-        else:
+        verbose = int(data.get('verbose', VERBOSE_MESSAGES))
+        group, success, message, steps, summary, job_timings = run_job(
+            run_demo_job, demo_type, data, data.get('group'), verbose)
+        timings.update(job_timings)
+        outcome = 'success' if success else 'failure'
+        ROUNDS.inc(demo, amount=summary['rounds'])
+
+        result = {
+            'success': success,
+            'message': message,
+            'group': group,
+            'summary': summary
+        }
+        if verbose:
+            result['steps'] = steps
+
+        start = time.perf_counter()
+        response = jsonify(result)
+        timings['serialize'] = time.perf_counter() - start
+        return response
+
+    except DemoInputError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'steps': []
+        })
+
+    except ExecutorBusy:
+        outcome = 'rejected'
+        response = jsonify({
+            'success': False,
+            'message': 'Server busy, please retry shortly',
+            'steps': []
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+
+    except JobTimeout as e:
+        outcome = 'timeout'
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}',
+            'steps': []
+        }), 504
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}',
+            'steps': []
+        })
+
+    finally:
+        record_request(demo, 'demo', outcome, timings, started)
+
+
+def sse_event(event, payload):
+    """Format one Server-Sent Events frame"""
+    return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+
+
+@app.route('/zkp/<demo_type>/stream', methods=['POST'])
+@admission_controlled('stream')
+def zkp_stream(demo_type):
+    """Run a demo and stream each protocol step as an SSE 'step' event, then a 'result' event"""
+    data = request.get_json()
+    demo = metrics_label(demo_type)
+
+    def generate():
+        started = time.perf_counter()
+        timings = {'serialize': 0.0}
+        outcome = 'error'
+        try:
+            params = get_params(data.get('group'))
+            verbose = int(data.get('verbose', VERBOSE_MESSAGES))
+            step_iter, success_message, failure_message = prepare_demo(demo_type, data, params)
+
+            summary = new_summary()
+            rendered = render_steps(step_iter, summary, verbose, timings)
+            while True:
+                try:
+                    step = next(rendered)
+                except StopIteration as stop:
+                    success = stop.value
+                    break
+                start = time.perf_counter()
+                event = sse_event('step', step)
+                timings['serialize'] += time.perf_counter() - start
+                yield event
+
+            outcome = 'success' if success else 'failure'
+            ROUNDS.inc(demo, amount=summary['rounds'])
+            yield sse_event('result', {
+                'success': success,
+                'message': success_message if success else failure_message,
+                'group': params.name,
+                'summary': summary
+            })
+
+        except DemoInputError as e:
+            yield sse_event('result', {'success': False, 'message': str(e)})
+
+        except Exception as e:
+            yield sse_event('result', {'success': False, 'message': f'Error: {str(e)}'})
+
+        finally:
+            record_request(demo, 'stream', outcome, timings, started)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/zkp/<demo_type>/verify', methods=['POST'])
+@admission_controlled('verify')
+def zkp_verify(demo_type):
+    """Verify a non-interactive (Fiat-Shamir) proof with one equation"""
+    started = time.perf_counter()
+    timings = {}
+    outcome = 'error'
+    data = request.get_json()
+
+    try:
+        if demo_type not in DEMO_CONFIGS:
             return jsonify({
                 'success': False,
-                'message': 'Invalid demo type',
-                'steps': []
+                'message': 'Invalid demo type'
             })
-        
+
+        params = get_params(data.get('group'))
+        if data.get('commitment') is None or data.get('response') is None:
+            return jsonify({
+                'success': False,
+                'message': 'Proof commitment and response are required'
+            })
+        proof = (params.from_wire(data['commitment']), parse_int(data['response']))
+        public_key = statement_public_key(demo_type, data, params)
+
+        start = time.perf_counter()
+        success = fs_verify(public_key, proof, params, proof_context(demo_type, data))
+        timings['compute'] = time.perf_counter() - start
+        if success and not replay_guard().check_proof(params, f'{demo_type}.fs', public_key, proof[0]):
+            outcome = 'rejected'
+            return jsonify({
+                'success': False,
+                'message': 'Proof was already used',
+                'group': params.name
+            })
+        outcome = 'success' if success else 'failure'
         return jsonify({
             'success': success,
-            'message': message,
-            'steps': steps
+            'message': 'Proof VERIFIED!' if success else 'Proof INVALID!',
+            'group': params.name
         })
-        
+
+    except DemoInputError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Error: {str(e)}',
-            'steps': []
+            'message': f'Error: {str(e)}'
+        })
+
+    finally:
+        record_request(metrics_label(demo_type), 'verify', outcome, timings, started)
+
+
+@app.route('/zkp/<demo_type>/commit', methods=['POST'])
+@admission_controlled('commit')
+def zkp_commit(demo_type):
+    """First move of a networked Schnorr round: take t = g^k, return e and a signed token"""
+    started = time.perf_counter()
+    timings = {}
+    outcome = 'error'
+    data = request.get_json()
+
+    try:
+        if demo_type not in DEMO_CONFIGS:
+            raise DemoInputError('Invalid demo type')
+        params = get_params(data.get('group'))
+        if data.get('commitment') is None:
+            raise DemoInputError('Commitment is required')
+        commitment = params.from_wire(data['commitment'])
+        if not params.contains(commitment):
+            raise DemoInputError('Commitment is not an element of the group')
+        public_key = statement_public_key(demo_type, data, params)
+
+        start = time.perf_counter()
+        challenge, token, expires = issue_challenge(handshake_key(app.secret_key), demo_type, public_key,
+                                                    commitment, params, proof_context(demo_type, data))
+        timings['compute'] = time.perf_counter() - start
+        outcome = 'success'
+        return jsonify({
+            'success': True,
+            'challenge': hex(challenge),
+            'token': token,
+            'expires': expires,
+            'group': params.name
+        })
+
+    except DemoInputError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
         })
 
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        })
+
+    finally:
+        record_request(metrics_label(demo_type), 'commit', outcome, timings, started)
+
+
+@app.route('/zkp/<demo_type>/respond', methods=['POST'])
+@admission_controlled('respond')
+def zkp_respond(demo_type):
+    """Last move: check s against the challenge and commitment carried in the token"""
+    started = time.perf_counter()
+    timings = {}
+    outcome = 'error'
+    data = request.get_json()
+
+    try:
+        if data.get('token') is None or data.get('response') is None:
+            raise DemoInputError('Token and response are required')
+
+        start = time.perf_counter()
+        success, payload = finish_handshake(handshake_key(app.secret_key), demo_type, data['token'],
+                                            data['response'])
+        timings['compute'] = time.perf_counter() - start
+        outcome = 'success' if success else 'failure'
+        return jsonify({
+            'success': success,
+            'message': 'Proof VERIFIED!' if success else 'Proof INVALID!',
+            'group': payload['group']
+        })
+
+    except (DemoInputError, TokenError) as e:
+        outcome = 'rejected'
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        })
+
+    finally:
+        record_request(metrics_label(demo_type), 'respond', outcome, timings, started)
+
+
+@app.route('/register', methods=['POST'])
+@admission_controlled('register')
+def register():
+    """Register a user: derive their key with scrypt once and store only salt and public key"""
+    data = request.get_json(silent=True)
+    try:
+        if not isinstance(data, dict):
+            raise DemoInputError('Expected a JSON object with username and password')
+        username = text_field(data, 'username', 'Username')
+        password = text_field(data, 'password', 'Password')
+        group = data.get('group')
+        if group is not None and not isinstance(group, str):
+            raise DemoInputError('Group must be a parameter set name')
+    except DemoInputError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    try:
+        params = get_params(group)
+        record = users.register(username, password, params)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+    return jsonify({
+        'success': True,
+        'message': f'User {record.username} registered',
+        **user_json(record, params)
+    })
+
+
+@app.route('/users/<username>')
+def user_info(username):
+    """A user's salt, KDF settings and public key, for clients building their own proofs"""
+    try:
+        params = get_params(request.args.get('group'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    record = get_user(username, params)
+    if record is None:
+        return jsonify({
+            'success': False,
+            'message': 'Unknown user'
+        }), 404
+    return jsonify({'success': True, **user_json(record, params)})
+
+
+def user_json(record, params):
+    return {
+        'username': record.username,
+        'group': params.name,
+        'salt': record.salt.hex(),
+        'kdf': record.kdf,
+        'public_key': params.to_wire(record.public_key)
+    }
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of the in-process request metrics"""
+    running, waiting = admission_controller().depth()
+    ADMISSION_DEPTH.set(running, 'running')
+    ADMISSION_DEPTH.set(waiting, 'queued')
+    return Response(REGISTRY.render(), content_type=REGISTRY.CONTENT_TYPE)
+
 
 # Legacy endpoint for backward compatibility
 @app.route('/authenticate', methods=['POST'])
 def authenticate():
-    return zkp_demo('password')
+    return zkp_demo(demo_type='password')
 
 
 # Export the Flask app for Vercel
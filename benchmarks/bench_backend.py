@@ -0,0 +1,70 @@
+"""
+Arithmetic backends compared per parameter set.
+
+Usage:
+    python -m benchmarks.bench_backend [--iterations N] [--params NAME ...]
+
+Times a variable-base exponentiation, a fixed-base exponentiation from a
+table and one verification equation g^s * y^-e with every installed
+backend (built-in ints, and gmpy2 when it is importable).
+"""
+
+import argparse
+import time
+
+from zkp.backend import available_backends, get_backend
+from zkp.fixed_base import FixedBaseTable
+from zkp.multiexp import multi_exp
+from zkp.params import get_params
+
+
+BENCH_PARAMS = ('schnorr-2048', 'modp-2048', 'schnorr-3072', 'modp-3072')
+
+
+def _time_per_op(fn, inputs):
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - start) / len(inputs)
+
+
+def run(params, backend, iterations):
+    g, p, q = params.g, params.p, params.q
+    exponents = [params.random_scalar() for _ in range(iterations)]
+    y = params.base_exp(params.random_scalar())
+    table = FixedBaseTable(g, p, q, backend=backend)
+
+    assert backend.to_int(backend.powmod(y, exponents[0], p)) == pow(y, exponents[0], p)
+    assert table.pow(exponents[0]) == pow(g, exponents[0], p)
+
+    return {
+        'exp_ms': _time_per_op(lambda e: backend.powmod(y, e, p), exponents) * 1e3,
+        'base_exp_ms': _time_per_op(table.pow, exponents) * 1e3,
+        'verify_ms': _time_per_op(
+            lambda e: multi_exp([(table, e), (y, q - e)], p, backend=backend), exponents) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--params', nargs='+', default=list(BENCH_PARAMS))
+    args = parser.parse_args()
+
+    backends = [get_backend(name) for name in available_backends()]
+    if len(backends) == 1:
+        print('gmpy2 is not installed; only the built-in backend is measured')
+
+    print(f"{'params':<13} {'backend':<8} {'exp ms':>8} {'base_exp ms':>12} {'verify ms':>10} {'speedup':>8}")
+    for name in args.params:
+        params = get_params(name)
+        baseline = None
+        for backend in backends:
+            r = run(params, backend, args.iterations)
+            baseline = baseline or r
+            print(f"{params.name:<13} {backend.name:<8} {r['exp_ms']:>8.3f} {r['base_exp_ms']:>12.3f} "
+                  f"{r['verify_ms']:>10.3f} {baseline['verify_ms'] / r['verify_ms']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
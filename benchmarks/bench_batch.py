@@ -0,0 +1,62 @@
+"""
+Batch verification vs one-at-a-time verification of Schnorr transcripts.
+
+Usage:
+    python -m benchmarks.bench_batch [--params NAME] [--sizes N ...]
+"""
+
+import argparse
+import time
+
+from zkp.params import get_params
+from zkp.schnorr import batch_verify, verify_transcript
+
+
+def make_transcripts(params, count):
+    """Honest transcripts for distinct random key pairs."""
+    q = params.q
+    transcripts = []
+    for _ in range(count):
+        x = params.random_scalar()
+        k = params.random_scalar()
+        e = params.random_scalar()
+        transcripts.append((params.base_exp(x), params.base_exp(k), e, (k + e * x) % q))
+    return transcripts
+
+
+def run(params, count):
+    # Separate key sets, so neither path finds keys the other already tested
+    transcripts = make_transcripts(params, count)
+    start = time.perf_counter()
+    assert all(verify_transcript(t, params) for t in transcripts)
+    single = time.perf_counter() - start
+
+    transcripts = make_transcripts(params, count)
+    start = time.perf_counter()
+    assert batch_verify(transcripts, params) == (True, [])
+    batch = time.perf_counter() - start
+    return {
+        'params': params.name,
+        'count': count,
+        'single_ms': single * 1e3,
+        'batch_ms': batch * 1e3,
+        'speedup': single / batch,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', default='schnorr-2048')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    params = get_params(args.params)
+    print(f"{'params':<13} {'N':>6} {'single ms':>10} {'batch ms':>10} {'speedup':>8}")
+    for count in args.sizes:
+        r = run(params, count)
+        print(f"{r['params']:<13} {r['count']:>6} {r['single_ms']:>10.1f} "
+              f"{r['batch_ms']:>10.1f} {r['speedup']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Cold-start cost of the serverless entry point against a budget.
+
+Usage:
+    python -m benchmarks.bench_cold_start [--runs N] [--demo NAME] [--group NAME]
+                                          [--no-tables] [--top N] [--budget-ms MS]
+
+Starts a fresh interpreter per run, as a serverless platform does, and
+times each phase up to the first response of api/index.py: interpreter
+start, importing Flask, importing zkp, the rest of the app module, and
+the first and second /zkp/<demo> requests.  One more run under
+-X importtime breaks the import down by top-level package.  Exits with
+status 1 when the median time to first response exceeds --budget-ms, so
+it can gate a deployment.  --no-tables sets ZKP_TABLES=off to show what
+the build-time tables save.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_BUDGET_MS = 600
+
+# Request bodies that succeed with the demo defaults
+DEMO_BODIES = {
+    'password': {'password': 'SecurePassword123'},
+    'age': {'birth_year': 1990},
+    'range': {'number': 3500},
+    'membership': {'member': 'Charlie'},
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import flask
+flask_done = time.perf_counter()
+import zkp
+zkp_done = time.perf_counter()
+sys.path.insert(0, 'api')
+import index
+app_done = time.perf_counter()
+client = index.app.test_client()
+body = json.loads(sys.argv[2])
+response = client.post('/zkp/' + sys.argv[1], json=body)
+assert response.status_code == 200 and response.get_json()['success'], response.get_json()
+first_done = time.perf_counter()
+client.post('/zkp/' + sys.argv[1], json=body)
+second_done = time.perf_counter()
+print(json.dumps({'flask': flask_done - start, 'zkp': zkp_done - flask_done, 'app': app_done - zkp_done,
+                  'first_request': first_done - app_done, 'second_request': second_done - first_done,
+                  'in_process': first_done - start}))
+"""
+
+PHASES = ('interpreter', 'flask', 'zkp', 'app', 'first_request')
+
+
+def _child_env(tables):
+    env = dict(os.environ, VERCEL='1')
+    if not tables:
+        env['ZKP_TABLES'] = 'off'
+    return env
+
+
+def run_once(demo, body, env):
+    """Phase timings of one cold start, in seconds."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PROBE, demo, json.dumps(body)], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode:
+        sys.exit(f'Cold start run failed:\n{result.stderr}')
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    # Interpreter start and shutdown: everything the probe could not time itself
+    timings['interpreter'] = wall - timings['in_process'] - timings['second_request']
+    timings['total'] = timings['interpreter'] + timings['in_process']
+    return timings
+
+
+def import_breakdown(env, top):
+    """(package, self seconds) of the slowest top-level packages when importing the app."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             "import sys; sys.path.insert(0, 'api'); import index"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stderr
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: -item[1])
+    return [(name, us / 1e6) for name, us in ranked[:top]], sum(totals.values()) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--demo', choices=sorted(DEMO_BODIES), default='age')
+    parser.add_argument('--group', help='parameter set for the request (default: ZKP_PARAMS)')
+    parser.add_argument('--no-tables', action='store_true', help='ignore the build-time tables')
+    parser.add_argument('--top', type=int, default=12, help='packages in the import breakdown')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='fail if the median time to first response exceeds this')
+    args = parser.parse_args()
+
+    env = _child_env(not args.no_tables)
+    body = dict(DEMO_BODIES[args.demo], verbose=0)
+    if args.group:
+        body['group'] = args.group
+    runs = [run_once(args.demo, body, env) for _ in range(args.runs)]
+
+    print(f"Cold start of /zkp/{args.demo} ({args.runs} runs, tables "
+          f"{'off' if args.no_tables else 'on'}):")
+    print(f"{'phase':<16} {'median ms':>10} {'max ms':>8}")
+    for phase in PHASES + ('total', 'second_request'):
+        values = [r[phase] * 1000 for r in runs]
+        print(f"{phase:<16} {statistics.median(values):>10.1f} {max(values):>8.1f}")
+
+    packages, total = import_breakdown(env, args.top)
+    print(f"\nImport time by package (self time, {total * 1000:.1f} ms in all):")
+    for name, seconds in packages:
+        print(f"  {name:<24} {seconds * 1000:>7.1f} ms")
+
+    median = statistics.median(r['total'] for r in runs) * 1000
+    verdict = 'within' if median <= args.budget_ms else 'OVER'
+    print(f"\nTime to first response: {median:.1f} ms, {verdict} the {args.budget_ms:g} ms budget")
+    sys.exit(0 if median <= args.budget_ms else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Proof throughput inline vs on the process-pool executor.
+
+Usage:
+    python -m benchmarks.bench_executor [--params NAME] [--jobs N] [--workers N ...]
+
+Runs the same batch of password demos from several client threads, first
+inline on those threads (serialised by the GIL) and then through a
+ProofExecutor with each worker count.  Throughput should grow with the
+worker count up to the number of cores.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import DEMO_CONFIGS, run_demo_job
+from zkp.executor import ProofExecutor
+from zkp.params import get_params
+
+
+def throughput(submit, jobs, clients):
+    with ThreadPoolExecutor(clients) as threads:
+        start = time.perf_counter()
+        results = list(threads.map(lambda _: submit(), range(jobs)))
+        elapsed = time.perf_counter() - start
+    assert all(r[1] for r in results)
+    return jobs / elapsed
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', default='schnorr-2048')
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cpus}))
+    args = parser.parse_args()
+
+    params = get_params(args.params)
+    job_args = ('password', {'password': DEMO_CONFIGS['password']['registered_password']}, params.name, 0)
+    clients = max(args.workers) * 2
+
+    run_demo_job(*job_args)
+    inline = throughput(lambda: run_demo_job(*job_args), args.jobs, clients)
+    print(f"{params.name}: {cpus} CPUs, {args.jobs} jobs, {clients} client threads")
+    print(f"{'inline':>10} {inline:>8.1f} jobs/s")
+
+    for workers in args.workers:
+        executor = ProofExecutor(workers, max_pending=clients, params=[params.name])
+        executor.warm()
+        rate = throughput(lambda: executor.run(run_demo_job, *job_args), args.jobs, clients)
+        executor.shutdown()
+        print(f"{workers:>3} workers {rate:>8.1f} jobs/s  {rate / inline:>5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Fixed-base table vs plain modular exponentiation.
+
+Usage:
+    python -m benchmarks.bench_fixed_base [--iterations N] [--params NAME ...] [--backend NAME]
+
+Times g^x for uniformly random exponents below q in each registered
+parameter set.  The table and the powmod baseline run on the same
+arithmetic backend (ZKP_BACKEND's choice unless --backend is given), so
+the speedup is the table's alone and not the backend's; bench_backend
+compares the backends.
+"""
+
+import argparse
+import secrets
+import time
+
+from zkp.backend import available_backends, get_backend
+from zkp.fixed_base import FixedBaseTable
+from zkp.params import get_params
+
+
+BENCH_PARAMS = ('schnorr-2048', 'modp-2048', 'schnorr-3072', 'modp-3072')
+
+
+def _time_per_op(fn, exponents):
+    start = time.perf_counter()
+    for e in exponents:
+        fn(e)
+    return (time.perf_counter() - start) / len(exponents)
+
+
+def run(params, iterations, backend):
+    g, p, q = params.g, params.p, params.q
+    exponents = [secrets.randbelow(q) for _ in range(iterations)]
+
+    start = time.perf_counter()
+    table = FixedBaseTable(g, p, q, backend=backend)
+    build = time.perf_counter() - start
+
+    for e in exponents[:8]:
+        assert table.pow(e) == pow(g, e, p)
+
+    powmod, base, modulus = backend.powmod, backend.mpz(g), backend.mpz(p)
+    builtin = _time_per_op(lambda e: powmod(base, e, modulus), exponents)
+    fixed = _time_per_op(table.pow, exponents)
+    return {
+        'params': params.name,
+        'backend': backend.name,
+        'modulus_bits': params.p_bits,
+        'exponent_bits': params.q_bits,
+        'window': table.window,
+        'build_ms': build * 1e3,
+        'pow_us': builtin * 1e6,
+        'table_us': fixed * 1e6,
+        'speedup': builtin / fixed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--params', nargs='+', default=BENCH_PARAMS)
+    parser.add_argument('--backend', choices=available_backends(),
+                        help='arithmetic for both table and baseline (default: ZKP_BACKEND)')
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+
+    print(f"Backend: {backend.name}")
+    print(f"{'params':<13} {'p bits':>6} {'q bits':>6} {'w':>2} {'build ms':>9} "
+          f"{'pow us':>9} {'table us':>9} {'speedup':>8}")
+    for name in args.params:
+        r = run(get_params(name), args.iterations, backend)
+        print(f"{r['params']:<13} {r['modulus_bits']:>6} {r['exponent_bits']:>6} {r['window']:>2} "
+              f"{r['build_ms']:>9.1f} {r['pow_us']:>9.1f} {r['table_us']:>9.1f} "
+              f"{r['speedup']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Merkle accumulator cost against group size.
+
+Usage:
+    python -m benchmarks.bench_merkle [--sizes N ...] [--iterations N]
+
+For each group size, times building the accumulator, one insert plus one
+removal, reading a membership path and verifying it, next to the list
+scan (`in` and `.index()`) the membership demo used to do.  Path and
+update costs should grow with log2(n) only.
+"""
+
+import argparse
+import time
+
+from zkp.merkle import MerkleAccumulator, verify_path
+
+
+def _time_per_op(fn, inputs):
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - start) / len(inputs)
+
+
+def run(size, iterations):
+    members = [f'member-{i}'.encode() for i in range(size)]
+    start = time.perf_counter()
+    accumulator = MerkleAccumulator(members)
+    build = time.perf_counter() - start
+
+    step = max(1, size // iterations)
+    probes = members[::step][:iterations]
+    paths = [accumulator.path(m) for m in probes]
+    assert all(verify_path(root, m, path) for m, (root, path) in zip(probes, paths))
+
+    def churn(member):
+        accumulator.remove(member)
+        accumulator.add(member)
+
+    return {
+        'depth': accumulator.depth,
+        'build_ms': build * 1e3,
+        'update_us': _time_per_op(churn, probes) / 2 * 1e6,
+        'path_us': _time_per_op(accumulator.path, probes) * 1e6,
+        'verify_us': _time_per_op(lambda i: verify_path(paths[i][0], probes[i], paths[i][1]),
+                                  range(len(probes))) * 1e6,
+        'scan_us': _time_per_op(members.index, probes) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'members':>9} {'depth':>5} {'build ms':>10} {'update us':>10} {'path us':>8} "
+          f"{'verify us':>10} {'list scan us':>13}")
+    for size in args.sizes:
+        r = run(size, args.iterations)
+        print(f"{size:>9} {r['depth']:>5} {r['build_ms']:>10.1f} {r['update_us']:>10.2f} "
+              f"{r['path_us']:>8.2f} {r['verify_us']:>10.2f} {r['scan_us']:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Multi-exponentiation microbenchmarks across base counts.
+
+Usage:
+    python -m benchmarks.bench_multiexp [--params NAME] [--counts N ...] [--backend NAME]
+
+Compares a product of separate powmod() calls with Straus, Pippenger and
+the multi_exp() dispatcher for 256-bit exponents (or q-sized ones for
+MODP).  Every algorithm, the baseline included, runs on the same
+arithmetic backend (ZKP_BACKEND's choice unless --backend is given), so
+the speedup is the algorithm's alone.
+"""
+
+import argparse
+import functools
+import secrets
+import time
+
+from zkp.backend import available_backends, get_backend
+from zkp.multiexp import multi_exp, pippenger, straus
+from zkp.params import get_params
+
+
+def naive(pairs, modulus, backend):
+    modulus = backend.mpz(modulus)
+    result = backend.mpz(1)
+    for base, e in pairs:
+        result = result * backend.powmod(base, e, modulus) % modulus
+    return backend.to_int(result)
+
+
+def _time(fn, pairs, modulus, budget=0.5):
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn(pairs, modulus)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / runs
+
+
+def run(params, count, backend):
+    p, q = params.p, params.q
+    pairs = [(backend.mpz(secrets.randbelow(p - 2) + 2), secrets.randbelow(q)) for _ in range(count)]
+    algorithms = {name: functools.partial(fn, backend=backend) for name, fn in
+                  (('pow', naive), ('straus', straus), ('pippenger', pippenger), ('multi_exp', multi_exp))}
+    expected = algorithms['pow'](pairs, p)
+    row = {'params': params.name, 'count': count}
+    for name, fn in algorithms.items():
+        assert fn(pairs, p) == expected
+        row[name] = _time(fn, pairs, p) * 1e3
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', default='schnorr-2048')
+    parser.add_argument('--counts', type=int, nargs='+', default=[2, 3, 8, 32, 128, 512])
+    parser.add_argument('--backend', choices=available_backends(),
+                        help='arithmetic for every algorithm (default: ZKP_BACKEND)')
+    args = parser.parse_args()
+
+    params = get_params(args.params)
+    backend = get_backend(args.backend)
+    print(f"Backend: {backend.name}")
+    print(f"{'params':<13} {'bases':>6} {'pow ms':>9} {'straus ms':>10} "
+          f"{'pippenger ms':>13} {'multi_exp ms':>13} {'speedup':>8}")
+    for count in args.counts:
+        r = run(params, count, backend)
+        print(f"{r['params']:<13} {r['count']:>6} {r['pow']:>9.2f} {r['straus']:>10.2f} "
+              f"{r['pippenger']:>13.2f} {r['multi_exp']:>13.2f} {r['pow'] / r['multi_exp']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
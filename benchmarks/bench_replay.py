@@ -0,0 +1,47 @@
+"""
+Replay guard throughput and memory.
+
+Usage:
+    python -m benchmarks.bench_replay [--proofs N] [--capacity N] [--exact N]
+
+Feeds N fresh proof fingerprints through a ReplayGuard, then replays all
+of them, and reports the time per check, the proofs wrongly refused and
+the bytes held by the Bloom filters.
+"""
+
+import argparse
+import os
+import time
+
+from zkp.replay import DEFAULT_CAPACITY, DEFAULT_EXACT_SIZE, ReplayGuard
+
+
+def _time_checks(guard, digests):
+    start = time.perf_counter()
+    accepted = sum(guard.check_and_add(d) for d in digests)
+    return (time.perf_counter() - start) / len(digests), accepted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--proofs', type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument('--exact', type=int, default=DEFAULT_EXACT_SIZE)
+    args = parser.parse_args()
+
+    guard = ReplayGuard(capacity=args.capacity, exact_size=args.exact)
+    digests = [os.urandom(16) for _ in range(args.proofs)]
+    fresh, accepted = _time_checks(guard, digests)
+    replayed, replays_accepted = _time_checks(guard, digests)
+    stats = guard.stats()
+
+    print(f"{'phase':<8} {'checks':>8} {'us/check':>9} {'accepted':>9}")
+    print(f"{'fresh':<8} {len(digests):>8} {fresh * 1e6:>9.2f} {accepted:>9}")
+    print(f"{'replay':<8} {len(digests):>8} {replayed * 1e6:>9.2f} {replays_accepted:>9}")
+    print(f"\nBloom filters: {stats['bloom_bytes'] / 1024:.0f} KiB, {guard.bloom.hashes} hashes; "
+          f"exact LRU: {stats['recent']} fingerprints; "
+          f"false positives resolved: {stats['false_positives']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Buffered randomness vs one system call per draw.
+
+Usage:
+    python -m benchmarks.bench_rng [--iterations N] [--params NAME ...]
+
+Times drawing a non-zero scalar below each group order, and a 128-bit
+batch weight, with secrets.randbelow() and with the buffered zkp.rng
+source the proofs use.
+"""
+
+import argparse
+import secrets
+import time
+
+from zkp.params import available_params, get_params
+from zkp.rng import BufferedRandom
+
+
+def _time_per_op(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200_000)
+    parser.add_argument('--params', nargs='+', default=available_params())
+    args = parser.parse_args()
+
+    rng = BufferedRandom()
+    bounds = [('weight 128-bit', 1 << 128)]
+    bounds += [(name, get_params(name).q) for name in args.params]
+
+    print(f"{'bound':<16} {'bits':>5} {'secrets us':>11} {'buffered us':>12} {'speedup':>8}")
+    for label, bound in bounds:
+        direct = _time_per_op(lambda: secrets.randbelow(bound - 1) + 1, args.iterations)
+        buffered = _time_per_op(lambda: rng.random_scalar(bound), args.iterations)
+        print(f"{label:<16} {(bound - 1).bit_length():>5} {direct * 1e6:>11.3f} {buffered * 1e6:>12.3f} "
+              f"{direct / buffered:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+End-to-end benchmark suite for the demos.
+
+Usage:
+    python -m benchmarks.suite [--params NAME ...] [--rounds N ...] [--batch N ...]
+                               [--repeat N] [--quick] [--output FILE] [--compare FILE]
+
+Times the password KDF, every zkp_* function, range proving and verifying at
+32 and 64 bits in both modes, transcript verification on its own (single
+and batched) and full /zkp/<demo_type> requests through Flask's test
+client, for each parameter set, round count and batch size.
+Each case reports ops/sec and p50/p99 latency; the results are written as
+JSON so two runs can be compared with --compare.  Everything runs
+in-process and offline.
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import os
+import platform
+import secrets
+import sys
+import time
+
+from app import (DEMO_CONFIGS, app, get_user, zkp_age_verification, zkp_membership_proof,
+                 zkp_password_auth, zkp_range_proof)
+from zkp.admission import RATE_LIMIT_ENV
+from zkp.backend import backend
+from zkp.params import get_params
+from zkp.range_proof import MODES as RANGE_MODES, commit, prove_range, verify_range
+from zkp.registry import derive_secret
+from zkp.schnorr import batch_verify, verify_transcript
+from zkp.sigma import SigmaProtocol
+
+
+SUITE_PARAMS = ('schnorr-2048', 'modp-2048', 'schnorr-3072', 'modp-3072', 'ed25519')
+SUITE_ROUNDS = (1, 3, 10)
+SUITE_BATCH = (1, 16, 128)
+# Range widths for the standalone range proof cases
+RANGE_BITS = (32, 64)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Request bodies that take each demo down its success path
+DEMO_REQUESTS = {
+    'password': {'password': DEMO_CONFIGS['password']['registered_password']},
+    'age': {'birth_year': 1990},
+    'range': {'number': DEMO_CONFIGS['range']['secret_number']},
+    'membership': {'member': DEMO_CONFIGS['membership']['secret_member']},
+}
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_samples) - 1, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def measure(fn, repeat, warmup=2, ops_per_call=1):
+    """Call fn repeatedly and summarise the per-call latencies."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        'samples': repeat,
+        'ops_per_call': ops_per_call,
+        'ops_per_sec': repeat * ops_per_call / total,
+        'mean_ms': total / repeat * 1e3,
+        'p50_ms': percentile(samples, 0.50) * 1e3,
+        'p99_ms': percentile(samples, 0.99) * 1e3,
+    }
+
+
+def _check(result):
+    """Wrap a (success, steps) demo call so a failing run aborts the suite."""
+    success, _ = result
+    assert success
+    return success
+
+
+def demo_cases(params, rounds):
+    """(name, callable) for every zkp_* function at one round count."""
+    age = DEMO_CONFIGS['age']
+    members = DEMO_CONFIGS['membership']
+    user = get_user(DEMO_CONFIGS['password']['username'], params)
+    password = DEMO_REQUESTS['password']['password']
+    return [
+        ('zkp_password_auth',
+         lambda: _check(zkp_password_auth(password, user, rounds, params))),
+        ('zkp_age_verification',
+         lambda: _check(zkp_age_verification(1990, age['min_age'], rounds, params))),
+        ('zkp_membership_proof',
+         lambda: _check(zkp_membership_proof(members['secret_member'], members['group_members'],
+                                             members['secret_member'], rounds, params))),
+    ]
+
+
+def _check_range(commitment, proof, lower, upper, params):
+    return _check((verify_range(commitment, proof, lower, upper, params), None))
+
+
+def range_cases(params, mode):
+    """(name, callable, extra fields) for the range demo and for 32/64-bit range proofs."""
+    number = DEMO_CONFIGS['range']
+    cases = [('zkp_range_proof',
+              lambda: _check(zkp_range_proof(number['secret_number'], number['min_value'], number['max_value'],
+                                             number['secret_number'], params, mode)),
+              {'mode': mode})]
+    for bits in RANGE_BITS:
+        upper = (1 << bits) - 1
+        value, blinding = secrets.randbits(bits), params.random_scalar()
+        commitment = commit(value, blinding, params)
+        proof = prove_range(value, blinding, 0, upper, params, mode)
+        # Bind this width's values now; a closure would see the last iteration's
+        cases.append(('prove_range', functools.partial(prove_range, value, blinding, 0, upper, params, mode),
+                      {'mode': mode, 'bits': bits}))
+        cases.append(('verify_range', functools.partial(_check_range, commitment, proof, 0, upper, params),
+                      {'mode': mode, 'bits': bits}))
+    return cases
+
+
+def make_transcripts(params, count):
+    """Honest round transcripts for one statement, as the demos produce them."""
+    protocol = SigmaProtocol('bench', params)
+    secret = params.random_scalar()
+    return protocol.prove(protocol.statement(secret), secret, rounds=count)
+
+
+def run_suite(param_names, round_counts, batch_sizes, repeat, log=print):
+    results = []
+
+    def record(case, params, stats, **extra):
+        entry = {'case': case, 'params': params.name, 'p_bits': getattr(params, 'p_bits', None),
+                 'q_bits': params.q_bits, **extra, **stats}
+        results.append(entry)
+        detail = ' '.join(f'{k}={v}' for k, v in extra.items())
+        log(f"{case:<22} {params.name:<13} {detail:<22} {stats['ops_per_sec']:>10.1f}/s "
+            f"p50 {stats['p50_ms']:>9.3f} ms  p99 {stats['p99_ms']:>9.3f} ms")
+
+    client = app.test_client()
+    for name in param_names:
+        params = get_params(name)
+        user = get_user(DEMO_CONFIGS['password']['username'], params)
+
+        record('derive_secret', params,
+               measure(lambda: derive_secret('SecurePassword123', user.salt, params, user.kdf), repeat))
+        record('user_lookup', params,
+               measure(lambda: get_user(user.username, params), repeat * 10))
+
+        for rounds in round_counts:
+            for case, fn in demo_cases(params, rounds):
+                record(case, params, measure(fn, repeat), rounds=rounds)
+
+        if params.prime_order:
+            for mode in RANGE_MODES:
+                for case, fn, extra in range_cases(params, mode):
+                    record(case, params, measure(fn, max(3, repeat // 5), warmup=1), **extra)
+
+        for size in batch_sizes:
+            transcripts = make_transcripts(params, size)
+            if size == 1:
+                stats = measure(lambda: verify_transcript(transcripts[0], params), repeat)
+                record('verify_transcript', params, stats, batch=1)
+            else:
+                stats = measure(lambda: batch_verify(transcripts, params), repeat, ops_per_call=size)
+                record('batch_verify', params, stats, batch=size)
+
+        for demo_type, body in DEMO_REQUESTS.items():
+            body = dict(body, group=params.name)
+
+            def request():
+                response = client.post(f'/zkp/{demo_type}', json=body)
+                assert response.status_code == 200 and response.get_json()['success']
+
+            record('flask /zkp/' + demo_type, params, measure(request, repeat))
+
+    return results
+
+
+def result_key(entry):
+    return (entry['case'], entry['params'], entry.get('rounds'), entry.get('batch'),
+            entry.get('mode'), entry.get('bits'))
+
+
+def compare(results, baseline_path, log=print):
+    """Print the p50 and throughput change of each case against an earlier run."""
+    with open(baseline_path) as f:
+        baseline = {result_key(e): e for e in json.load(f)['results']}
+    log(f"\nCompared with {baseline_path} (p50 ratio < 1 is faster):")
+    for entry in results:
+        old = baseline.get(result_key(entry))
+        if old is None:
+            continue
+        case, params = entry['case'], entry['params']
+        detail = ' '.join(f'{k}={entry[k]}' for k in ('rounds', 'batch', 'mode', 'bits') if k in entry)
+        log(f"{case:<22} {params:<13} {detail:<22} p50 x{entry['p50_ms'] / old['p50_ms']:>6.2f}  "
+            f"ops/s x{entry['ops_per_sec'] / old['ops_per_sec']:>6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', nargs='+', default=list(SUITE_PARAMS))
+    parser.add_argument('--rounds', type=int, nargs='+', default=list(SUITE_ROUNDS))
+    parser.add_argument('--batch', type=int, nargs='+', default=list(SUITE_BATCH))
+    parser.add_argument('--repeat', type=int, default=30, help='timed calls per case')
+    parser.add_argument('--quick', action='store_true',
+                        help='one parameter set, 3 rounds, batch 16, 5 calls per case')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/suite-<time>.json)')
+    parser.add_argument('--compare', metavar='FILE', help='earlier results file to compare against')
+    args = parser.parse_args()
+    # The suite times proofs, not the per-client rate limit its one test client would hit
+    os.environ.setdefault(RATE_LIMIT_ENV, '0')
+
+    if args.quick:
+        args.params, args.rounds, args.batch, args.repeat = ['schnorr-2048'], [3], [1, 16], 5
+
+    started = datetime.datetime.now()
+    results = run_suite(args.params, args.rounds, args.batch, args.repeat)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"suite-{started:%Y%m%d-%H%M%S}.json")
+    report = {
+        'started': started.isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'backend': backend.name,
+        'config': {'params': args.params, 'rounds': args.rounds, 'batch': args.batch,
+                   'repeat': args.repeat},
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for the production entry point (wsgi.py).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: the master imports the app and warms the shared tables once;
+  workers are forked from it and share those pages copy-on-write.
+- gc: the master runs with the collector off and freezes every object
+  right before each fork, so workers' collections never write to (and
+  copy) the inherited pages; workers re-enable it.
+- Recycling: a worker exits after ZKP_MAX_REQUESTS requests (plus jitter so
+  they do not all restart together) and is replaced by a fresh fork, which
+  keeps per-worker memory flat.
+- Reload: SIGHUP starts new workers with the reloaded configuration and
+  stops the old ones gracefully.  With preload_app the application code is
+  not re-imported on HUP; deploy new code with a full restart.
+
+One proof runs at a time per worker (modexp holds the GIL); the extra
+thread lets a worker answer cheap requests and 429s while a proof runs.
+Leave ZKP_WORKERS unset: gunicorn's workers are the process pool.
+"""
+
+import gc
+import multiprocessing
+import os
+
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+preload_app = True
+
+max_requests = int(os.environ.get('ZKP_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+# A worker busy past ZKP_JOB_TIMEOUT is killed and replaced
+timeout = int(float(os.environ.get('ZKP_JOB_TIMEOUT', 30))) + 10
+graceful_timeout = 30
+keepalive = 5
+
+# Admission control is per process: one running proof per worker
+os.environ.setdefault('ZKP_MAX_CONCURRENT', '1')
+
+# Objects created from here on in the master stay untracked until the freeze
+gc.disable()
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def when_ready(server):
+    server.log.info('Master %s ready: %d workers x %d threads, recycled every %d requests',
+                    os.getpid(), workers, threads, max_requests)
+
+
+def on_reload(server):
+    server.log.info('Reloading: replacing workers gracefully (application code is not re-imported)')
@@ -1,11 +1,38 @@
-import random
-import hashlib
+"""
+Zero-knowledge proof demos from the command line.
+
+    python main.py                          # interactive menu
+    python main.py --batch jobs.jsonl       # non-interactive, one JSON job per line
+    python main.py --batch - < jobs.jsonl   # jobs from stdin
+
+A batch job has the fields of a /zkp/<demo> request body plus "demo", e.g.
+{"demo": "age", "birth_year": 1990} or {"demo": "range", "number": 3500,
+"group": "ed25519"}; an "id" is copied to its result.  Jobs are spread over
+a process pool and each result is written as one JSON line, in input order
+or (--as-completed) as soon as it is ready.  Progress and a throughput
+summary go to stderr.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
-# Shared parameters (large prime p, generator g, modulus q = p-1)
-p = 10007  # Larger prime for demo (real-world: 2048-bit)
-g = 5  # Generator
-q = p - 1
+from app import DemoInputError, run_demo_job
+from zkp import get_params
+from zkp.executor import DEFAULT_QUEUE_PER_WORKER, ProofExecutor
+from zkp.membership import member_tree, membership_proof_steps
+from zkp.range_proof import range_proof_steps
+from zkp.registry import UserRegistry, derive_secret
+from zkp.sigma import PASSWORD_ROUND_FIELDS, SigmaProtocol
+
+# Shared parameters, selected with the ZKP_PARAMS environment variable
+params = get_params()
 
 # Demo configurations
 DEMO_CONFIGS = {
@@ -19,10 +46,21 @@ DEMO_CONFIGS = {
 }
 
 
-def hash_to_int(password):
-    """Hash password to an integer secret using SHA-256."""
-    hash_obj = hashlib.sha256(password.encode())
-    return int(hash_obj.hexdigest(), 16) % q
+def print_steps(steps):
+    """Print each step from a step generator and return its verdict"""
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if step.type == 'round':
+            print()
+        print(step.message())
+
+
+def run_protocol(protocol, public_key, secret):
+    """Print each step of the protocol rounds and return whether all passed"""
+    return print_steps(protocol.steps(public_key, secret))
 
 
 def zkp_password_demo():
@@ -35,41 +73,17 @@ def zkp_password_demo():
     
     client_password = input("\nEnter password: ")
     
-    # Server setup
-    server_secret = hash_to_int(DEMO_CONFIGS['password'])
-    server_public_key = pow(g, server_secret, p)
+    # Server setup: registration stores only the salt and public key
+    user = UserRegistry().register('demo', DEMO_CONFIGS['password'], params)
     
-    print(f"\n🔧 Public parameters: p={p}, g={g}, q={q}")
-    print(f"🔑 Server public key: {server_public_key}")
+    print(f"\n🔧 Public parameters: {params.summary()}")
+    print(f"🔑 Server public key: {user.public_key}")
     
-    # ZKP Protocol
-    secret = hash_to_int(client_password)
+    # ZKP Protocol: the client stretches its password with the stored salt
+    secret = derive_secret(client_password, user.salt, params, user.kdf)
     
-    for round_num in range(1, 4):
-        print(f"\n🔄 Round {round_num} - Schnorr Protocol")
-        
-        k = random.randint(1, q - 1)
-        t = pow(g, k, p)
-        print(f"📤 Client commitment: t = {g}^{k} mod {p} = {t}")
-        
-        e = random.randint(1, q - 1)
-        print(f"🎯 Server challenge: e = {e}")
-        
-        s = (k + e * secret) % q
-        print(f"📥 Client response: s = (k + e * secret) mod {q} = {s}")
-        
-        left = pow(g, s, p)
-        right = (t * pow(server_public_key, e, p)) % p
-        print(f"✅ Verification: {g}^{s} mod {p} = {left}")
-        print(f"🎯 Expected: t * (public_key)^{e} mod {p} = {right}")
-        
-        if left != right:
-            print(f"❌ Round {round_num} FAILED!")
-            return False
-        else:
-            print(f"✅ Round {round_num} SUCCESS!")
-    
-    return True
+    protocol = SigmaProtocol('password', params, fields=PASSWORD_ROUND_FIELDS)
+    return run_protocol(protocol, user.public_key, secret)
 
 
 def zkp_age_demo():
@@ -95,34 +109,12 @@ def zkp_age_demo():
         return False
     
     secret = actual_age - DEMO_CONFIGS['min_age']
-    public_commitment = pow(g, secret, p)
+    protocol = SigmaProtocol('age', params, passed_values=(DEMO_CONFIGS['min_age'],))
+    public_commitment = protocol.statement(secret)
     
     print(f"🔐 Age commitment generated (hiding exact age)")
     
-    for round_num in range(1, 4):
-        print(f"\n🔄 Round {round_num} - Age Range Proof")
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        print(f"📤 Prover commitment: C = g^r mod p = {commitment}")
-        
-        challenge = random.randint(1, q - 1)
-        print(f"🎯 Verifier challenge: e = {challenge}")
-        
-        response = (r + challenge * secret) % q
-        print(f"📥 Prover response: s = (r + e * age_proof) mod q = {response}")
-        
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        print(f"✅ Verification: g^s = {left}, C * commitment^e = {right}")
-        
-        if left == right:
-            print(f"✅ Round {round_num} SUCCESS! Age >= {DEMO_CONFIGS['min_age']} verified")
-        else:
-            print(f"❌ Round {round_num} FAILED!")
-            return False
-    
-    return True
+    return run_protocol(protocol, public_commitment, secret)
 
 
 def zkp_range_demo():
@@ -149,35 +141,11 @@ def zkp_range_demo():
         print(f"❌ Number not in valid range [{DEMO_CONFIGS['range_min']}, {DEMO_CONFIGS['range_max']}]")
         return False
     
-    secret = number - DEMO_CONFIGS['range_min']
-    public_commitment = pow(g, secret, p)
-    
-    print(f"🔐 Range commitment generated")
-    
-    for round_num in range(1, 4):
-        print(f"\n🔄 Round {round_num} - Range Proof Protocol")
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        print(f"📤 Commitment: C = g^r mod p = {commitment}")
-        
-        challenge = random.randint(1, q - 1)
-        print(f"🎯 Challenge: e = {challenge}")
-        
-        response = (r + challenge * secret) % q
-        print(f"📥 Response: s = (r + e * normalized_value) mod q = {response}")
-        
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        print(f"✅ Verification: g^s = {left}, C * public_commitment^e = {right}")
-        
-        if left == right:
-            print(f"✅ Round {round_num} SUCCESS! Number in range verified")
-        else:
-            print(f"❌ Round {round_num} FAILED!")
-            return False
+    if not params.prime_order:
+        print(f"❌ Range proofs need a prime-order group; {params.name} is not one")
+        return False
     
-    return True
+    return print_steps(range_proof_steps(number, DEMO_CONFIGS['range_min'], DEMO_CONFIGS['range_max'], params))
 
 
 def zkp_membership_demo():
@@ -200,36 +168,195 @@ def zkp_membership_demo():
         print("❌ Member not in group")
         return False
     
-    member_index = DEMO_CONFIGS['group_members'].index(member)
-    secret = member_index + 1
-    public_commitment = pow(g, secret, p)
-    
-    print(f"🔐 Membership commitment generated (hiding specific identity)")
-    
-    for round_num in range(1, 4):
-        print(f"\n🔄 Round {round_num} - Membership Proof Protocol")
-        
-        r = random.randint(1, q - 1)
-        commitment = pow(g, r, p)
-        print(f"📤 Commitment: C = g^r mod p = {commitment}")
-        
-        challenge = random.randint(1, q - 1)
-        print(f"🎯 Challenge: e = {challenge}")
-        
-        response = (r + challenge * secret) % q
-        print(f"📥 Response: s = (r + e * member_proof) mod q = {response}")
-        
-        left = pow(g, response, p)
-        right = (commitment * pow(public_commitment, challenge, p)) % p
-        print(f"✅ Verification: g^s = {left}, C * membership_commitment^e = {right}")
-        
-        if left == right:
-            print(f"✅ Round {round_num} SUCCESS! Group membership verified")
-        else:
-            print(f"❌ Round {round_num} FAILED!")
-            return False
+    tree = member_tree(DEMO_CONFIGS['group_members'], params)
     
-    return True
+    return print_steps(membership_proof_steps(member, tree))
+
+
+def run_batch_job(line, job, verbose=0):
+    """
+    Run one batch job through the web app's run_demo_job, so both validate
+    and run a demo the same way, and return its result record. Called inline
+    or in a worker process; any failure becomes this job's error record.
+    """
+    start = time.perf_counter()
+    result = {'line': line}
+    try:
+        if not isinstance(job, dict):
+            raise DemoInputError('A job must be a JSON object')
+        if 'id' in job:
+            result['id'] = job['id']
+        result['demo'] = job.get('demo')
+        group, success, message, steps, summary, _ = run_demo_job(
+            job.get('demo'), job, job.get('group'), verbose)
+        result.update(group=group, success=bool(success), message=message, summary=summary)
+        if verbose:
+            result['steps'] = steps
+    except DemoInputError as e:
+        result.update(success=False, error=str(e))
+    except Exception as e:
+        result.update(success=False, error=f'{type(e).__name__}: {e}')
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def read_jobs(lines):
+    """(line number, job) for each non-blank line; a line that is not JSON becomes an error result later"""
+    for number, text in enumerate(lines, 1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            yield number, json.loads(text)
+        except json.JSONDecodeError as e:
+            yield number, DemoInputError(f'Invalid JSON: {e}')
+
+
+class BatchProgress:
+    """Counts finished jobs and reports them to a stream every interval seconds"""
+
+    def __init__(self, stream, interval=1.0):
+        self.stream = stream
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.done = self.succeeded = self.errors = 0
+        self.job_seconds = []
+
+    def add(self, result):
+        self.done += 1
+        self.succeeded += result['success']
+        self.errors += 'error' in result
+        self.job_seconds.append(result['seconds'])
+        now = time.perf_counter()
+        if self.interval and now - self.reported >= self.interval:
+            self.reported = now
+            end = '\r' if self.stream.isatty() else '\n'
+            print(f'{self.done} jobs, {self.rate(now):.1f} jobs/s', end=end, file=self.stream, flush=True)
+
+    def rate(self, now=None):
+        elapsed = (now or time.perf_counter()) - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def summary(self, workers):
+        elapsed = time.perf_counter() - self.started
+        failed = self.done - self.succeeded - self.errors
+        lines = [f'{self.done} jobs in {elapsed:.2f}s on {workers or "no"} worker processes: '
+                 f'{self.rate():.1f} jobs/s',
+                 f'  {self.succeeded} succeeded, {failed} failed, {self.errors} invalid']
+        if self.job_seconds:
+            ordered = sorted(self.job_seconds)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            lines.append(f'  per job: median {statistics.median(ordered) * 1000:.1f} ms, '
+                         f'p95 {p95 * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms')
+        return '\n'.join(lines)
+
+
+def run_batch(jobs, output, workers, ordered=True, verbose=0, progress=None):
+    """
+    Run (line, job) pairs and write each result to output as a JSON line.
+    With workers, at most DEFAULT_QUEUE_PER_WORKER jobs per worker are in
+    flight, so input is read only as fast as it is processed.
+    """
+    def emit(result):
+        output.write(json.dumps(result) + '\n')
+        if progress is not None:
+            progress.add(result)
+
+    if not workers:
+        for line, job in jobs:
+            emit(_invalid(line, job) if isinstance(job, DemoInputError) else run_batch_job(line, job, verbose))
+        return
+
+    window = workers * DEFAULT_QUEUE_PER_WORKER
+
+    def new_executor():
+        # Headroom over the window: a future is done slightly before its slot is released
+        return ProofExecutor(workers, max_pending=2 * window, params=(params.name,))
+
+    def submit(line, job):
+        nonlocal executor
+        try:
+            return executor.submit(run_batch_job, line, job, verbose)
+        except BrokenProcessPool:
+            # A worker died; its in-flight jobs are reported as errors and the rest go to a new pool
+            executor.shutdown(wait=False)
+            executor = new_executor()
+            return executor.submit(run_batch_job, line, job, verbose)
+
+    executor = new_executor()
+    pending = set()
+    finished = {}
+    next_index = 0
+
+    def collect(futures):
+        nonlocal next_index
+        for future in futures:
+            index = future.index
+            try:
+                result = future.result()
+            except Exception as e:
+                result = _invalid(future.line, f'{type(e).__name__}: {e}')
+            if ordered:
+                finished[index] = result
+            else:
+                emit(result)
+        while next_index in finished:
+            emit(finished.pop(next_index))
+            next_index += 1
+
+    try:
+        for index, (line, job) in enumerate(jobs):
+            if isinstance(job, DemoInputError):
+                if ordered:
+                    finished[index] = _invalid(line, job)
+                    collect(())
+                else:
+                    emit(_invalid(line, job))
+                continue
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = submit(line, job)
+            future.index, future.line = index, line
+            pending.add(future)
+        collect(wait(pending)[0])
+    finally:
+        executor.shutdown()
+
+
+def _invalid(line, error):
+    return {'line': line, 'success': False, 'error': str(error), 'seconds': 0.0}
+
+
+def batch_main(argv=None):
+    """Non-interactive mode: run JSONL jobs, write JSONL results"""
+    parser = argparse.ArgumentParser(description='Run zero-knowledge proof jobs from a JSONL file')
+    parser.add_argument('--batch', metavar='FILE', required=True, help="JSONL jobs, or '-' for stdin")
+    parser.add_argument('--output', '-o', metavar='FILE', help='write results here instead of stdout')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per CPU; 0 runs jobs in this process)')
+    parser.add_argument('--as-completed', action='store_true',
+                        help='write each result when it finishes instead of in input order')
+    parser.add_argument('--verbose', type=int, default=0, help='step verbosity in results (default: 0, none)')
+    parser.add_argument('--progress', type=float, default=1.0,
+                        help='seconds between progress lines on stderr (0: summary only)')
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+    output = sys.stdout if args.output is None else open(args.output, 'w', encoding='utf-8')
+    progress = BatchProgress(sys.stderr, args.progress)
+    try:
+        run_batch(read_jobs(source), output, args.workers, not args.as_completed, args.verbose, progress)
+    except KeyboardInterrupt:
+        print('\nInterrupted', file=sys.stderr)
+    finally:
+        output.flush()
+        for stream in (source, output):
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+        print(progress.summary(args.workers), file=sys.stderr)
+    return 0 if progress.errors == 0 else 1
 
 
 def main():
@@ -283,4 +410,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if '--batch' in sys.argv[1:] or any(a.startswith('--batch=') for a in sys.argv[1:]):
+        sys.exit(batch_main())
+    main()
@@ -0,0 +1,49 @@
+"""
+Precompute fixed-base tables and range-proof generators for deployment.
+
+Usage:
+    python scripts/build_tables.py [--params NAME ...] [--bits N] [--output DIR]
+
+Writes one <name>.tbl per parameter set (default: all of them) to DIR
+(default: zkp/precomputed/, where the app looks unless ZKP_TABLES says
+otherwise).  Run it as the build step of a serverless deployment so cold
+starts map the tables instead of recomputing them; see zkp/precomputed.py.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Compute everything from scratch rather than from an earlier artifact
+os.environ['ZKP_TABLES'] = 'off'
+
+from zkp.params import available_params, get_params  # noqa: E402
+from zkp.precomputed import DEFAULT_DIRECTORY, save_artifact  # noqa: E402
+from zkp.range_proof import generator, generator_labels  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--params', nargs='+', default=available_params())
+    parser.add_argument('--bits', type=int, default=64,
+                        help='largest range proof width to precompute generators for')
+    parser.add_argument('--output', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    for name in args.params:
+        params = get_params(name)
+        start = time.perf_counter()
+        table = params.table
+        generators = {}
+        if params.prime_order:
+            generators = {label: generator(params, label) for label in generator_labels(args.bits)}
+        path = save_artifact(params, table.window, table.entries(), generators, args.output)
+        print(f'{name:<13} {os.path.getsize(path) / 1024:>8.0f} KiB  {len(generators):>4} generators  '
+              f'{time.perf_counter() - start:>6.2f} s  {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Regenerate the Schnorr subgroup parameters shipped in zkp/params.py.
+
+Usage:
+    python scripts/gen_schnorr_group.py 2048
+    python scripts/gen_schnorr_group.py 3072
+
+The search is fully determined by a public seed string, so anyone can
+re-run it and confirm the constants contain no hidden structure: q is the
+first prime at or above SHA-256(seed || "q"), p is the first prime of the
+form k*q + 1 at or above the SHAKE-256 expansion of the seed, and g is
+2^((p - 1) / q) mod p.
+"""
+
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from zkp.params import is_probable_prime
+
+
+def schnorr_group(p_bits, q_bits=256):
+    seed = f'zkp-demo schnorr-{p_bits}'.encode()
+
+    q = int.from_bytes(hashlib.sha256(seed + b'q').digest(), 'big')
+    q |= (1 << (q_bits - 1)) | 1
+    while not is_probable_prime(q):
+        q += 2
+
+    x = int.from_bytes(hashlib.shake_256(seed + b'p').digest(p_bits // 8), 'big')
+    x |= 1 << (p_bits - 1)
+    p = x - (x % (2 * q)) + 1
+    while p.bit_length() != p_bits or not is_probable_prime(p):
+        p += 2 * q
+
+    g = pow(2, (p - 1) // q, p)
+    return p, q, g
+
+
+def main():
+    p_bits = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    p, q, g = schnorr_group(p_bits)
+    print(f'p = 0x{p:x}')
+    print(f'q = 0x{q:x}')
+    print(f'g = 0x{g:x}')
+
+
+if __name__ == '__main__':
+    main()
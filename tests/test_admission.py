@@ -0,0 +1,38 @@
+import pytest
+
+import app as app_module
+from zkp import admission
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv('ZKP_TRUST_PROXY', '1')
+    monkeypatch.setenv('ZKP_RATE_LIMIT', '1')
+    monkeypatch.setenv('ZKP_RATE_BURST', '2')
+    monkeypatch.setattr(admission, '_controller', None)
+    yield app_module.app.test_client()
+    admission._controller = None
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_rate_limit(client):
+    statuses = []
+    for i in range(5):
+        # The client controls everything left of what the proxy appended
+        headers = {'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7'}
+        response = client.post('/zkp/age', json={'birth_year': 1990, 'verbose': 0}, headers=headers)
+        statuses.append(response.status_code)
+    assert statuses[:2] == [200, 200]
+    assert 429 in statuses[2:]
+
+
+def test_client_address_uses_the_hop_the_proxy_appended(monkeypatch):
+    monkeypatch.setenv('ZKP_TRUST_PROXY', '1')
+    with app_module.app.test_request_context(headers={'X-Forwarded-For': '1.2.3.4, 203.0.113.7'}):
+        assert app_module.client_address() == '203.0.113.7'
+    monkeypatch.setenv('ZKP_TRUST_PROXY', '2')
+    with app_module.app.test_request_context(headers={'X-Forwarded-For': '1.2.3.4, 198.51.100.1, 203.0.113.7'}):
+        assert app_module.client_address() == '198.51.100.1'
+    monkeypatch.delenv('ZKP_TRUST_PROXY')
+    with app_module.app.test_request_context(headers={'X-Forwarded-For': '1.2.3.4'},
+                                             environ_base={'REMOTE_ADDR': '192.0.2.1'}):
+        assert app_module.client_address() == '192.0.2.1'
@@ -0,0 +1,32 @@
+import io
+import json
+
+import pytest
+
+from main import read_jobs, run_batch
+
+
+JOBS = '\n'.join([
+    '{"demo": "age", "birth_year": 1990, "id": "ok"}',
+    '{"demo": "password", "password": 123}',
+    'not json',
+    '{"demo": "membership", "member": ["Charlie"]}',
+    '{"demo": "range", "number": "many"}',
+    '{"demo": "age", "birth_year": 1990, "group": {"name": "ed25519"}}',
+    '[1, 2]',
+    '{"demo": "password", "password": "SecurePassword123"}',
+])
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_malformed_jobs_become_error_records(workers):
+    output = io.StringIO()
+    run_batch(read_jobs(io.StringIO(JOBS)), output, workers)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert [r['line'] for r in results] == list(range(1, 9))
+    assert results[0]['success'] and results[0]['id'] == 'ok'
+    assert results[-1]['success']
+    for result in results[1:-1]:
+        assert not result['success'] and result['error']
+    assert results[1]['error'] == 'Password must be a string'
@@ -0,0 +1,51 @@
+import pytest
+
+from zkp.fiat_shamir import fs_prove, fs_verify
+from zkp.params import get_params
+from zkp.sigma import SigmaProtocol
+from zkp.steps import drain_steps
+
+GROUPS = ['schnorr-2048', 'ed25519']
+
+
+@pytest.fixture(params=GROUPS)
+def params(request):
+    return get_params(request.param)
+
+
+def test_group_operations_agree(params):
+    q = params.q
+    a, b = params.random_scalar(), params.random_scalar()
+    x, y = params.base_exp(a), params.base_exp(b)
+    assert params.mul(x, y) == params.base_exp(a + b)
+    assert params.exp(x, b) == params.base_exp(a * b % q)
+    assert params.multi_exp([(x, b), (y, -a)], 7) == params.base_exp(7)
+    assert params.base_exp(q) == params.identity()
+    assert params.contains(x) and params.from_wire(params.to_wire(x)) == x
+    assert params.contains(params.hash_to_element(b'test'))
+
+
+def test_honest_proofs_verify(params):
+    secret = params.random_scalar()
+    public_key = params.base_exp(secret)
+    assert fs_verify(public_key, fs_prove(secret, public_key, params, 'ctx'), params, 'ctx')
+
+    protocol = SigmaProtocol('membership', params, rounds=3)
+    assert protocol.verify(protocol.prove(public_key, secret)) == (True, [])
+    success, _, _ = drain_steps(protocol.steps(public_key, secret))
+    assert success
+
+
+def test_tampered_proofs_are_rejected(params):
+    secret = params.random_scalar()
+    public_key = params.base_exp(secret)
+    t, s = fs_prove(secret, public_key, params, 'ctx')
+    assert not fs_verify(public_key, (t, (s + 1) % params.q), params, 'ctx')
+    assert not fs_verify(public_key, (t, s), params, 'other ctx')
+    assert not fs_verify(params.base_exp(secret + 1), (t, s), params, 'ctx')
+
+    protocol = SigmaProtocol('membership', params, rounds=3)
+    transcripts = protocol.prove(public_key, secret)
+    y, t, e, s = transcripts[1]
+    transcripts[1] = (y, t, e, (s + 1) % params.q)
+    assert protocol.verify(transcripts) == (False, [1])
@@ -0,0 +1,59 @@
+import pytest
+
+from zkp.handshake import TokenError, finish_handshake, handshake_key, issue_challenge, open_token, sign_token
+from zkp.params import get_params
+
+KEY = handshake_key('test secret')
+
+
+def start(params, demo='password'):
+    """(secret, nonce, challenge, token, expiry) for a fresh commitment."""
+    x, k = params.random_scalar(), params.random_scalar()
+    e, token, expires = issue_challenge(KEY, demo, params.base_exp(x), params.base_exp(k), params)
+    return x, k, e, token, expires
+
+
+@pytest.mark.parametrize('name', ['schnorr-2048', 'ed25519'])
+def test_honest_response_is_accepted(name):
+    params = get_params(name)
+    x, k, e, token, _ = start(params)
+    valid, payload = finish_handshake(KEY, 'password', token, (k + e * x) % params.q)
+    assert valid and payload['group'] == name
+
+
+def test_wrong_response_is_refused():
+    params = get_params('ed25519')
+    x, k, e, token, _ = start(params)
+    valid, _ = finish_handshake(KEY, 'password', token, (k + e * x + 1) % params.q)
+    assert not valid
+
+
+def test_expired_token_is_refused():
+    params = get_params('ed25519')
+    x, k, e, token, expires = start(params)
+    with pytest.raises(TokenError, match='expired'):
+        finish_handshake(KEY, 'password', token, (k + e * x) % params.q, now=expires + 1)
+
+
+def test_token_with_a_bad_mac_is_refused():
+    params = get_params('ed25519')
+    x, k, e, token, _ = start(params)
+    s = (k + e * x) % params.q
+    with pytest.raises(TokenError, match='Invalid'):
+        finish_handshake(handshake_key('another secret'), 'password', token, s)
+
+    # A payload edited to extend its lifetime no longer matches the MAC
+    payload = open_token(KEY, token)
+    forged = sign_token(handshake_key('another secret'), {**payload, 'exp': payload['exp'] + 3600})
+    version, body, mac = token.split('.')
+    flipped = ('B' if mac[0] == 'A' else 'A') + mac[1:]
+    for candidate in (forged, f"{version}.{forged.split('.')[1]}.{mac}", f'{version}.{body}.{flipped}', 'garbage'):
+        with pytest.raises(TokenError):
+            finish_handshake(KEY, 'password', candidate, s)
+
+
+def test_token_for_another_demo_is_refused():
+    params = get_params('ed25519')
+    x, k, e, token, _ = start(params, demo='age')
+    with pytest.raises(TokenError, match='another demo'):
+        finish_handshake(KEY, 'password', token, (k + e * x) % params.q)
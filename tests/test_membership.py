@@ -0,0 +1,38 @@
+import pytest
+
+from zkp.membership import ORProof, prove_or, verify_or
+from zkp.params import get_params
+
+
+def key_pairs(params, count):
+    secrets = [params.random_scalar() for _ in range(count)]
+    return secrets, [params.base_exp(x) for x in secrets]
+
+
+@pytest.mark.parametrize('name', ['schnorr-2048', 'ed25519'])
+def test_or_proof_verifies_for_every_member(name):
+    params = get_params(name)
+    secrets, keys = key_pairs(params, 5)
+    for index in (0, 2, 4):
+        proof = prove_or(keys, index, secrets[index], params, 'ctx')
+        assert verify_or(keys, proof, params, 'ctx')
+
+
+def test_or_proof_is_rejected_when_tampered():
+    params = get_params('ed25519')
+    secrets, keys = key_pairs(params, 5)
+    proof = prove_or(keys, 1, secrets[1], params, 'ctx')
+    assert not verify_or(keys, proof, params, 'other ctx')
+    assert not verify_or(keys[:4], proof, params, 'ctx')
+    assert not verify_or([*keys[:4], params.base_exp(7)], proof, params, 'ctx')
+
+    responses = list(proof.responses)
+    responses[3] = (responses[3] + 1) % params.q
+    assert not verify_or(keys, ORProof(proof.commitments, proof.challenges, tuple(responses)), params, 'ctx')
+
+
+def test_or_proof_needs_a_member_secret():
+    params = get_params('ed25519')
+    _, keys = key_pairs(params, 5)
+    proof = prove_or(keys, 2, params.random_scalar(), params, 'ctx')
+    assert not verify_or(keys, proof, params, 'ctx')
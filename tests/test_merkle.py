@@ -0,0 +1,53 @@
+import random
+
+from zkp.membership import MemberList, MemberTree
+from zkp.merkle import EMPTY, MerkleAccumulator, verify_path
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = random.Random(16)
+    accumulator = MerkleAccumulator()
+    # Mirrors the documented leaf order: a removal moves the last leaf into the gap
+    leaves = []
+    for step in range(300):
+        if leaves and rng.random() < 0.4:
+            index = rng.randrange(len(leaves))
+            accumulator.remove(leaves[index])
+            last = leaves.pop()
+            if index < len(leaves):
+                leaves[index] = last
+        else:
+            leaf = f'leaf-{step}'.encode()
+            accumulator.add(leaf)
+            leaves.append(leaf)
+        assert accumulator.root == MerkleAccumulator(leaves).root
+
+    for leaf in leaves:
+        root, path = accumulator.path(leaf)
+        assert verify_path(root, leaf, path)
+        assert not verify_path(root, b'not a member', path)
+
+
+def test_removing_every_leaf_leaves_the_empty_root():
+    accumulator = MerkleAccumulator([b'a', b'b', b'c'])
+    for leaf in (b'b', b'a', b'c'):
+        accumulator.remove(leaf)
+    assert accumulator.root == EMPTY[0] and len(accumulator) == 0
+
+
+def test_member_tree_follows_its_list():
+    members = MemberList(f'member-{i}' for i in range(20))
+    tree = MemberTree('ed25519')
+    tree.sync(members)
+    members.remove('member-3')
+    members.extend(['late-1', 'late-2'])
+    del members[:5]
+    tree.sync(members)
+
+    fresh = MemberTree('ed25519')
+    fresh.sync(members)
+    assert set(tree.key_list()) == set(fresh.key_list())
+    for member in members:
+        y, root, path = tree.path(member)
+        assert root == tree.root and verify_path(root, tree.params.encode(y), path)
+    assert 'member-3' not in tree and 'member-0' not in tree
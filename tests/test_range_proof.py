@@ -0,0 +1,63 @@
+import pytest
+
+from zkp.params import get_params
+from zkp.range_proof import RangeProof, commit, prove_range, verify_range
+
+
+@pytest.mark.parametrize('mode', ['bits', 'bulletproof'])
+def test_proof_for_another_range_is_rejected(mode):
+    params = get_params('ed25519')
+    blinding = params.random_scalar()
+    commitment = commit(300, blinding, params)
+    proof = prove_range(300, blinding, 0, 1000, params, mode)
+    assert verify_range(commitment, proof, 0, 1000, params)
+    # The verifier asked for [18, 120]; the prover answered a wider question
+    assert not verify_range(commitment, proof, 18, 120, params)
+    relabelled = RangeProof(proof.mode, proof.bits, 18, 120, proof.parts)
+    assert not verify_range(commitment, relabelled, 18, 120, params)
+
+
+def test_commitment_outside_the_subgroup_is_rejected():
+    params = get_params('schnorr-2048')
+    blinding = params.random_scalar()
+    commitment = commit(300, blinding, params)
+    proof = prove_range(300, blinding, 0, 1000, params, 'bulletproof')
+    assert not verify_range(commitment * (params.p - 1) % params.p, proof, 0, 1000, params)
+
+
+@pytest.mark.parametrize('name', ['schnorr-2048', 'ed25519'])
+@pytest.mark.parametrize('mode', ['bits', 'bulletproof'])
+def test_values_at_both_ends_of_the_range_verify(name, mode):
+    params = get_params(name)
+    for value in (18, 120):
+        blinding = params.random_scalar()
+        proof = prove_range(value, blinding, 18, 120, params, mode, 'ctx')
+        assert verify_range(commit(value, blinding, params), proof, 18, 120, params, 'ctx')
+
+
+@pytest.mark.parametrize('mode', ['bits', 'bulletproof'])
+def test_value_outside_the_range_cannot_be_proved(mode):
+    params = get_params('ed25519')
+    for value in (17, 121):
+        with pytest.raises(ValueError):
+            prove_range(value, params.random_scalar(), 18, 120, params, mode)
+
+
+@pytest.mark.parametrize('mode', ['bits', 'bulletproof'])
+def test_tampered_proofs_are_rejected(mode):
+    params = get_params('ed25519')
+    blinding = params.random_scalar()
+    commitment = commit(50, blinding, params)
+    proof = prove_range(50, blinding, 18, 120, params, mode, 'ctx')
+    assert not verify_range(commitment, proof, 18, 120, params, 'other ctx')
+    assert not verify_range(commit(50, blinding + 1, params), proof, 18, 120, params, 'ctx')
+    # A commitment to 200 cannot borrow the proof made for 50
+    assert not verify_range(commit(200, blinding, params), proof, 18, 120, params, 'ctx')
+
+    part = proof.parts[0]
+    if mode == 'bits':
+        tampered = part._replace(z0=((part.z0[0] + 1) % params.q, *part.z0[1:]))
+    else:
+        tampered = part._replace(t_hat=(part.t_hat + 1) % params.q)
+    proof = proof._replace(parts=[tampered, *proof.parts[1:]])
+    assert not verify_range(commitment, proof, 18, 120, params, 'ctx')
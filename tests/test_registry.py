@@ -0,0 +1,62 @@
+import pytest
+
+import app as app_module
+from zkp import admission, registry
+from zkp.registry import MemoryStore, RegistryFull, UserExists, UserRegistry
+
+# Cheap scrypt settings keep the tests fast
+FAST_KDF = 'scrypt$16$1$1'
+
+
+def test_taken_name_is_refused_before_deriving(monkeypatch):
+    users = UserRegistry(kdf=FAST_KDF)
+    users.register('alice', 'pw', 'schnorr-2048')
+    monkeypatch.setattr(registry, 'derive_secret', lambda *args: pytest.fail('scrypt ran for a taken name'))
+    with pytest.raises(UserExists):
+        users.register('alice', 'other', 'schnorr-2048')
+
+
+def test_memory_store_is_capped():
+    users = UserRegistry(MemoryStore(max_records=2), kdf=FAST_KDF)
+    users.register('a', 'pw', 'schnorr-2048')
+    users.register('b', 'pw', 'schnorr-2048')
+    with pytest.raises(RegistryFull):
+        users.register('c', 'pw', 'schnorr-2048')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, 'users', UserRegistry(kdf=FAST_KDF))
+    monkeypatch.setattr(admission, '_controller', None)
+    yield app_module.app.test_client()
+    admission._controller = None
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'data': 'not json', 'content_type': 'application/json'},
+    {'data': ''},
+    {'json': ['alice', 'pw']},
+    {'json': {'username': 'alice', 'password': 123}},
+])
+def test_malformed_register_body_is_a_400(client, kwargs):
+    assert client.post('/register', **kwargs).status_code == 400
+
+
+def test_register_is_rate_limited(client, monkeypatch):
+    monkeypatch.setenv('ZKP_RATE_LIMIT', '1')
+    monkeypatch.setenv('ZKP_RATE_BURST', '1')
+    first = client.post('/register', json={'username': 'bob', 'password': 'pw'})
+    second = client.post('/register', json={'username': 'carol', 'password': 'pw'})
+    assert first.get_json()['success']
+    assert second.status_code == 429 and 'Retry-After' in second.headers
+
+
+def test_legacy_authenticate_route(client, monkeypatch):
+    monkeypatch.setenv('ZKP_RATE_LIMIT', '0')
+    response = client.post('/authenticate', json={'password': 'SecurePassword123', 'verbose': 0})
+    assert response.status_code == 200 and response.get_json()['success']
+
+
+def test_user_info_unknown_group_is_a_400(client):
+    response = client.get('/users/demo?group=nope')
+    assert response.status_code == 400 and not response.get_json()['success']
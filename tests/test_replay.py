@@ -0,0 +1,52 @@
+import pytest
+
+from zkp.handshake import TokenError, finish_handshake, handshake_key, issue_challenge
+from zkp.params import get_params
+from zkp.replay import ReplayGuard
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_second_submission_is_refused_within_the_window():
+    params = get_params('ed25519')
+    clock = FakeClock()
+    guard = ReplayGuard(capacity=1000, window=60, clock=clock)
+    y, t = params.base_exp(3), params.base_exp(5)
+    assert guard.check_proof(params, 'password', y, t)
+    assert not guard.check_proof(params, 'password', y, t)
+    # The same elements in another kind of proof, or another commitment, are new
+    assert guard.check_proof(params, 'age', y, t)
+    assert guard.check_proof(params, 'password', y, params.base_exp(6))
+
+    clock.now += 59
+    assert not guard.check_proof(params, 'password', y, t)
+    # Only the window is remembered
+    clock.now += 60 * 4
+    assert guard.check_proof(params, 'password', y, t)
+    assert guard.stats()['replays'] == 2
+
+
+def test_exact_cache_overrules_bloom_false_positives():
+    params = get_params('ed25519')
+    # A tiny filter saturates quickly; the exact LRU still knows what it saw
+    guard = ReplayGuard(capacity=8, error_rate=0.5, window=60, exact_size=10_000, clock=FakeClock())
+    for k in range(1, 200):
+        assert guard.check_proof(params, 'password', params.base_exp(k))
+    assert not guard.check_proof(params, 'password', params.base_exp(1))
+
+
+def test_accepted_handshake_cannot_be_replayed():
+    params = get_params('schnorr-2048')
+    key = handshake_key('test secret')
+    x, k = params.random_scalar(), params.random_scalar()
+    e, token, _ = issue_challenge(key, 'password', params.base_exp(x), params.base_exp(k), params)
+    s = (k + e * x) % params.q
+    assert finish_handshake(key, 'password', token, s)[0]
+    with pytest.raises(TokenError, match='already used'):
+        finish_handshake(key, 'password', token, s)
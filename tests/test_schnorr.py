@@ -0,0 +1,70 @@
+from zkp.ed25519 import SQRT_M1, EdwardsPoint, is_on_curve, point_add
+from zkp.params import get_params
+from zkp.schnorr import SchnorrTranscript, batch_verify, verify_transcript
+
+# (sqrt(-1), 0) has order 4 on the full curve
+ED25519_ORDER_4 = EdwardsPoint(SQRT_M1, 0, 1, 0)
+
+
+def small_order_element(params, order):
+    """An element of the given small order dividing the cofactor of Z_p^*."""
+    assert (params.p - 1) // params.q % order == 0
+    x = 2
+    while True:
+        element = pow(x, (params.p - 1) // order, params.p)
+        if element != 1:
+            return element
+        x += 1
+
+
+def honest_transcript(params):
+    x, k, e = params.random_scalar(), params.random_scalar(), params.random_scalar()
+    return SchnorrTranscript(params.base_exp(x), params.base_exp(k), e, (k + e * x) % params.q)
+
+
+def test_small_order_commitment_is_rejected_by_both_paths():
+    params = get_params('schnorr-2048')
+    torsion = small_order_element(params, 7)
+    for _ in range(30):
+        y, t, e, s = honest_transcript(params)
+        forged = SchnorrTranscript(y, t * torsion % params.p, e, s)
+        assert not verify_transcript(forged, params)
+        assert batch_verify([forged], params) == (False, [0])
+        assert batch_verify([honest_transcript(params), forged], params) == (False, [1])
+
+
+def test_small_order_public_key_is_rejected_by_both_paths():
+    params = get_params('schnorr-2048')
+    y, t, e, s = honest_transcript(params)
+    forged = SchnorrTranscript(y * small_order_element(params, 2) % params.p, t, e, s)
+    assert not verify_transcript(forged, params)
+    assert batch_verify([forged], params) == (False, [0])
+
+
+def test_honest_transcripts_pass_both_paths():
+    params = get_params('schnorr-2048')
+    transcripts = [honest_transcript(params) for _ in range(8)]
+    assert all(verify_transcript(t, params) for t in transcripts)
+    assert batch_verify(transcripts, params) == (True, [])
+
+
+def test_non_residue_key_is_rejected_by_both_paths_on_a_safe_prime_group():
+    params = get_params('modp-2048')
+    y, t, e, s = honest_transcript(params)
+    forged = SchnorrTranscript(y * (params.p - 1) % params.p, t, e, s)
+    assert not params.contains(forged.public_key)
+    assert not verify_transcript(forged, params)
+    assert batch_verify([honest_transcript(params), forged], params) == (False, [1])
+
+
+def test_ed25519_small_order_components_are_cleared_by_both_paths():
+    params = get_params('ed25519')
+    assert is_on_curve(ED25519_ORDER_4) and not params.contains(ED25519_ORDER_4)
+    y, t, e, s = honest_transcript(params)
+    shifted = SchnorrTranscript(point_add(y, ED25519_ORDER_4), point_add(t, ED25519_ORDER_4), e, s)
+    assert verify_transcript(shifted, params)
+    assert batch_verify([honest_transcript(params), shifted], params) == (True, [])
+
+    tampered = SchnorrTranscript(*shifted[:3], (s + 1) % params.q)
+    assert not verify_transcript(tampered, params)
+    assert batch_verify([honest_transcript(params), tampered], params) == (False, [1])
@@ -0,0 +1,59 @@
+"""
+Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (see gunicorn.conf.py) the master imports this module
+once and forks its workers from it, so everything built here is shared
+copy-on-write instead of rebuilt per worker: the fixed-base tables (fully
+decoded from the build-time artifact when there is one), the range-proof
+generators, the demo member trees and the user cache.  Nothing here may
+start threads or processes or take nonces; the commitment pools, the
+replay guard and admission control start per worker on first use.
+
+ZKP_PRELOAD_PARAMS names the parameter sets to warm (comma-separated, or
+'all'); the default is the deployment's ZKP_PARAMS set.  ZKP_PRELOAD=0
+skips warming.
+"""
+
+import os
+import time
+
+from app import DEMO_CONFIGS, app, get_user, users
+from zkp.membership import member_tree
+from zkp.params import available_params, get_params
+from zkp.range_proof import generator, generator_labels
+
+
+PRELOAD_ENV = 'ZKP_PRELOAD'
+PRELOAD_PARAMS_ENV = 'ZKP_PRELOAD_PARAMS'
+# Widest range proof whose generators are warmed
+PRELOAD_RANGE_BITS = 64
+
+
+def preload_params():
+    value = os.environ.get(PRELOAD_PARAMS_ENV, '').strip()
+    if value == 'all':
+        return [get_params(name) for name in available_params()]
+    return [get_params(name.strip()) for name in value.split(',') if name.strip()] or [get_params()]
+
+
+def preload(param_sets=None):
+    """Build every shared read-only structure for the given sets; returns seconds per set."""
+    timings = {}
+    for params in param_sets or preload_params():
+        start = time.perf_counter()
+        params.table.load()
+        if params.prime_order:
+            for label in generator_labels(PRELOAD_RANGE_BITS):
+                generator(params, label)
+        get_user(DEMO_CONFIGS['password']['username'], params)
+        users.preload(params)
+        member_tree(DEMO_CONFIGS['membership']['group_members'], params).key_list()
+        timings[params.name] = time.perf_counter() - start
+    return timings
+
+
+if os.environ.get(PRELOAD_ENV, '1').strip() != '0':
+    for name, seconds in preload().items():
+        app.logger.info('Preloaded %s in %.0f ms', name, seconds * 1000)
@@ -0,0 +1,49 @@
+"""Shared cryptographic building blocks for the ZKP demos."""
+
+from zkp.fiat_shamir import fs_challenge, fs_prove, fs_verify
+from zkp.fixed_base import FixedBaseTable, fixed_base_table
+from zkp.multiexp import multi_exp, pippenger, straus
+from zkp.nonce_pool import CommitmentPool, commitment_pool
+from zkp.ed25519 import Ed25519Group
+from zkp.groups import Group
+from zkp.membership import MemberList, member_tree
+from zkp.merkle import MerkleAccumulator, verify_path
+from zkp.params import GroupParams, available_params, get_params, parse_int, register_params
+from zkp.range_proof import RangeProof, commit, prove_range, verify_range
+from zkp.schnorr import SchnorrTranscript, batch_verify, verify_transcript
+from zkp.sigma import SigmaProtocol
+from zkp.steps import Step, drain_steps
+
+__all__ = [
+    'CommitmentPool',
+    'Ed25519Group',
+    'FixedBaseTable',
+    'Group',
+    'GroupParams',
+    'MemberList',
+    'MerkleAccumulator',
+    'RangeProof',
+    'SchnorrTranscript',
+    'SigmaProtocol',
+    'Step',
+    'available_params',
+    'batch_verify',
+    'commit',
+    'commitment_pool',
+    'drain_steps',
+    'fixed_base_table',
+    'fs_challenge',
+    'fs_prove',
+    'fs_verify',
+    'get_params',
+    'member_tree',
+    'multi_exp',
+    'parse_int',
+    'pippenger',
+    'prove_range',
+    'register_params',
+    'straus',
+    'verify_path',
+    'verify_range',
+    'verify_transcript',
+]
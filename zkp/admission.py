@@ -0,0 +1,257 @@
+"""
+Admission control for CPU-bound demo requests.
+
+Every proof request costs modular exponentiations, so a burst of them with
+large parameters can occupy every core and make all requests slow at once.
+AdmissionController decides up front, in microseconds, whether a request
+may run:
+
+- a token bucket per client (rate requests per second, bursts of up to
+  burst) stops one client from taking the whole server.  Buckets live in a
+  bounded LRU table; an evicted client just starts again with a full bucket.
+- a global concurrency cap, sized to the proof worker pool, bounds the
+  modexp work in flight.  Up to queue further requests wait at most
+  max_wait seconds for a slot; beyond that they are refused at once.
+
+A refused request raises Overloaded with a Retry-After estimate: the time
+until the client's bucket holds a token, or the mean time a slot is held
+times the number of requests ahead.  Rejection is cheap, so under overload
+admitted requests keep their normal latency and the rest fail fast.
+
+The controller is configured from ZKP_RATE_LIMIT, ZKP_RATE_BURST,
+ZKP_MAX_CONCURRENT, ZKP_ADMISSION_QUEUE and ZKP_ADMISSION_WAIT; 0 turns the
+rate limit or the cap off.  State is per process.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from zkp.executor import DEFAULT_QUEUE_PER_WORKER, proof_executor
+
+
+RATE_LIMIT_ENV = 'ZKP_RATE_LIMIT'
+RATE_BURST_ENV = 'ZKP_RATE_BURST'
+MAX_CONCURRENT_ENV = 'ZKP_MAX_CONCURRENT'
+QUEUE_ENV = 'ZKP_ADMISSION_QUEUE'
+MAX_WAIT_ENV = 'ZKP_ADMISSION_WAIT'
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_MAX_WAIT = 1.0
+DEFAULT_MAX_CLIENTS = 10_000
+# Weight of the newest hold time in the running mean behind Retry-After
+HOLD_SMOOTHING = 0.2
+
+
+class Overloaded(RuntimeError):
+    """A request was refused; reason is 'rate', 'busy' or 'timeout'."""
+
+    def __init__(self, reason, retry_after, message):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self):
+        """Retry-After in whole seconds, at least 1."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """Token buckets per client in a bounded LRU table."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_clients=DEFAULT_MAX_CLIENTS,
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        # client -> [tokens, time of last update]
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, client):
+        """Spend one token: 0 if there was one, else seconds until there will be."""
+        with self._lock:
+            now = self.clock()
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [self.burst, now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+class Slot:
+    """An admitted request's hold on the concurrency cap; release() it when done."""
+
+    def __init__(self, limit, waited):
+        self.waited = waited
+        self._limit = limit
+        self._acquired = time.monotonic()
+
+    def release(self):
+        limit, self._limit = self._limit, None
+        if limit is not None:
+            limit.release(time.monotonic() - self._acquired)
+
+
+class ConcurrencyLimit:
+    """At most limit requests running and queue more waiting up to max_wait seconds."""
+
+    def __init__(self, limit, queue=None, max_wait=DEFAULT_MAX_WAIT):
+        self.limit = limit
+        self.queue = limit * DEFAULT_QUEUE_PER_WORKER if queue is None else queue
+        self.max_wait = max_wait
+        self.running = 0
+        self.waiting = 0
+        self.mean_hold = 0.0
+        self._cond = threading.Condition()
+
+    def _retry_after(self):
+        return self.mean_hold * (self.waiting + 1) / self.limit
+
+    def acquire(self):
+        """A Slot, waiting for one if needed; Overloaded if none frees up in time."""
+        start = time.monotonic()
+        with self._cond:
+            if self.running < self.limit and not self.waiting:
+                self.running += 1
+                return Slot(self, 0.0)
+            if self.waiting >= self.queue:
+                raise Overloaded('busy', self._retry_after(),
+                                 f'{self.running} proofs running and {self.waiting} waiting')
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self.running < self.limit, self.max_wait)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                raise Overloaded('timeout', self._retry_after(),
+                                 f'No proof slot freed up within {self.max_wait:g}s')
+            self.running += 1
+            return Slot(self, time.monotonic() - start)
+
+    def release(self, held):
+        with self._cond:
+            self.running -= 1
+            self.mean_hold += HOLD_SMOOTHING * (held - self.mean_hold)
+            self._cond.notify()
+
+    def _reset_after_fork(self):
+        self.running = self.waiting = 0
+        self._cond = threading.Condition()
+
+
+class AdmissionController:
+    """Per-client rate limit, then the global concurrency cap; either may be None (off)."""
+
+    def __init__(self, rate_limiter=None, concurrency=None):
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.admitted = 0
+        self.rejected = {'rate': 0, 'busy': 0, 'timeout': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, reason=None):
+        with self._lock:
+            if reason is None:
+                self.admitted += 1
+            else:
+                self.rejected[reason] += 1
+
+    def admit(self, client):
+        """A Slot for the request, or Overloaded if it must be refused."""
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.take(client)
+            if wait:
+                self._count('rate')
+                raise Overloaded('rate', wait, 'Too many requests, please slow down')
+        try:
+            slot = Slot(None, 0.0) if self.concurrency is None else self.concurrency.acquire()
+        except Overloaded as e:
+            self._count(e.reason)
+            raise
+        self._count()
+        return slot
+
+    def depth(self):
+        """(running, waiting) requests under the concurrency cap."""
+        if self.concurrency is None:
+            return 0, 0
+        return self.concurrency.running, self.concurrency.waiting
+
+    def stats(self):
+        running, waiting = self.depth()
+        return {
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected),
+            'running': running,
+            'waiting': waiting,
+            'limit': self.concurrency.limit if self.concurrency else None,
+            'clients': len(self.rate_limiter) if self.rate_limiter else 0,
+        }
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        for part in (self.rate_limiter, self.concurrency):
+            if part is not None:
+                part._reset_after_fork()
+
+
+def _default_limit():
+    # One running proof per worker process, or per core when proofs run inline
+    executor = proof_executor()
+    return executor.max_workers if executor is not None else os.cpu_count() or 1
+
+
+def admission_controller_from_env():
+    rate = float(os.environ.get(RATE_LIMIT_ENV, DEFAULT_RATE))
+    burst = float(os.environ.get(RATE_BURST_ENV, DEFAULT_BURST))
+    limit = os.environ.get(MAX_CONCURRENT_ENV, '').strip()
+    limit = int(limit) if limit else _default_limit()
+    queue = os.environ.get(QUEUE_ENV, '').strip()
+    return AdmissionController(
+        RateLimiter(rate, burst) if rate > 0 else None,
+        ConcurrencyLimit(limit, int(queue) if queue else None,
+                         float(os.environ.get(MAX_WAIT_ENV, DEFAULT_MAX_WAIT))) if limit > 0 else None)
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def admission_controller():
+    """The process's shared AdmissionController, configured from the environment on first use."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = admission_controller_from_env()
+    return _controller
+
+
+def _after_fork_in_child():
+    global _controller_lock
+    _controller_lock = threading.Lock()
+    if _controller is not None:
+        _controller._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,105 @@
+"""
+Big-integer arithmetic backend.
+
+Modular exponentiation and multiplication of 2048- and 3072-bit integers
+are the hot path of every proof.  CPython's int is portable but slow at
+these sizes; gmpy2 wraps GMP and does the same work several times faster.
+When gmpy2 is importable it is used automatically, otherwise everything
+runs on built-in ints.  ZKP_BACKEND forces a choice: 'python', 'gmpy2'
+(an error if it is not installed) or 'auto' (the default).
+
+Values handed to a backend may be plain ints; results of the hot loops
+are backend numbers (mpz for gmpy2) and are converted back with to_int()
+before they leave the zkp package, so JSON encoding and hex() keep
+working on plain ints.
+"""
+
+import os
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+BACKEND_ENV = 'ZKP_BACKEND'
+
+
+class PythonBackend:
+    """Built-in int arithmetic."""
+
+    name = 'python'
+
+    @staticmethod
+    def mpz(value):
+        return value
+
+    @staticmethod
+    def to_int(value):
+        return value
+
+    powmod = staticmethod(pow)
+
+    @staticmethod
+    def invert(value, modulus):
+        return pow(value, -1, modulus)
+
+    @staticmethod
+    def jacobi(value, modulus):
+        """Jacobi symbol (value / modulus) for an odd modulus, by quadratic reciprocity."""
+        a, n = value % modulus, modulus
+        result = 1
+        while a:
+            zeros = (a & -a).bit_length() - 1
+            a >>= zeros
+            if zeros & 1 and n & 7 in (3, 5):
+                result = -result
+            if a & 3 == 3 and n & 3 == 3:
+                result = -result
+            a, n = n % a, a
+        return result if n == 1 else 0
+
+
+class Gmpy2Backend:
+    """GMP arithmetic through gmpy2."""
+
+    name = 'gmpy2'
+
+    def __init__(self):
+        if gmpy2 is None:
+            raise ImportError('the gmpy2 backend needs the gmpy2 package (pip install gmpy2)')
+        self.mpz = gmpy2.mpz
+        self.to_int = int
+        self.powmod = gmpy2.powmod
+        self.invert = gmpy2.invert
+        self.jacobi = gmpy2.jacobi
+
+
+BACKENDS = {
+    'python': PythonBackend,
+    'gmpy2': Gmpy2Backend,
+}
+
+
+def available_backends():
+    """Names of the backends usable in this interpreter."""
+    return ['python'] + (['gmpy2'] if gmpy2 is not None else [])
+
+
+def get_backend(name=None):
+    """
+    Return a backend instance by name.  With no name, ZKP_BACKEND decides,
+    and 'auto' picks gmpy2 when it is installed.
+    """
+    if name is None:
+        name = os.environ.get(BACKEND_ENV, 'auto').strip().lower() or 'auto'
+    if name == 'auto':
+        name = 'gmpy2' if gmpy2 is not None else 'python'
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown arithmetic backend: {name}') from None
+
+
+# The process-wide default, fixed at import time
+backend = get_backend()
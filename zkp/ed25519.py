@@ -0,0 +1,323 @@
+"""
+Ed25519 group backend in pure Python.
+
+Elements are points of the twisted Edwards curve -x^2 + y^2 = 1 + d x^2 y^2
+over GF(2^255 - 19), kept in extended coordinates (X:Y:Z:T) with
+x = X/Z, y = Y/Z, xy = T/Z so additions need no inversions.  The group used
+for proofs is the prime-order subgroup of order L generated by the standard
+base point, with the usual 32-byte Ed25519 point encoding on the wire.
+Points decoded from clients must pass contains() before use, since the full
+curve group has a cofactor of 8.
+
+The generator uses a windowed fixed-base table stored in affine
+(y + x, y - x, 2dxy) form; arbitrary points use width-5 wNAF; products of
+several points go through the shared Straus/Pippenger engine.
+"""
+
+from functools import cached_property
+
+from zkp.backend import backend
+from zkp.groups import Group
+from zkp.multiexp import multi_exp_generic
+from zkp.precomputed import load_rows
+
+
+P = 2 ** 255 - 19
+L = 2 ** 252 + 27742317777372353535851937790883648493
+D = -121665 * pow(121666, -1, P) % P
+D2 = 2 * D % P
+SQRT_M1 = pow(2, (P - 1) // 4, P)
+
+
+class EdwardsPoint:
+    """A curve point in extended coordinates."""
+
+    __slots__ = ('X', 'Y', 'Z', 'T')
+
+    def __init__(self, X, Y, Z, T):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+        self.T = T
+
+    def __eq__(self, other):
+        if not isinstance(other, EdwardsPoint):
+            return NotImplemented
+        return ((self.X * other.Z - other.X * self.Z) % P == 0
+                and (self.Y * other.Z - other.Y * self.Z) % P == 0)
+
+    def __hash__(self):
+        return hash(encode_point(self))
+
+    def __str__(self):
+        return encode_point(self).hex()
+
+    def __repr__(self):
+        return f'EdwardsPoint({self})'
+
+
+IDENTITY = EdwardsPoint(0, 1, 1, 0)
+
+
+def point_add(a, b):
+    """Unified addition (add-2008-hwcd-3), complete on Ed25519."""
+    A = (a.Y - a.X) * (b.Y - b.X) % P
+    B = (a.Y + a.X) * (b.Y + b.X) % P
+    C = a.T * D2 * b.T % P
+    Dz = 2 * a.Z * b.Z % P
+    E, F, G, H = B - A, Dz - C, Dz + C, B + A
+    return EdwardsPoint(E * F % P, G * H % P, F * G % P, E * H % P)
+
+
+def point_double(a):
+    """Doubling (dbl-2008-hwcd) for a = -1."""
+    A = a.X * a.X % P
+    B = a.Y * a.Y % P
+    C = 2 * a.Z * a.Z % P
+    H = A + B
+    E = H - (a.X + a.Y) * (a.X + a.Y) % P
+    G = A - B
+    F = C + G
+    return EdwardsPoint(E * F % P, G * H % P, F * G % P, E * H % P)
+
+
+def point_neg(a):
+    return EdwardsPoint(-a.X % P, a.Y, a.Z, -a.T % P)
+
+
+def _add_affine(a, ypx, ymx, t2d):
+    """Add a precomputed affine point given as (y + x, y - x, 2dxy)."""
+    A = (a.Y - a.X) * ymx % P
+    B = (a.Y + a.X) * ypx % P
+    C = a.T * t2d % P
+    Dz = 2 * a.Z % P
+    E, F, G, H = B - A, Dz - C, Dz + C, B + A
+    return EdwardsPoint(E * F % P, G * H % P, F * G % P, E * H % P)
+
+
+def is_on_curve(a):
+    if not (a.Z % P):
+        return False
+    X2, Y2, Z2 = a.X * a.X % P, a.Y * a.Y % P, a.Z * a.Z % P
+    on_curve = (Y2 - X2) * Z2 % P == (Z2 * Z2 + D * X2 * Y2) % P
+    return on_curve and a.X * a.Y % P == a.Z * a.T % P
+
+
+def _wnaf(k, width):
+    digits = []
+    half, full = 1 << (width - 1), 1 << width
+    while k:
+        if k & 1:
+            digit = k & (full - 1)
+            if digit >= half:
+                digit -= full
+            k -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        k >>= 1
+    return digits
+
+
+def scalar_mult(point, k, width=5):
+    """k * point with width-w NAF; k is not reduced, so any curve point works."""
+    if k < 0:
+        point, k = point_neg(point), -k
+    if not k:
+        return IDENTITY
+
+    odd = [point]
+    twice = point_double(point)
+    for _ in range((1 << (width - 2)) - 1):
+        odd.append(point_add(odd[-1], twice))
+    negated = [point_neg(x) for x in odd]
+
+    result = None
+    for digit in reversed(_wnaf(k, width)):
+        if result is not None:
+            result = point_double(result)
+        if digit:
+            addend = odd[digit >> 1] if digit > 0 else negated[-digit >> 1]
+            result = addend if result is None else point_add(result, addend)
+    return result
+
+
+def encode_point(a):
+    zi = backend.to_int(backend.invert(a.Z, P))
+    x, y = a.X * zi % P, a.Y * zi % P
+    return (y | (x & 1) << 255).to_bytes(32, 'little')
+
+
+def _recover_x(y, sign):
+    if y >= P:
+        return None
+    x2 = (y * y - 1) * backend.to_int(backend.invert(D * y * y + 1, P)) % P
+    if x2 == 0:
+        return None if sign else 0
+    x = backend.to_int(backend.powmod(x2, (P + 3) // 8, P))
+    if (x * x - x2) % P:
+        x = x * SQRT_M1 % P
+    if (x * x - x2) % P:
+        return None
+    if x & 1 != sign:
+        x = P - x
+    return x
+
+
+def decode_point(data):
+    """Decode a 32-byte encoding, raising ValueError if it is not a curve point."""
+    if len(data) != 32:
+        raise ValueError('Point encoding must be 32 bytes')
+    value = int.from_bytes(data, 'little')
+    y, sign = value & ((1 << 255) - 1), value >> 255
+    x = _recover_x(y, sign)
+    if x is None:
+        raise ValueError('Invalid point encoding')
+    return EdwardsPoint(x, y, 1, x * y % P)
+
+
+_BASE_Y = 4 * pow(5, -1, P) % P
+_BASE_X = _recover_x(_BASE_Y, 0)
+BASE = EdwardsPoint(_BASE_X, _BASE_Y, 1, _BASE_X * _BASE_Y % P)
+
+
+class FixedBaseEdwardsTable:
+    """Windowed multiples d * 2^(w*i) * B in affine form, for one base point B."""
+
+    def __init__(self, point, bits=253, window=8):
+        self.window = window
+        self.rows = []
+        start = point
+        for _ in range(-(-bits // window)):
+            row = [start]
+            for _ in range(2, 1 << window):
+                row.append(point_add(row[-1], start))
+            start = point_add(row[-1], start)
+            self.rows.append(_to_affine_niels(row))
+
+    @classmethod
+    def from_rows(cls, window, rows):
+        """
+        A table from rows computed earlier: sequences or mappings of
+        digit - 1 to (y + x, y - x, 2dxy) (see entries() and zkp.precomputed).
+        """
+        table = cls.__new__(cls)
+        table.window = window
+        table.rows = rows
+        return table
+
+    def load(self):
+        """Decode any rows still mapped lazily from a build-time artifact."""
+        for row in self.rows:
+            if hasattr(row, 'load'):
+                row.load()
+        return self
+
+    def entries(self):
+        """The rows with each entry's three coordinates flattened, for storing."""
+        return [[v for d in range((1 << self.window) - 1) for v in row[d]] for row in self.rows]
+
+    def mul(self, k):
+        k %= L
+        mask = (1 << self.window) - 1
+        result = IDENTITY
+        for row in self.rows:
+            if not k:
+                break
+            digit = k & mask
+            if digit:
+                result = _add_affine(result, *row[digit - 1])
+            k >>= self.window
+        return result
+
+
+def _to_affine_niels(points):
+    """Normalise a row with one shared inversion (Montgomery's trick)."""
+    prefix = [1]
+    for pt in points:
+        prefix.append(prefix[-1] * pt.Z % P)
+    inverse = backend.to_int(backend.invert(prefix[-1], P))
+    out = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        zi = inverse * prefix[i] % P
+        inverse = inverse * points[i].Z % P
+        x, y = points[i].X * zi % P, points[i].Y * zi % P
+        out[i] = ((y + x) % P, (y - x) % P, x * y % P * D2 % P)
+    return out
+
+
+class Ed25519Group(Group):
+    """Prime-order subgroup of Ed25519 generated by the standard base point."""
+
+    # contains() is a full scalar multiplication by L; three doublings clear the cofactor 8
+    cofactored = True
+
+    def __init__(self, name='ed25519', description='Ed25519 prime-order subgroup (pure Python)'):
+        self.name = name
+        self.description = description
+        self.q = L
+        self.g = BASE
+        self.prime_order = True
+
+    @cached_property
+    def table(self):
+        stored = load_rows(self, size=3)
+        return FixedBaseEdwardsTable(BASE) if stored is None else FixedBaseEdwardsTable.from_rows(*stored)
+
+    def base_exp(self, k):
+        return self.table.mul(k)
+
+    def exp(self, element, k):
+        return scalar_mult(element, k)
+
+    def mul(self, a, b):
+        return point_add(a, b)
+
+    def multi_exp(self, pairs, base_exponent=0):
+        # exponents are reduced mod L, so elements must lie in the subgroup
+        result = self.base_exp(base_exponent)
+        terms = [(element, e % L) for element, e in pairs if e % L]
+        if len(terms) == 1:
+            return point_add(result, scalar_mult(*terms[0]))
+        product = multi_exp_generic(terms, point_add, point_double)
+        return result if product is None else point_add(result, product)
+
+    def identity(self):
+        return IDENTITY
+
+    def is_canonical(self, element):
+        return isinstance(element, EdwardsPoint) and is_on_curve(element)
+
+    def contains(self, element):
+        return self.is_canonical(element) and scalar_mult(element, L) == IDENTITY
+
+    def clear_cofactor(self, element):
+        return point_double(point_double(point_double(element)))
+
+    def encode(self, element):
+        return encode_point(element)
+
+    def to_wire(self, element):
+        return encode_point(element).hex()
+
+    def from_wire(self, value):
+        if isinstance(value, EdwardsPoint):
+            return value
+        return decode_point(bytes.fromhex(str(value)))
+
+    def hash_to_element(self, label):
+        # try-and-increment on encodings, then clear the cofactor 8
+        counter = 0
+        while True:
+            try:
+                point = decode_point(self._label_digest(label, counter, 32))
+            except ValueError:
+                point = None
+            if point is not None:
+                point = self.clear_cofactor(point)
+                if point != IDENTITY:
+                    return point
+            counter += 1
+
+    def summary(self):
+        return f'{self.name} (Edwards curve over 2^255-19, q: {self.q_bits}-bit)'
@@ -0,0 +1,180 @@
+"""
+Process-pool execution of CPU-bound proof jobs.
+
+The proof functions spend nearly all their time in modular exponentiation,
+which holds the GIL, so a threaded server runs them one at a time however
+many cores it has.  ProofExecutor hands whole jobs to a ProcessPoolExecutor
+instead.  Each worker builds the fixed-base tables and commitment pools of
+the configured parameter sets once, in its initializer, and keeps them for
+its lifetime.
+
+Admission is bounded: at most max_pending jobs may be queued or running,
+and submit() raises ExecutorBusy beyond that instead of letting the queue
+grow without limit.  run() waits at most the job timeout.  A job that has
+already started cannot be interrupted, so it keeps its slot until it
+finishes; the caller just stops waiting for it.
+
+The executor is opt-in through ZKP_WORKERS (a process count, or 'auto' for
+one per CPU); without it run_job() calls the function inline.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from zkp.nonce_pool import commitment_pool
+from zkp.params import get_params
+
+
+WORKERS_ENV = 'ZKP_WORKERS'
+MAX_PENDING_ENV = 'ZKP_WORKER_QUEUE'
+TIMEOUT_ENV = 'ZKP_JOB_TIMEOUT'
+DEFAULT_JOB_TIMEOUT = 30.0
+# Queued jobs allowed per worker before new ones are refused
+DEFAULT_QUEUE_PER_WORKER = 4
+
+
+class ExecutorBusy(RuntimeError):
+    """The executor already holds its maximum number of pending jobs."""
+
+
+class JobTimeout(TimeoutError):
+    """A job did not finish within its timeout."""
+
+
+def _warm_worker(param_names):
+    """Worker initializer: build tables and start commitment pools up front."""
+    for name in param_names:
+        params = get_params(name)
+        params.base_exp(1)
+        commitment_pool(params)
+
+
+def _worker_pid(hold):
+    # holding each ping briefly makes concurrent pings land on distinct workers
+    time.sleep(hold)
+    return os.getpid()
+
+
+class ProofExecutor:
+    """A bounded process pool for proof jobs."""
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=DEFAULT_JOB_TIMEOUT, params=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = (self.max_workers * DEFAULT_QUEUE_PER_WORKER
+                            if max_pending is None else max_pending)
+        self.timeout = timeout
+        self.param_names = tuple(params) if params else (get_params().name,)
+
+        # Imported here: multiprocessing costs a cold start ~10 ms that inline mode never needs
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            self.max_workers, initializer=_warm_worker, initargs=(self.param_names,))
+
+        self.pending = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def warm(self):
+        """Start every worker and wait for their initializers; returns the worker pids."""
+        futures = [self._executor.submit(_worker_pid, 0.05) for _ in range(self.max_workers)]
+        return sorted({f.result() for f in futures})
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) in a worker, or raise ExecutorBusy if the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorBusy(f'{self.max_pending} proof jobs already pending')
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.pending += 1
+            self.submitted += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """Run fn in a worker and return its result, raising JobTimeout after the timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise JobTimeout(f'proof job did not finish within {timeout:g}s') from None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+        }
+
+
+def _workers_from_env():
+    value = os.environ.get(WORKERS_ENV, '').strip().lower()
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return int(value) if value else 0
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def proof_executor():
+    """The process's shared ProofExecutor, or None when ZKP_WORKERS is unset or 0."""
+    global _executor
+    if _executor is None:
+        workers = _workers_from_env()
+        if workers <= 0:
+            return None
+        with _executor_lock:
+            if _executor is None:
+                max_pending = os.environ.get(MAX_PENDING_ENV)
+                _executor = ProofExecutor(
+                    workers,
+                    max_pending=int(max_pending) if max_pending else None,
+                    timeout=float(os.environ.get(TIMEOUT_ENV, DEFAULT_JOB_TIMEOUT)))
+    return _executor
+
+
+def run_job(fn, *args):
+    """Run fn(*args) on the shared executor if one is configured, otherwise inline."""
+    executor = proof_executor()
+    if executor is None:
+        return fn(*args)
+    return executor.run(fn, *args)
+
+
+def _after_fork_in_child():
+    # a forked child cannot use the parent's pool; it creates its own on demand
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,51 @@
+"""
+Non-interactive Schnorr proofs via the Fiat-Shamir transform.
+
+The verifier's random challenge is replaced by a hash of the transcript:
+the parameter set, the statement (public key), the prover's commitment and
+a caller-chosen context string that binds the proof to one use, such as a
+demo name.  A proof is just (commitment, response) and is checked with the
+single equation g^s * y^-e == t in whichever group the parameter set names.
+"""
+
+import hashlib
+
+from zkp.params import get_params
+
+
+DOMAIN = b'zkp-demo/fiat-shamir/v1'
+
+
+def fs_challenge(public_key, commitment, params=None, context=''):
+    """Derive the challenge e in [0, q) from the hashed transcript."""
+    params = get_params(params)
+    context = context.encode() if isinstance(context, str) else context
+
+    h = hashlib.shake_256()
+    for part in (DOMAIN, params.name.encode(), context, params.encode(params.g),
+                 params.encode(public_key), params.encode(commitment)):
+        h.update(len(part).to_bytes(4, 'big'))
+        h.update(part)
+
+    # 128 extra bits keep the reduction mod q statistically uniform
+    digest = h.digest((params.q_bits + 128 + 7) // 8)
+    return int.from_bytes(digest, 'big') % params.q
+
+
+def fs_prove(secret, public_key, params=None, context=''):
+    """Produce a proof (t, s) of knowledge of secret = log_g(public_key)."""
+    params = get_params(params)
+    k = params.random_scalar()
+    t = params.base_exp(k)
+    e = fs_challenge(public_key, t, params, context)
+    return t, (k + e * secret) % params.q
+
+
+def fs_verify(public_key, proof, params=None, context=''):
+    """Check a proof (t, s) against the public key with one equation."""
+    params = get_params(params)
+    t, s = proof
+    if not (params.is_canonical(t) and params.is_canonical(public_key) and 0 <= s < params.q):
+        return False
+    e = fs_challenge(public_key, t, params, context)
+    return params.multi_exp([(public_key, -e)], s) == t
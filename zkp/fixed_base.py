@@ -0,0 +1,114 @@
+"""
+Fixed-base exponentiation.
+
+Every proof round raises the same generator g to fresh exponents, so the
+powers g^(d * 2^(w*i)) are precomputed once per parameter set and each
+exponentiation becomes one multiplication per w-bit window of the
+exponent, with no squarings at all.  Rows are stored as numbers of the
+arithmetic backend (see zkp.backend), so with gmpy2 each of those
+multiplications runs in GMP.
+"""
+
+from functools import lru_cache
+
+from zkp.backend import backend as default_backend
+
+
+def default_window(exponent_bits):
+    """Pick a window width that keeps tables small for big exponents."""
+    if exponent_bits <= 32:
+        return 4
+    if exponent_bits <= 384:
+        return 8
+    return 6
+
+
+class FixedBaseTable:
+    """Windowed precomputation table for repeated powers of one base."""
+
+    __slots__ = ('base', 'modulus', 'order', 'bits', 'window', 'rows', 'backend')
+
+    def __init__(self, base, modulus, order=None, exponent_bits=None, window=None, backend=None):
+        if exponent_bits is None:
+            exponent_bits = (order if order else modulus).bit_length()
+        if window is None:
+            window = default_window(exponent_bits)
+
+        self.backend = backend = default_backend if backend is None else backend
+        self.base = backend.mpz(base % modulus)
+        self.modulus = modulus = backend.mpz(modulus)
+        self.order = order
+        self.window = window
+
+        windows = -(-exponent_bits // window)
+        self.bits = windows * window
+        self.rows = []
+
+        # rows[i][d] = base^(d * 2^(window*i)) mod modulus
+        b = self.base
+        for _ in range(windows):
+            row = [backend.mpz(1), b]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] * b % modulus)
+            self.rows.append(row)
+            b = row[-1] * b % modulus
+
+    @classmethod
+    def from_rows(cls, base, modulus, order, window, rows, backend=None):
+        """
+        A table from rows computed earlier: sequences or mappings of digit to
+        backend number (see entries() and zkp.precomputed).
+        """
+        table = cls.__new__(cls)
+        table.backend = backend = default_backend if backend is None else backend
+        table.base = backend.mpz(base % modulus)
+        table.modulus = backend.mpz(modulus)
+        table.order = order
+        table.window = window
+        table.bits = len(rows) * table.window
+        table.rows = rows
+        return table
+
+    def load(self):
+        """Decode any rows still mapped lazily from a build-time artifact."""
+        for row in self.rows:
+            if hasattr(row, 'load'):
+                row.load()
+        return self
+
+    def entries(self):
+        """The rows as lists of plain ints, for storing."""
+        return [[self.backend.to_int(row[d]) for d in range(1 << self.window)] for row in self.rows]
+
+    def pow(self, exponent):
+        """Return base^exponent mod modulus using the precomputed rows."""
+        return self.backend.to_int(self.raw_pow(exponent))
+
+    def raw_pow(self, exponent):
+        """Like pow() but the result stays a backend number."""
+        if self.order:
+            exponent %= self.order
+        if exponent < 0 or exponent >> self.bits:
+            return self.backend.powmod(self.base, exponent, self.modulus)
+
+        modulus = self.modulus
+        mask = (1 << self.window) - 1
+        result = self.rows[0][0]
+        for row in self.rows:
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % modulus
+            exponent >>= self.window
+        return result
+
+    def __repr__(self):
+        return (f'FixedBaseTable(modulus_bits={self.modulus.bit_length()}, '
+                f'exponent_bits={self.bits}, window={self.window})')
+
+
+@lru_cache(maxsize=None)
+def fixed_base_table(base, modulus, order=None):
+    """Return the shared table for (base, modulus), building it on first use."""
+    return FixedBaseTable(base, modulus, order)
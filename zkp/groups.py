@@ -0,0 +1,99 @@
+"""
+Abstract prime-order group interface.
+
+The proof code is written against this interface only: it raises the
+generator or arbitrary elements to scalars, multiplies elements, evaluates
+multi-exponentiations and serialises elements for hashing and JSON.
+Multiplicative groups mod p (zkp.params.GroupParams) and the Ed25519 curve
+(zkp.ed25519.Ed25519Group) implement it; the notation stays multiplicative
+(g^k, a * b) for both.
+"""
+
+import hashlib
+
+from zkp.rng import random_scalar
+
+
+HASH_TO_GROUP_DOMAIN = b'zkp-demo/hash-to-group/v1'
+
+
+class Group:
+    """A cyclic group of order q with a fixed generator g."""
+
+    name = None
+    q = None
+    # True when verification clears small-order components (clear_cofactor)
+    # instead of testing every element with contains()
+    cofactored = False
+
+    def base_exp(self, k):
+        """g^k using the group's fixed-base precomputation."""
+        raise NotImplementedError
+
+    def exp(self, element, k):
+        """element^k for an arbitrary element."""
+        raise NotImplementedError
+
+    def mul(self, a, b):
+        raise NotImplementedError
+
+    def multi_exp(self, pairs, base_exponent=0):
+        """g^base_exponent * prod element^exponent over (element, exponent) pairs."""
+        raise NotImplementedError
+
+    def identity(self):
+        raise NotImplementedError
+
+    def is_canonical(self, element):
+        """Cheap well-formedness check (range, on-curve), without a subgroup test."""
+        raise NotImplementedError
+
+    def contains(self, element):
+        """Whether element lies in the order-q subgroup generated by g."""
+        raise NotImplementedError
+
+    def clear_cofactor(self, element):
+        """element raised to the cofactor, which maps it into the order-q subgroup."""
+        raise NotImplementedError
+
+    def encode(self, element):
+        """Fixed-width byte encoding, used for hashing transcripts."""
+        raise NotImplementedError
+
+    def to_wire(self, element):
+        """JSON-friendly representation of an element."""
+        raise NotImplementedError
+
+    def from_wire(self, value):
+        """Parse the JSON representation produced by to_wire (or a client)."""
+        raise NotImplementedError
+
+    def hash_to_element(self, label):
+        """
+        A subgroup element derived from the label by hashing, so nobody
+        knows its discrete log to g (used for Pedersen and vector generators).
+        """
+        raise NotImplementedError
+
+    def _label_digest(self, label, counter, size):
+        """size bytes of SHAKE-256 over the group name, label and a retry counter."""
+        h = hashlib.shake_256()
+        for part in (HASH_TO_GROUP_DOMAIN, self.name.encode(), label, counter.to_bytes(4, 'big')):
+            h.update(len(part).to_bytes(4, 'big'))
+            h.update(part)
+        return h.digest(size)
+
+    def summary(self):
+        """Short human-readable description used in protocol transcripts."""
+        return self.name
+
+    @property
+    def q_bits(self):
+        return self.q.bit_length()
+
+    def random_scalar(self):
+        """Uniform non-zero scalar mod q."""
+        return random_scalar(self.q)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.name!r})'
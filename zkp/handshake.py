@@ -0,0 +1,121 @@
+"""
+Stateless interactive Schnorr handshakes.
+
+An interactive proof needs the verifier to remember its challenge between
+the prover's commitment and response.  Instead of keeping that in a
+session, the verifier signs it: /commit answers with a random challenge e
+and a token carrying the group, demo, public key, commitment, e and an
+expiry, MACed with HMAC-SHA256 under a key derived from the server
+secret.  /respond only needs the token and s; it checks the MAC and the
+expiry and then the usual g^s * y^-e == t.  Any instance that shares the
+secret can finish any handshake; the only state is the replay guard,
+which refuses a second accepted response for the same key and commitment
+while the token could still be live.
+
+A token is 'v1.<payload>.<mac>' with both parts base64url-encoded and the
+payload compact JSON.  The MAC covers the version and the payload.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from zkp.params import get_params, parse_int
+from zkp.replay import replay_guard
+from zkp.rng import randbits
+
+
+TOKEN_VERSION = 'v1'
+TOKEN_DOMAIN = b'zkp-demo/handshake/v1'
+CHALLENGE_TTL_ENV = 'ZKP_CHALLENGE_TTL'
+DEFAULT_CHALLENGE_TTL = 60
+
+
+class TokenError(ValueError):
+    """A handshake token is malformed, forged, expired or for another demo."""
+
+
+def handshake_key(secret):
+    """The token MAC key, derived from the server secret."""
+    secret = secret.encode() if isinstance(secret, str) else secret
+    return hmac.new(secret, TOKEN_DOMAIN, hashlib.sha256).digest()
+
+
+def challenge_ttl():
+    return int(os.environ.get(CHALLENGE_TTL_ENV, DEFAULT_CHALLENGE_TTL))
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _mac(key, signed):
+    return hmac.new(key, signed.encode(), hashlib.sha256).digest()
+
+
+def sign_token(key, payload):
+    body = f'{TOKEN_VERSION}.{_b64encode(json.dumps(payload, separators=(",", ":")).encode())}'
+    return f'{body}.{_b64encode(_mac(key, body))}'
+
+
+def open_token(key, token, now=None):
+    """The payload of a token with a valid MAC that has not expired; TokenError otherwise."""
+    try:
+        version, payload, mac = token.split('.')
+        valid = hmac.compare_digest(_mac(key, f'{version}.{payload}'), _b64decode(mac))
+    except (AttributeError, ValueError):
+        raise TokenError('Malformed challenge token') from None
+    if version != TOKEN_VERSION or not valid:
+        raise TokenError('Invalid challenge token')
+    payload = json.loads(_b64decode(payload))
+    if (time.time() if now is None else now) > payload['exp']:
+        raise TokenError('Challenge token expired')
+    return payload
+
+
+def issue_challenge(key, demo, public_key, commitment, params=None, context='', ttl=None):
+    """
+    Pick the challenge for a commitment and sign everything /respond will
+    need: (challenge, token, expiry time).
+    """
+    params = get_params(params)
+    e = params.random_scalar()
+    expires = int(time.time()) + (challenge_ttl() if ttl is None else ttl)
+    token = sign_token(key, {
+        'demo': demo,
+        'group': params.name,
+        'y': params.to_wire(public_key),
+        't': params.to_wire(commitment),
+        'e': hex(e),
+        'ctx': context,
+        'exp': expires,
+        # Distinguishes tokens for the same commitment issued in the same second
+        'nonce': _b64encode(randbits(96).to_bytes(12, 'big')),
+    })
+    return e, token, expires
+
+
+def finish_handshake(key, demo, token, response, now=None):
+    """
+    Check a response against a signed challenge: (valid, payload).
+    Raises TokenError when the token itself is not acceptable, including
+    a commitment that already completed a handshake.
+    """
+    payload = open_token(key, token, now)
+    if payload['demo'] != demo:
+        raise TokenError('Challenge token was issued for another demo')
+    params = get_params(payload['group'])
+    y, t = params.from_wire(payload['y']), params.from_wire(payload['t'])
+    e, s = parse_int(payload['e']), parse_int(response)
+    if not 0 <= s < params.q or params.multi_exp([(y, -e)], s) != t:
+        return False, payload
+    if not replay_guard().check_proof(params, f'{demo}.handshake', y, t):
+        raise TokenError('Commitment was already used')
+    return True, payload
@@ -0,0 +1,296 @@
+"""
+Group membership proofs over a cached set of member keys.
+
+Each member holds a secret key x and publishes y = g^x; the group is the
+Merkle root over the encoded public keys.  A membership proof hands the
+verifier one key, its O(log n) authentication path to the root and a
+Schnorr proof of knowledge of that key's secret, so proving and verifying
+cost the same for five members as for five hundred thousand.  The secret
+never leaves the prover, but the key and its leaf position do, and every
+member's key is public, so this mode shows the verifier which member is
+proving.
+
+The 'or' mode hides the key as well: a Cramer-Damgard-Schoenmakers
+OR-proof over every member's key shows knowledge of one of the secrets
+without saying which.  The prover simulates n - 1 Schnorr transcripts and
+answers one for real, and the Fiat-Shamir challenge forces the n
+challenges to sum to a hash of all commitments.  The verifier's n
+equations are batch-verified in one multi-exponentiation, so the cost is
+linear in the group size but with a small constant.
+
+The demo stands in for keys the members would generate themselves by
+deriving each x from the member's name under a private seed
+(ZKP_MEMBER_SEED, hex; random per process when unset).  Without the seed
+the public names say nothing about x; a derivation from the name alone
+would let anyone compute every secret and make the proofs vacuous.
+
+Trees are cached per parameter set and follow the member list
+incrementally: MemberList bumps a version on every change, so an
+unchanged list costs nothing to check and a changed one is diffed and
+applied as individual inserts and removals.
+"""
+
+import hashlib
+import os
+import threading
+from collections import namedtuple
+
+from zkp.merkle import MerkleAccumulator, verify_path
+from zkp.params import get_params
+from zkp.range_proof import Transcript
+from zkp.replay import replay_guard
+from zkp.schnorr import SchnorrTranscript, batch_verify
+from zkp.sigma import SigmaProtocol
+from zkp.steps import Step
+
+
+DOMAIN = b'zkp-demo/membership/v2'
+MEMBER_SEED_ENV = 'ZKP_MEMBER_SEED'
+SEED_BYTES = 32
+MODES = ('merkle', 'or')
+
+# One commitment, challenge and response per member key, in key-list order
+ORProof = namedtuple('ORProof', 'commitments challenges responses')
+
+
+class MemberList(list):
+    """A list of member names whose version changes whenever it is modified."""
+
+    version = 0
+
+    def _modified(self):
+        self.version += 1
+
+
+def _tracking(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args):
+        result = method(self, *args)
+        self._modified()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(MemberList, _name, _tracking(_name))
+
+
+def _member_seed():
+    value = os.environ.get(MEMBER_SEED_ENV, '').strip()
+    seed = bytes.fromhex(value) if value else os.urandom(SEED_BYTES)
+    # Fixed width keeps the seed and the name apart in the hash input
+    return hashlib.sha256(seed).digest()
+
+
+# Read once at import: forked workers keep it, so their trees agree
+_seed = _member_seed()
+
+
+def member_secret(member, params=None):
+    """The demo secret key of a member, derived from the name under the private seed."""
+    params = get_params(params)
+    digest = hashlib.shake_256(DOMAIN + _seed + member.encode()).digest((params.q_bits + 7) // 8 + 16)
+    return int.from_bytes(digest, 'big') % (params.q - 1) + 1
+
+
+class MemberTree:
+    """Public keys of a member list and the Merkle accumulator over them, for one group."""
+
+    def __init__(self, params=None):
+        self.params = get_params(params)
+        self.accumulator = MerkleAccumulator()
+        self._keys = {}
+        self._source = None
+        self._version = None
+        self._key_list = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, member):
+        return member in self._keys
+
+    @property
+    def root(self):
+        return self.accumulator.root
+
+    def public_key(self, member):
+        return self._keys[member]
+
+    def key_list(self):
+        """Every member's public key as a tuple, rebuilt only after the members change."""
+        keys = self._key_list
+        if keys is None:
+            with self._lock:
+                keys = self._key_list = tuple(self._keys.values())
+        return keys
+
+    def sync(self, members):
+        """Bring the tree in line with a member list, touching only what changed."""
+        version = getattr(members, 'version', None)
+        if members is self._source and version is not None and version == self._version:
+            return
+        with self._lock:
+            current = dict.fromkeys(members)
+            removed = self._keys.keys() - current.keys()
+            if len(removed) > len(current):
+                # Mostly a different list: rebuilding beats removing leaf by leaf
+                self._keys = {m: self._keys[m] for m in current if m in self._keys}
+                self.accumulator = MerkleAccumulator(self.params.encode(y) for y in self._keys.values())
+            else:
+                for member in removed:
+                    self.accumulator.remove(self.params.encode(self._keys.pop(member)))
+            added = [member for member in current if member not in self._keys]
+            keys = [self.params.base_exp(member_secret(member, self.params)) for member in added]
+            self._keys.update(zip(added, keys))
+            self.accumulator.update(self.params.encode(y) for y in keys)
+            if removed or added:
+                self._key_list = None
+            self._source, self._version = members, version
+
+    def path(self, member):
+        """(public key, root, MerklePath) for a member; KeyError if absent."""
+        y = self._keys[member]
+        return (y, *self.accumulator.path(self.params.encode(y)))
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self.accumulator._lock = threading.RLock()
+
+
+_trees = {}
+_trees_lock = threading.Lock()
+
+
+def member_tree(members, params=None):
+    """The shared tree for a parameter set, synced to members."""
+    params = get_params(params)
+    tree = _trees.get(params.name)
+    if tree is None:
+        with _trees_lock:
+            tree = _trees.get(params.name)
+            if tree is None:
+                tree = _trees[params.name] = MemberTree(params)
+    tree.sync(members)
+    return tree
+
+
+def membership_proof_steps(member, tree, rounds=3):
+    """
+    Prove that member's key is a leaf under the tree's root and that the
+    prover knows its secret, yielding a Step for each stage; returns the
+    verifier's verdict.
+    """
+    params = tree.params
+    y, root, path = tree.path(member)
+    yield Step('info', 'membership.root', len(tree), root.hex())
+    yield Step('info', 'membership.leaf', y, path.index)
+
+    valid = verify_path(root, params.encode(y), path)
+    yield Step('verification', 'membership.path', len(path.siblings))
+    if not valid:
+        yield Step('error', 'membership.path_invalid')
+        return False
+
+    protocol = SigmaProtocol('membership', params, rounds)
+    return (yield from protocol.steps(y, member_secret(member, params)))
+
+
+def _or_transcript(params, keys, context):
+    transcript = Transcript(params, 'membership/or-proof', context.encode())
+    transcript.elements(*keys)
+    return transcript
+
+
+def prove_or(keys, index, secret, params=None, context=''):
+    """CDS proof of knowledge of the secret of keys[index], hiding index."""
+    params = get_params(params)
+    q = params.q
+    commitments, challenges, responses = [], [], []
+    for i, y in enumerate(keys):
+        if i == index:
+            k = params.random_scalar()
+            commitments.append(params.base_exp(k))
+            challenges.append(0)
+            responses.append(0)
+        else:
+            # A simulated transcript: pick e and s first, then t = g^s * y^-e
+            e, s = params.random_scalar(), params.random_scalar()
+            commitments.append(params.multi_exp([(y, -e)], s))
+            challenges.append(e)
+            responses.append(s)
+
+    transcript = _or_transcript(params, keys, context)
+    transcript.elements(*commitments)
+    e = transcript.challenge()
+    challenges[index] = (e - sum(challenges)) % q
+    responses[index] = (k + challenges[index] * secret) % q
+    return ORProof(tuple(commitments), tuple(challenges), tuple(responses))
+
+
+def verify_or(keys, proof, params=None, context=''):
+    """Check a CDS proof: the challenges sum to the hash and all n transcripts verify together."""
+    params = get_params(params)
+    q = params.q
+    commitments, challenges, responses = proof
+    if not (len(keys) == len(commitments) == len(challenges) == len(responses) > 0):
+        return False
+    if not all(0 <= v < q for v in (*challenges, *responses)):
+        return False
+    transcript = _or_transcript(params, keys, context)
+    transcript.elements(*commitments)
+    if sum(challenges) % q != transcript.challenge():
+        return False
+    valid, _ = batch_verify([SchnorrTranscript(*t) for t in zip(keys, *proof)], params)
+    return valid
+
+
+def or_proof_size(proof, params=None):
+    """(group elements, scalars, bytes) of an OR-proof as sent over the wire."""
+    params = get_params(params)
+    elements, scalars = len(proof.commitments), 2 * len(proof.challenges)
+    return (elements, scalars,
+            elements * len(params.encode(params.g)) + scalars * ((params.q_bits + 7) // 8))
+
+
+def or_proof_steps(member, tree, context=''):
+    """
+    Prove knowledge of one member key's secret without revealing which,
+    yielding a Step for each stage; returns the verifier's verdict.
+    """
+    params = tree.params
+    keys = tree.key_list()
+    y = tree.public_key(member)
+    yield Step('info', 'membership.ring', len(keys))
+
+    yield Step('round', 'membership.round', round=1)
+    proof = prove_or(keys, keys.index(y), member_secret(member, params), params, context)
+    yield Step('step', 'membership.or_proof', len(keys) - 1)
+    yield Step('step', 'membership.or_size', *or_proof_size(proof, params))
+
+    valid = verify_or(keys, proof, params, context)
+    yield Step('verification', 'membership.or_check', len(keys))
+    if not valid:
+        yield Step('error', 'round.failed', round=1)
+        return False
+    if not replay_guard().check_proof(params, 'membership.or', *proof.commitments):
+        yield Step('error', 'round.replayed', round=1)
+        return False
+    yield Step('success', 'membership.passed', round=1)
+    return True
+
+
+def _after_fork_in_child():
+    global _trees_lock
+    _trees_lock = threading.Lock()
+    for tree in _trees.values():
+        tree._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,154 @@
+"""
+Merkle accumulator over a set of byte strings.
+
+The accumulator keeps every level of a binary hash tree, so adding or
+removing a leaf rehashes only the O(log n) nodes above it and a membership
+path is read straight out of the cached levels.  Leaves and internal nodes
+are hashed with different prefixes (RFC 6962 style) so a node can never be
+passed off as a leaf, and a missing right subtree of height d hashes to a
+fixed EMPTY[d].
+
+Removing a leaf moves the last leaf into its slot, so the root depends on
+the order of insertions and removals as well as on the set itself; it is
+the current root a verifier compares paths against.
+"""
+
+import hashlib
+import hmac
+import threading
+from collections import namedtuple
+
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+EMPTY_PREFIX = b'\x02'
+# Levels precomputed for empty subtrees; 2^64 leaves is more than enough
+MAX_DEPTH = 64
+
+
+def leaf_hash(data):
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _empty_hashes():
+    empty = [hashlib.sha256(EMPTY_PREFIX).digest()]
+    for _ in range(MAX_DEPTH):
+        empty.append(node_hash(empty[-1], empty[-1]))
+    return empty
+
+
+# EMPTY[d] is the hash of an empty subtree of height d
+EMPTY = _empty_hashes()
+
+# siblings run from the leaf level up to just below the root
+MerklePath = namedtuple('MerklePath', 'index siblings')
+
+
+def verify_path(root, data, path):
+    """Whether path leads from the leaf holding data to root."""
+    node, index = leaf_hash(data), path.index
+    for sibling in path.siblings:
+        node = node_hash(sibling, node) if index & 1 else node_hash(node, sibling)
+        index >>= 1
+    return index == 0 and hmac.compare_digest(node, root)
+
+
+class MerkleAccumulator:
+    """
+    A set of byte-string leaves with a Merkle root over them.
+
+    add(), remove() and path() cost O(log n) hashes; membership tests are a
+    dict lookup.  All methods are safe to call from several threads.
+    """
+
+    def __init__(self, leaves=()):
+        self._lock = threading.RLock()
+        # _levels[0] holds the leaf hashes, _levels[-1] the root
+        self._levels = [[]]
+        self._index = {}
+        self.update(leaves)
+
+    def __len__(self):
+        return len(self._levels[0])
+
+    def __contains__(self, data):
+        return leaf_hash(data) in self._index
+
+    @property
+    def depth(self):
+        return len(self._levels) - 1
+
+    @property
+    def root(self):
+        with self._lock:
+            return self._levels[-1][0] if self._levels[0] else EMPTY[0]
+
+    def add(self, data):
+        """Add a leaf (a no-op if it is already present) and return its index."""
+        return self.update([data])[0]
+
+    def update(self, leaves):
+        """Add many leaves, rehashing each affected node once; returns their indices."""
+        with self._lock:
+            hashes = self._levels[0]
+            first = len(hashes)
+            indices = []
+            for data in leaves:
+                digest = leaf_hash(data)
+                index = self._index.get(digest)
+                if index is None:
+                    index = self._index[digest] = len(hashes)
+                    hashes.append(digest)
+                indices.append(index)
+            self._rehash(range(first, len(hashes)))
+            return indices
+
+    def remove(self, data):
+        """Remove a leaf; KeyError if it is not present."""
+        with self._lock:
+            hashes = self._levels[0]
+            index = self._index.pop(leaf_hash(data))
+            last = hashes.pop()
+            dirty = {len(hashes)}
+            if index < len(hashes):
+                hashes[index] = last
+                self._index[last] = index
+                dirty.add(index)
+            self._rehash(dirty)
+
+    def path(self, data):
+        """(root, MerklePath) for a leaf, read atomically; KeyError if it is absent."""
+        with self._lock:
+            index = self._index[leaf_hash(data)]
+            siblings = []
+            position = index
+            for height, level in enumerate(self._levels[:-1]):
+                sibling = position ^ 1
+                siblings.append(level[sibling] if sibling < len(level) else EMPTY[height])
+                position >>= 1
+            return self.root, MerklePath(index, tuple(siblings))
+
+    def _rehash(self, dirty):
+        """Recompute the ancestors of the dirty leaf positions and resize the levels."""
+        count = len(self._levels[0])
+        depth = (count - 1).bit_length() if count > 1 else 0
+        del self._levels[depth + 1:]
+        while len(self._levels) <= depth:
+            self._levels.append([])
+
+        for height in range(depth):
+            below, above = self._levels[height], self._levels[height + 1]
+            count, previous = (len(below) + 1) // 2, len(above)
+            parents = {i // 2 for i in dirty if i // 2 < count}
+            del above[count:]
+            above.extend([None] * (count - previous))
+            empty = EMPTY[height]
+            for i in parents:
+                right = 2 * i + 1
+                above[i] = node_hash(below[2 * i], below[right] if right < len(below) else empty)
+            # Nodes that appeared (the tree grew) or vanished change their parents too
+            dirty = parents.union(range(min(count, previous), max(count, previous)))
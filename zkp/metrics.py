@@ -0,0 +1,172 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain dicts keyed by label values and guarded
+by one lock each, so recording a sample costs a dict lookup, a bisect and
+an addition; that is cheap enough to leave on for every request.  Values
+are per process: under a multi-worker server each worker reports its own
+series and the scraper sums them.
+"""
+
+import bisect
+import threading
+
+
+# Request latency buckets in seconds, from a toy group up to 3072-bit groups with many rounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{v}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing value per label combination."""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Gauge:
+    """A value that can go up and down, per label combination."""
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+
+
+class Histogram:
+    """Observations counted into cumulative buckets, per label combination."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        bounds = self.buckets + (float('inf'),)
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, [('le', _format_value(bound))])
+                yield f'{self.name}_bucket{le} {cumulative}'
+            label_text = _format_labels(self.labelnames, labels)
+            yield f'{self.name}_sum{label_text} {_format_value(total)}'
+            yield f'{self.name}_count{label_text} {cumulative}'
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'zkp_request_duration_seconds', 'Time to handle a demo request, by demo and endpoint',
+    ('demo', 'endpoint')))
+PHASE_SECONDS = REGISTRY.register(Counter(
+    'zkp_phase_seconds_total',
+    'Time spent per request phase: compute (protocol arithmetic, mostly modexp), '
+    'format (step messages) and serialize (JSON encoding)',
+    ('demo', 'phase')))
+ROUNDS = REGISTRY.register(Counter(
+    'zkp_rounds_total', 'Protocol rounds executed', ('demo',)))
+PROOFS = REGISTRY.register(Counter(
+    'zkp_proofs_total', 'Demo outcomes: success, failure (proof rejected), error (bad input), '
+    'rejected (worker queue full, bad challenge token or replayed proof), throttled '
+    '(refused by admission control) or timeout',
+    ('demo', 'endpoint', 'result')))
+ADMISSION_DEPTH = REGISTRY.register(Gauge(
+    'zkp_admission_requests', 'Requests holding a proof slot (running) or waiting for one (queued)',
+    ('state',)))
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    'zkp_admission_rejected_total',
+    'Requests refused with 429: rate (client over its token bucket), busy (queue full) '
+    'or timeout (no slot within the wait limit)',
+    ('reason',)))
+ADMISSION_WAIT_SECONDS = REGISTRY.register(Histogram(
+    'zkp_admission_wait_seconds', 'Time admitted requests waited for a proof slot'))
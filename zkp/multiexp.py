@@ -0,0 +1,171 @@
+"""
+Multi-exponentiation: prod base_i^exponent_i with one squaring chain.
+
+Straus (interleaved windows) precomputes a small table per base and wins
+for a handful of bases; Pippenger (bucket method) sorts bases into buckets
+per window digit and wins once there are dozens to thousands of bases.
+plan() picks whichever has the lower estimated multiplication count.
+
+The algorithms are written against two callables, mul(a, b) and
+square(a), with None standing for the identity, so the same code serves
+integers mod p and elliptic-curve points.  multi_exp() is the modular
+front end; bases given there as FixedBaseTable objects are evaluated from
+their tables, so fixed generators cost no squarings at all.
+"""
+
+from zkp.backend import backend as default_backend
+from zkp.fixed_base import FixedBaseTable
+
+
+# Estimated group multiplications, used to pick windows and algorithms
+
+def _straus_cost(count, bits, window):
+    precompute = count * ((1 << window) - 2)
+    nonzero = 1 - 1 / (1 << window)
+    return precompute + bits + count * -(-bits // window) * nonzero
+
+
+def _pippenger_cost(count, bits, window):
+    # the first base landing in each bucket is stored, not multiplied
+    buckets = 1 << window
+    per_window = count - min(count, buckets - 1) + 2 * buckets
+    return bits + -(-bits // window) * per_window
+
+
+def _best_window(cost, count, bits, limit):
+    return min(range(1, limit + 1), key=lambda w: cost(count, bits, w))
+
+
+def plan(count, bits):
+    """Return ('straus' | 'pippenger', window) for count bases of bits-bit exponents."""
+    straus_window = _best_window(_straus_cost, count, bits, 6)
+    pippenger_window = _best_window(_pippenger_cost, count, bits, 16)
+    if _straus_cost(count, bits, straus_window) <= _pippenger_cost(count, bits, pippenger_window):
+        return 'straus', straus_window
+    return 'pippenger', pippenger_window
+
+
+def _square_n(result, times, square):
+    if result is not None:
+        for _ in range(times):
+            result = square(result)
+    return result
+
+
+def straus_generic(pairs, mul, square, window):
+    """Interleaved fixed-window multi-exponentiation; None is the identity."""
+    size = 1 << window
+    mask = size - 1
+    tables = []
+    for base, _ in pairs:
+        row = [None, base]
+        for _ in range(2, size):
+            row.append(mul(row[-1], base))
+        tables.append(row)
+
+    bits = max(e.bit_length() for _, e in pairs)
+    result = None
+    for shift in range(-(-bits // window) * window - window, -1, -window):
+        result = _square_n(result, window, square)
+        for (_, e), row in zip(pairs, tables):
+            digit = (e >> shift) & mask
+            if digit:
+                result = row[digit] if result is None else mul(result, row[digit])
+    return result
+
+
+def pippenger_generic(pairs, mul, square, window):
+    """Bucket-method multi-exponentiation; None is the identity."""
+    mask = (1 << window) - 1
+    bits = max(e.bit_length() for _, e in pairs)
+
+    result = None
+    for shift in range(-(-bits // window) * window - window, -1, -window):
+        result = _square_n(result, window, square)
+
+        buckets = [None] * (mask + 1)
+        for base, e in pairs:
+            digit = (e >> shift) & mask
+            if digit:
+                bucket = buckets[digit]
+                buckets[digit] = base if bucket is None else mul(bucket, base)
+
+        # sum of digit * bucket[digit] as a running product from the top
+        running = total = None
+        for digit in range(mask, 0, -1):
+            bucket = buckets[digit]
+            if bucket is not None:
+                running = bucket if running is None else mul(running, bucket)
+            if running is not None:
+                total = running if total is None else mul(total, running)
+        if total is not None:
+            result = total if result is None else mul(result, total)
+    return result
+
+
+def multi_exp_generic(pairs, mul, square):
+    """Dispatch to Straus or Pippenger; pairs must have non-zero exponents."""
+    if not pairs:
+        return None
+    bits = max(e.bit_length() for _, e in pairs)
+    algorithm, window = plan(len(pairs), bits)
+    if algorithm == 'straus':
+        return straus_generic(pairs, mul, square, window)
+    return pippenger_generic(pairs, mul, square, window)
+
+
+def _modular_ops(modulus):
+    return (lambda a, b: a * b % modulus), (lambda a: a * a % modulus)
+
+
+def straus(pairs, modulus, window=None, backend=None):
+    """Straus multi-exponentiation of integers mod modulus."""
+    backend = default_backend if backend is None else backend
+    modulus = backend.mpz(modulus)
+    pairs = [(backend.mpz(b) % modulus, e) for b, e in pairs if e]
+    if not pairs:
+        return 1
+    if window is None:
+        window = _best_window(_straus_cost, len(pairs), max(e.bit_length() for _, e in pairs), 6)
+    result = straus_generic(pairs, *_modular_ops(modulus), window)
+    return 1 if result is None else backend.to_int(result)
+
+
+def pippenger(pairs, modulus, window=None, backend=None):
+    """Pippenger multi-exponentiation of integers mod modulus."""
+    backend = default_backend if backend is None else backend
+    modulus = backend.mpz(modulus)
+    pairs = [(backend.mpz(b) % modulus, e) for b, e in pairs if e]
+    if not pairs:
+        return 1
+    if window is None:
+        window = _best_window(_pippenger_cost, len(pairs), max(e.bit_length() for _, e in pairs), 16)
+    result = pippenger_generic(pairs, *_modular_ops(modulus), window)
+    return 1 if result is None else backend.to_int(result)
+
+
+def multi_exp(pairs, modulus, backend=None):
+    """
+    Return prod base^exponent mod modulus for (base, exponent) pairs.
+
+    Exponents must be non-negative.  A FixedBaseTable may stand in for a
+    base; it is evaluated from its precomputed rows.
+    """
+    backend = default_backend if backend is None else backend
+    modulus = backend.mpz(modulus)
+    result = backend.mpz(1)
+    variable = []
+    for base, e in pairs:
+        if not e:
+            continue
+        if isinstance(base, FixedBaseTable):
+            result = result * base.raw_pow(e) % modulus
+        else:
+            variable.append((backend.mpz(base), e))
+
+    if len(variable) == 1:
+        base, e = variable[0]
+        result = result * backend.powmod(base, e, modulus) % modulus
+    elif variable:
+        result = result * multi_exp_generic(variable, *_modular_ops(modulus)) % modulus
+    return backend.to_int(result)
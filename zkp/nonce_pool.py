@@ -0,0 +1,145 @@
+"""
+Pool of precomputed prover commitments.
+
+Each Schnorr round needs a fresh nonce k and its commitment g^k.  A
+background thread keeps a stock of (k, g^k) pairs between the low and high
+watermarks so the request path only pops one.  Pairs are handed out
+exactly once; an empty pool falls back to computing inline.
+
+The worker is a thread, so it shares the GIL with request handlers: it
+moves the modexp off request latency when the server has idle time, not
+off the CPU.  Pools are emptied in forked children, since a nonce that two
+processes both use would leak the secret.
+"""
+
+import os
+import threading
+from collections import deque
+
+from zkp.params import get_params
+
+
+POOL_SIZE_ENV = 'ZKP_COMMITMENT_POOL'
+DEFAULT_HIGH_WATERMARK = 256
+
+
+class CommitmentPool:
+    """Precomputed (k, g^k) pairs for one parameter set."""
+
+    def __init__(self, params=None, low_watermark=None, high_watermark=DEFAULT_HIGH_WATERMARK,
+                 start=True):
+        self.params = get_params(params)
+        self.high_watermark = high_watermark
+        self.low_watermark = high_watermark // 4 if low_watermark is None else low_watermark
+
+        self._pairs = deque()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stopped = False
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.refills = 0
+
+        if start and high_watermark > 0:
+            self.start()
+
+    def _make_pair(self):
+        k = self.params.random_scalar()
+        return k, self.params.base_exp(k)
+
+    def take(self):
+        """Return an unused (k, g^k) pair, computing one inline if the pool is dry."""
+        try:
+            pair = self._pairs.popleft()
+            self.hits += 1
+        except IndexError:
+            pair = self._make_pair()
+            self.misses += 1
+        if len(self._pairs) < self.low_watermark:
+            self._wakeup.set()
+        return pair
+
+    def fill(self, target=None):
+        """Top the pool up to target pairs (the high watermark by default)."""
+        target = self.high_watermark if target is None else target
+        added = 0
+        while len(self._pairs) < target and not self._stopped:
+            self._pairs.append(self._make_pair())
+            added += 1
+        self.generated += added
+        return added
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped:
+                break
+            if self.fill():
+                self.refills += 1
+
+    def start(self):
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stopped = False
+            self._worker = threading.Thread(
+                target=self._run, name=f'commitment-pool-{self.params.name}', daemon=True)
+            self._worker.start()
+            self._wakeup.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _reset_after_fork(self):
+        # pairs inherited from the parent must never be used twice
+        self._pairs.clear()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._worker = None
+        if not self._stopped and self.high_watermark > 0:
+            self.start()
+
+    def stats(self):
+        return {
+            'params': self.params.name,
+            'size': len(self._pairs),
+            'low_watermark': self.low_watermark,
+            'high_watermark': self.high_watermark,
+            'hits': self.hits,
+            'misses': self.misses,
+            'generated': self.generated,
+            'refills': self.refills,
+        }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def commitment_pool(params=None):
+    """Return the shared pool for a parameter set, starting it on first use."""
+    params = get_params(params)
+    pool = _pools.get(params.name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(params.name)
+            if pool is None:
+                size = int(os.environ.get(POOL_SIZE_ENV, DEFAULT_HIGH_WATERMARK))
+                pool = _pools[params.name] = CommitmentPool(params, high_watermark=size)
+    return pool
+
+
+def _after_fork_in_child():
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    for pool in _pools.values():
+        pool._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,311 @@
+"""
+Group parameter registry.
+
+Each parameter set is a Group (see zkp.groups): a multiplicative group
+mod p, named by the prime p, the order q of the subgroup used for exponents
+and a generator g of that subgroup, or an elliptic-curve group.  The
+deployment default comes from the ZKP_PARAMS environment variable and any
+request may pick another registered set by name.  Precomputed tables are
+cached per set.
+"""
+
+import os
+import random
+from functools import cached_property
+
+from zkp.backend import backend
+from zkp.fixed_base import FixedBaseTable, fixed_base_table
+from zkp.groups import Group
+from zkp.multiexp import multi_exp
+from zkp.precomputed import load_rows
+
+
+DEFAULT_PARAMS_ENV = 'ZKP_PARAMS'
+DEFAULT_PARAMS_NAME = 'schnorr-2048'
+
+_SMALL_PRIMES = [n for n in range(3, 1000, 2) if all(n % d for d in range(3, int(n ** 0.5) + 1, 2))]
+
+
+def is_probable_prime(n, rounds=40):
+    """Miller-Rabin primality test with trial division by small primes."""
+    if n < 2:
+        return False
+    if n % 2 == 0:
+        return n == 2
+    for sp in _SMALL_PRIMES:
+        if n % sp == 0:
+            return n == sp
+
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    rng = random.Random(n)
+    for _ in range(rounds):
+        x = pow(rng.randrange(2, n - 1), d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _hex(text):
+    return int(''.join(text.split()), 16)
+
+
+def parse_int(value):
+    """Accept big integers as JSON numbers or decimal / 0x-prefixed hex strings."""
+    if isinstance(value, int):
+        return value
+    return int(str(value), 0)
+
+
+class GroupParams(Group):
+    """Public parameters (p, q, g) of a discrete-log group mod p."""
+
+    def __init__(self, name, p, q, g, description='', prime_order=True):
+        self.name = name
+        self.p = p
+        self.q = q
+        self.g = g
+        self.description = description
+        self.prime_order = prime_order
+
+    @cached_property
+    def table(self):
+        """Fixed-base table for g, loaded from the build-time artifact or built once per parameter set."""
+        stored = load_rows(self, backend.mpz)
+        if stored is not None:
+            return FixedBaseTable.from_rows(self.g, self.p, self.q, *stored)
+        return fixed_base_table(self.g, self.p, self.q)
+
+    @property
+    def p_bits(self):
+        return self.p.bit_length()
+
+    def base_exp(self, k):
+        return self.table.pow(k)
+
+    def exp(self, element, k):
+        return backend.to_int(backend.powmod(element, k, self.p))
+
+    def mul(self, a, b):
+        return a * b % self.p
+
+    def multi_exp(self, pairs, base_exponent=0):
+        # exponents are reduced mod q, so elements must lie in the subgroup
+        q = self.q
+        terms = [(self.table, base_exponent % q)]
+        terms.extend((element, e % q) for element, e in pairs)
+        return multi_exp(terms, self.p)
+
+    def identity(self):
+        return 1
+
+    def is_canonical(self, element):
+        return isinstance(element, int) and 0 < element < self.p
+
+    def encode(self, element):
+        return element.to_bytes((self.p_bits + 7) // 8, 'big')
+
+    def to_wire(self, element):
+        return element
+
+    def from_wire(self, value):
+        return parse_int(value)
+
+    def clear_cofactor(self, element):
+        return self.exp(element, (self.p - 1) // self.q)
+
+    def hash_to_element(self, label):
+        # a uniform x mod p raised to the cofactor lands in the order-q subgroup
+        size = (self.p_bits + 7) // 8 + 16
+        counter = 0
+        while True:
+            x = int.from_bytes(self._label_digest(label, counter, size), 'big') % self.p
+            if x:
+                element = self.clear_cofactor(x)
+                if element != 1:
+                    return element
+            counter += 1
+
+    def validate(self):
+        """Raise ValueError unless g generates a subgroup of order q mod p."""
+        if not is_probable_prime(self.p):
+            raise ValueError(f'{self.name}: p is not prime')
+        if (self.p - 1) % self.q:
+            raise ValueError(f'{self.name}: q does not divide p - 1')
+        if self.prime_order and not is_probable_prime(self.q):
+            raise ValueError(f'{self.name}: q is not prime')
+        if not 1 < self.g < self.p or pow(self.g, self.q, self.p) != 1:
+            raise ValueError(f'{self.name}: g does not generate a subgroup of order q')
+        return True
+
+    def contains(self, element):
+        if not self.is_canonical(element):
+            return False
+        if self.p == 2 * self.q + 1:
+            # safe prime: the order-q subgroup is the quadratic residues
+            return backend.jacobi(element, self.p) == 1
+        return backend.powmod(element, self.q, self.p) == 1
+
+    def summary(self):
+        """Short human-readable description used in protocol transcripts."""
+        if self.p_bits <= 64:
+            return f'p={self.p}, g={self.g}, q={self.q}'
+        return f'{self.name} (p: {self.p_bits}-bit, q: {self.q_bits}-bit)'
+
+    def __repr__(self):
+        return f'GroupParams({self.name!r}, p_bits={self.p_bits}, q_bits={self.q_bits})'
+
+
+PARAMETER_SETS = {}
+
+
+def register_params(params):
+    """Add a parameter set to the registry, replacing one with the same name."""
+    PARAMETER_SETS[params.name] = params
+    return params
+
+
+def get_params(name=None):
+    """Look up a parameter set by name, defaulting to the deployment choice."""
+    if isinstance(name, Group):
+        return name
+    if not name:
+        name = os.environ.get(DEFAULT_PARAMS_ENV, DEFAULT_PARAMS_NAME)
+    try:
+        return PARAMETER_SETS[name]
+    except KeyError:
+        raise ValueError(f'Unknown parameter set: {name}') from None
+
+
+def available_params():
+    return sorted(PARAMETER_SETS)
+
+
+# Original teaching parameters: tiny, with composite exponent modulus q = p - 1
+register_params(GroupParams(
+    'demo-10007', 10007, 10006, 5,
+    description='Toy group for following the arithmetic by hand',
+    prime_order=False,
+))
+
+# RFC 3526 MODP groups: safe primes p = 2q + 1, g = 2 generates the order-q subgroup
+MODP_2048_P = _hex("""
+    FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+    020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+    4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+    EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+    98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+    9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA18217C 32905E46 2E36CE3B
+    E39E772C 180E8603 9B2783A2 EC07A28F B5C55DF0 6F4C52C9 DE2BCBF6 95581718
+    3995497C EA956AE5 15D22618 98FA0510 15728E5A 8AACAA68 FFFFFFFF FFFFFFFF
+""")
+
+MODP_3072_P = _hex("""
+    FFFFFFFF FFFFFFFF C90FDAA2 2168C234 C4C6628B 80DC1CD1 29024E08 8A67CC74
+    020BBEA6 3B139B22 514A0879 8E3404DD EF9519B3 CD3A431B 302B0A6D F25F1437
+    4FE1356D 6D51C245 E485B576 625E7EC6 F44C42E9 A637ED6B 0BFF5CB6 F406B7ED
+    EE386BFB 5A899FA5 AE9F2411 7C4B1FE6 49286651 ECE45B3D C2007CB8 A163BF05
+    98DA4836 1C55D39A 69163FA8 FD24CF5F 83655D23 DCA3AD96 1C62F356 208552BB
+    9ED52907 7096966D 670C354E 4ABC9804 F1746C08 CA18217C 32905E46 2E36CE3B
+    E39E772C 180E8603 9B2783A2 EC07A28F B5C55DF0 6F4C52C9 DE2BCBF6 95581718
+    3995497C EA956AE5 15D22618 98FA0510 15728E5A 8AAAC42D AD33170D 04507A33
+    A85521AB DF1CBA64 ECFB8504 58DBEF0A 8AEA7157 5D060C7D B3970F85 A6E1E4C7
+    ABF5AE8C DB0933D7 1E8C94E0 4A25619D CEE3D226 1AD2EE6B F12FFA06 D98A0864
+    D8760273 3EC86A64 521F2B18 177B200C BBE11757 7A615D6C 770988C0 BAD946E2
+    08E24FA0 74E5AB31 43DB5BFC E0FD108E 4B82D120 A93AD2CA FFFFFFFF FFFFFFFF
+""")
+
+register_params(GroupParams(
+    'modp-2048', MODP_2048_P, (MODP_2048_P - 1) // 2, 2,
+    description='RFC 3526 group 14 (2048-bit MODP)',
+))
+register_params(GroupParams(
+    'modp-3072', MODP_3072_P, (MODP_3072_P - 1) // 2, 2,
+    description='RFC 3526 group 15 (3072-bit MODP)',
+))
+
+# Prime-order Schnorr subgroups with 256-bit q, regenerated from a public
+# seed by scripts/gen_schnorr_group.py
+
+SCHNORR_2048_P = _hex("""
+    D3B0771A 4B58ADD6 DDEBFA81 5CD7C7C6 707C1D75 F83360FB E2921FE2 5AD716E4
+    98330E95 3E80919C C3CE042C EAE50BD7 C517152B 5A9BACF9 75B5109A 2D372847
+    E52E728F 31F937A1 351BEF58 B9C99A2F 4AE3A390 B92F70B6 7F42FB40 8CA102A1
+    45AA672A 5AA29D50 8B9E1177 75B9D31B 346F9608 A8D126BF 1352ABBD 64002600
+    BC40186F F2AC1D7E F2C73539 7517CD84 B0217776 9A241C72 40CA5271 EB28E2FC
+    E0688F4E 6E316E32 DAFDDAF0 912AD242 633565F8 0DF23322 0BC673D6 6B27BCFF
+    0E3B87C1 962D9429 F594D5F1 DE4870DC 63F71970 A222F902 F00CFE0D 1602D762
+    49AC2886 3D758CEC 4D11C96F B4DCC6D0 3E425CE1 E382A8E8 7870E024 5350CDD9
+""")
+
+SCHNORR_2048_Q = _hex("""
+    BFEEFFAE 7F185A56 C42A1755 A1D107FA 515DA541 024B152E 8170591D F1EB72FD
+""")
+
+SCHNORR_2048_G = _hex("""
+    9796DEBB 819EA31B B7E0FA9F 623C2067 71D447C6 950C8181 6263C33B 29DF198F
+    0E59518F D7DB937C 3D882243 ED02160F EBA25846 86CBB858 B26AE190 A5A054CC
+    0DAD669F C348356F D7358213 9AACAA49 6BA03B4C E423297E 23BAA791 5A001943
+    59620637 39DE9627 53FA8719 53141821 4B0959A4 68AE9DDF 150AAE16 A1C823BE
+    EAFBA225 B51F7278 4E7E4E21 568907C6 1BF4293E 17E0A0D9 65E471F8 671C7BF1
+    4D9AA542 E252EC0F 3741E77B A9D33499 1578670B 87D8F127 9B87FDB5 49E38366
+    D38003A7 C31B7F2D 8B3F5273 53DDE25A 10C3F87B 5CF4F287 7EED3DAB D9A7B034
+    3B480663 308CF049 7778529E 79F91730 BC82B059 9C1C0785 C20CD0D3 54D95BA4
+""")
+
+SCHNORR_3072_P = _hex("""
+    856AAE43 EA256786 BD4D098C 8772EA89 16F3419A 07F3E7FA D089BA3B 0D3F3B32
+    A29A3D74 A1CA40EF 99DE8B30 F223D520 D94DB633 0BFE82D3 B1A3A252 B9C3AC48
+    B76A7807 15F1F4BD 13F4093D 18A942C7 6E79C930 5786F993 9548C4BC DD6A7D9A
+    2F960C43 B896B2D6 44816708 B38B599E 2637511C F2A431A4 9270EFB3 32F4C61D
+    97D82775 9EF4A3B3 5E769FBA 6AD9BFC6 12646F21 11BF1DFA 93A69A63 DB974D26
+    660CAF8B BF57FCB2 1551F9F0 0A9195FD 53B9BA3A 175B9C9B 07EF219C 9C8FD461
+    8D00FA0D FCEF7DE4 323185CA E29E7309 7E4D991A 13EB98D3 F1C5BA75 6C982BBC
+    2D0035D3 41BB5ACF 088A0CEA 6F91DE62 3F823AC2 DF642217 285D52AA C3DBEA43
+    18CA2D37 7A60A381 6A291D36 C4AB0681 47DEA3C6 CC91CC42 48BE5612 EE865688
+    18D1BC4D 82DEF3D4 8769102B D41A1709 3C031368 CDA23850 98EDB320 665C754C
+    B4A54437 5BE24B45 5FC37D67 2145538C 19465901 7EC23D26 9E5395F9 B8098D76
+    D36C37B2 D0529F53 4F308BE4 80F0B444 5F031538 6C22C4CC 88463970 6F7DEA21
+""")
+
+SCHNORR_3072_Q = _hex("""
+    D8D4547F 25D41653 44A4ACBD 0051E1D8 B282A5B5 721214AD AE020BFB FCCD663F
+""")
+
+SCHNORR_3072_G = _hex("""
+    6CE54E38 806AF63F 46175F71 BC0BE0F6 06544BCA 2E978A49 92D29249 030F681C
+    C31F7E84 268035E9 698416AC 50D973C5 7397B8F1 CAD83DDB 03E7CEF2 B12FE752
+    D6646011 08A61877 AD0C64EE E9A8CF91 08A0B427 BE02BCA9 9CC376FF 4640B1C0
+    44C32245 A144B974 21CAF8A1 6231D151 FCFD053A 785F0CE9 67A1535D 3400739D
+    E9C1F5DB 9C1D4CCA 20E88644 0F98BDA7 79323294 6E0E4E41 101CA9E5 FDD3D860
+    1F17843B E60A65FD 5549F6D5 9614B9D3 C0930D24 054F8CB1 25024C8A B9E09A70
+    C0AD3558 9B5F8BBD E41CDE7A C9E8A10F 221C12ED DA8C7BCA DF17AF51 29EE35BA
+    D17C988B 0FA37332 2EDDE18C 1B18E0BD 71ADD087 708894B4 031304D1 1350772F
+    90F1F015 2D2EC614 07B997B4 A602772C 5563E637 587CB9BF FC044634 60443531
+    B35156D3 A347D0F1 8A45AD2F E0BF94A4 C4C2F533 757E52C3 1AD2DF75 D481C3BF
+    9321E606 7C19072E 1D3CAD51 0054B3F7 31F01198 E37D5BFE 100C6AE1 C252FF56
+    19FE7C71 BC881AA3 B27205C2 627EF48E 166F0B70 ACD84E23 2512FA42 086FA487
+""")
+
+register_params(GroupParams(
+    'schnorr-2048', SCHNORR_2048_P, SCHNORR_2048_Q, SCHNORR_2048_G,
+    description='2048-bit p with a 256-bit prime-order subgroup',
+))
+register_params(GroupParams(
+    'schnorr-3072', SCHNORR_3072_P, SCHNORR_3072_Q, SCHNORR_3072_G,
+    description='3072-bit p with a 256-bit prime-order subgroup',
+))
+
+# Imported last: the curve backend registers itself as an ordinary parameter set
+from zkp.ed25519 import Ed25519Group  # noqa: E402
+
+register_params(Ed25519Group())
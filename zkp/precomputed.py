@@ -0,0 +1,178 @@
+"""
+Per-group precomputation shipped as a build-time artifact.
+
+A fresh process pays for its fixed-base table (20-130 ms per parameter
+set) and for the hashed generators of the range proofs (up to half a
+second for the larger Schnorr groups) the first time it uses them; a
+serverless function pays again on every cold start.  scripts/build_tables.py
+computes both once, at build time, and writes <name>.tbl per parameter set
+to ZKP_TABLES (default zkp/precomputed/).  The groups and
+zkp.range_proof load them from there when present and fall back to
+computing them otherwise; ZKP_TABLES=off forces the fallback.
+
+A file is MAGIC, a 4-byte header length, a JSON header and then the table
+entries as fixed-width big-endian integers, row after row.  The file is
+mapped with mmap and each entry decoded from the mapping the first time a
+power needs it, so loading costs next to nothing and worker processes
+share the pages through the page cache.  The header
+carries a digest of the group's constants, so a file built for other
+parameters is ignored instead of producing wrong powers.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+
+
+TABLES_ENV = 'ZKP_TABLES'
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precomputed')
+MAGIC = b'ZKPTBL1\n'
+SUFFIX = '.tbl'
+
+_generators = {}
+_generators_lock = threading.Lock()
+
+
+def tables_directory():
+    """Where artifacts are read from, or None when ZKP_TABLES=off."""
+    value = os.environ.get(TABLES_ENV, '').strip()
+    if value.lower() == 'off':
+        return None
+    return value or DEFAULT_DIRECTORY
+
+
+def group_digest(params):
+    """Hex digest of the constants a table depends on."""
+    h = hashlib.sha256(params.name.encode())
+    for value in (getattr(params, 'p', 0), params.q):
+        h.update(value.to_bytes((value.bit_length() + 7) // 8 + 1, 'big'))
+    h.update(params.encode(params.g))
+    return h.hexdigest()
+
+
+def save_artifact(params, window, rows, generators, directory=None):
+    """Write one parameter set's table (window, rows) and {label: element} generators; returns the path."""
+    directory = directory or DEFAULT_DIRECTORY
+    os.makedirs(directory, exist_ok=True)
+    width = max(1, (max(v.bit_length() for row in rows for v in row) + 7) // 8)
+    header = json.dumps({
+        'group': params.name,
+        'digest': group_digest(params),
+        'window': window,
+        'rows': len(rows),
+        'row_length': len(rows[0]),
+        'width': width,
+        'generators': {label: params.to_wire(element) for label, element in generators.items()},
+    }, separators=(',', ':')).encode()
+
+    path = os.path.join(directory, params.name + SUFFIX)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC + len(header).to_bytes(4, 'big') + header)
+        for row in rows:
+            f.write(b''.join(int(v).to_bytes(width, 'big') for v in row))
+    os.replace(temporary, path)
+    return path
+
+
+def _artifact_path(params):
+    directory = tables_directory()
+    if directory is None:
+        return None
+    path = os.path.join(directory, params.name + SUFFIX)
+    return path if os.path.exists(path) else None
+
+
+class MappedRow(dict):
+    """
+    One table row decoded lazily from the mapping: an entry is converted on
+    first lookup and then served from the dict, so a cold process touches
+    only the pages its exponents need.  size > 1 groups that many
+    consecutive integers into a tuple per entry.
+    """
+
+    __slots__ = ('_data', '_offset', '_width', '_size', '_convert', 'length')
+
+    def __init__(self, data, offset, width, size, convert, length):
+        super().__init__()
+        self.length = length
+        self._data = data
+        self._offset = offset
+        self._width = width
+        self._size = size
+        self._convert = convert
+
+    def __missing__(self, index):
+        width, size = self._width, self._size
+        start = self._offset + index * width * size
+        values = [int.from_bytes(self._data[i:i + width], 'big')
+                  for i in range(start, start + width * size, width)]
+        value = self._convert(values[0]) if size == 1 else tuple(map(self._convert, values))
+        self[index] = value
+        return value
+
+    def load(self):
+        """Decode every entry now, e.g. in a server's master before it forks workers."""
+        for index in range(self.length):
+            self[index]
+
+
+def _read(params):
+    """(header, mapping, offset of the first entry) of a parameter set's artifact, or None if unusable."""
+    path = _artifact_path(params)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        start = len(MAGIC) + 4
+        if data[:len(MAGIC)] == MAGIC:
+            end = start + int.from_bytes(data[len(MAGIC):start], 'big')
+            header = json.loads(data[start:end])
+            if (header['group'] == params.name and header['digest'] == group_digest(params)
+                    and len(data) == end + header['rows'] * header['row_length'] * header['width']):
+                return header, data, end
+        data.close()
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load_rows(params, convert=int, size=1):
+    """
+    (window, rows) of a parameter set's table mapped from its artifact, or
+    None when there is no usable one.  Each row maps an index to convert()
+    of the stored integer (or a tuple of size of them); the mapping stays
+    open for the life of the rows.
+    """
+    stored = _read(params)
+    if stored is None:
+        return None
+    header, data, offset = stored
+    width, length = header['width'], header['row_length']
+    return header['window'], [MappedRow(data, offset + r * length * width, width, size, convert, length // size)
+                              for r in range(header['rows'])]
+
+
+def stored_generators(params):
+    """{label: wire value} of the hashed generators in the artifact, read once per process."""
+    generators = _generators.get(params.name)
+    if generators is None:
+        with _generators_lock:
+            generators = _generators.get(params.name)
+            if generators is None:
+                stored = _read(params)
+                generators = {}
+                if stored is not None:
+                    generators = stored[0]['generators']
+                    stored[1].close()
+                _generators[params.name] = generators
+    return generators
+
+
+def stored_generator(params, label):
+    """A hashed generator from the artifact, or None."""
+    value = stored_generators(params).get(label)
+    return None if value is None else params.from_wire(value)
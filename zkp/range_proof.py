@@ -0,0 +1,479 @@
+"""
+Range proofs on Pedersen commitments.
+
+A value v is committed as C = g^v * h^r, where h is hashed to the group so
+nobody knows log_g(h); C hides v and binds the prover to it.  A range proof
+then convinces the verifier that lower <= v <= upper without opening C.
+
+Two proof systems are provided, both non-interactive (Fiat-Shamir over a
+transcript of every prover message):
+
+'bits'        v is split into n bit commitments C_i = g^b_i * h^r_i whose
+              weighted product is C, and each C_i carries a CDS OR-proof
+              that it commits to 0 or to 1.  Proof size and verifier work
+              are linear in n.
+
+'bulletproof' The Bulletproofs range proof (Bunz et al., 2018): the bit
+              vector is committed with vector generators and the inner
+              product argument halves it every round, so the proof holds
+              2*log2(n) + 4 elements and 5 scalars.  n is rounded up to a
+              power of two.
+
+A range whose width is not a power of two is proved as two proofs over the
+same n bits: v - lower >= 0 on C * g^-lower and upper - v >= 0 on
+g^upper * C^-1.
+
+Verification checks every equation of a proof with random weights in one
+multi-exponentiation, as in zkp.schnorr, and treats small-order components
+the same way: on Ed25519 the combined result is multiplied by the cofactor
+before the identity comparison, and in groups mod p the commitment and
+every proof element must pass contains().  That costs one exponentiation
+by q per element on the schnorr-* sets, about 3n of them for 'bits' and
+2*log2(n) + 4 for 'bulletproof'.
+"""
+
+import hashlib
+from collections import namedtuple
+from functools import lru_cache
+
+from zkp.backend import backend
+from zkp.params import get_params
+from zkp.precomputed import stored_generator
+from zkp.replay import replay_guard
+from zkp.rng import randbits
+from zkp.steps import Step
+
+
+DOMAIN = b'zkp-demo/range-proof/v1'
+MODES = ('bits', 'bulletproof')
+# Bits of the random weights that combine a proof's equations into one check
+WEIGHT_BITS = 128
+
+
+# One proof over n bits for a single commitment
+BitProof = namedtuple('BitProof', 'commitments a0 a1 e0 z0 z1')
+InnerProductProof = namedtuple('InnerProductProof', 'L R a b')
+Bulletproof = namedtuple('Bulletproof', 'A S T1 T2 tau_x mu t_hat ipp')
+
+# parts holds one sub-proof per derived commitment (one or two)
+RangeProof = namedtuple('RangeProof', 'mode bits lower upper parts')
+
+
+class Transcript:
+    """Fiat-Shamir transcript: length-prefixed SHAKE-256 absorbing each message."""
+
+    def __init__(self, params, label, context=b''):
+        self.params = params
+        self._hash = hashlib.shake_256()
+        self._scalar_bytes = (params.q_bits + 7) // 8
+        self.append(DOMAIN, label.encode(), params.name.encode(), context)
+
+    def append(self, *parts):
+        for part in parts:
+            self._hash.update(len(part).to_bytes(4, 'big'))
+            self._hash.update(part)
+
+    def elements(self, *elements):
+        self.append(*(self.params.encode(x) for x in elements))
+
+    def scalars(self, *values):
+        self.append(*(v.to_bytes(self._scalar_bytes, 'big') for v in values))
+
+    def challenge(self):
+        """A non-zero scalar derived from everything absorbed so far."""
+        q = self.params.q
+        while True:
+            # 128 extra bits keep the reduction mod q statistically uniform
+            digest = self._hash.copy().digest(self._scalar_bytes + 16)
+            e = int.from_bytes(digest, 'big') % q
+            self.append(b'challenge')
+            if e:
+                self.scalars(e)
+                return e
+
+
+@lru_cache(maxsize=None)
+def generator(params, label):
+    """A hashed generator of the group, cached per (parameter set, label)."""
+    stored = stored_generator(params, label)
+    return params.hash_to_element(label.encode()) if stored is None else stored
+
+
+def pedersen_h(params):
+    return generator(params, 'pedersen/h')
+
+
+def generator_labels(n):
+    """Labels of every hashed generator a proof over up to n bits uses."""
+    return (['pedersen/h', 'bulletproof/U'] + [f'bulletproof/G/{i}' for i in range(n)]
+            + [f'bulletproof/H/{i}' for i in range(n)])
+
+
+def vector_generators(params, n):
+    """The G_i, H_i vectors and U point of the inner product argument."""
+    G = [generator(params, f'bulletproof/G/{i}') for i in range(n)]
+    H = [generator(params, f'bulletproof/H/{i}') for i in range(n)]
+    return G, H, generator(params, 'bulletproof/U')
+
+
+def commit(value, blinding, params=None):
+    """Pedersen commitment g^value * h^blinding."""
+    params = get_params(params)
+    return params.multi_exp([(pedersen_h(params), blinding)], value)
+
+
+def _inverse(value, q):
+    return backend.to_int(backend.invert(value, q))
+
+
+def _inner(a, b, q):
+    return sum(x * y for x, y in zip(a, b)) % q
+
+
+def _powers(base, n, q):
+    out = [1] * n
+    for i in range(1, n):
+        out[i] = out[i - 1] * base % q
+    return out
+
+
+def range_bits(lower, upper, mode):
+    """Bits per proof for [lower, upper]: enough for the width, a power of two for bulletproofs."""
+    bits = max(1, (upper - lower).bit_length())
+    if mode == 'bulletproof':
+        bits = 1 << (bits - 1).bit_length()
+    return bits
+
+
+def _derived(params, commitment, lower, upper, bits):
+    """(commitment, value sign, value offset) of each part that must lie in [0, 2^bits)."""
+    parts = [(params.multi_exp([(commitment, 1)], -lower), 1, -lower)]
+    if upper - lower + 1 != 1 << bits:
+        parts.append((params.multi_exp([(commitment, -1)], upper), -1, upper))
+    return parts
+
+
+def _valid_elements(params, elements):
+    """Cofactored groups clear small-order components in the combined check; others test each element."""
+    check = params.is_canonical if params.cofactored else params.contains
+    return all(check(x) for x in elements)
+
+
+def _check_params(params, bits):
+    if not params.prime_order:
+        raise ValueError(f'{params.name}: range proofs need a prime-order group')
+    if bits >= params.q_bits:
+        raise ValueError(f'{params.name}: a {bits}-bit range does not fit below the group order')
+
+
+# --- bit decomposition with OR-proofs ------------------------------------------------------
+
+def _prove_bits(params, h, value, blinding, n, transcript):
+    q = params.q
+    bits = [(value >> i) & 1 for i in range(n)]
+    r = [params.random_scalar() for _ in range(n)]
+    # the bit blindings must recombine to the commitment's: sum 2^i r_i = blinding
+    r[0] = (blinding - sum(r[i] << i for i in range(1, n))) % q
+    commitments = [params.multi_exp([(h, r_i)], b) for b, r_i in zip(bits, r)]
+
+    # CDS OR-proof per bit: simulate the false branch, answer the true one after the challenge
+    a0, a1, k, fake = [], [], [], []
+    for b, c in zip(bits, commitments):
+        k_i = params.random_scalar()
+        e_f, z_f = params.random_scalar(), params.random_scalar()
+        real = params.multi_exp([(h, k_i)])
+        # the false branch is Y_f = C (claims b=0) or C/g (claims b=1): a = h^z * Y_f^-e
+        simulated = params.multi_exp([(h, z_f), (c, -e_f)], e_f if b == 0 else 0)
+        a0.append(real if b == 0 else simulated)
+        a1.append(simulated if b == 0 else real)
+        k.append(k_i)
+        fake.append((e_f, z_f))
+
+    transcript.elements(*commitments, *a0, *a1)
+    e = transcript.challenge()
+
+    e0, z0, z1 = [], [], []
+    for b, r_i, k_i, (e_f, z_f) in zip(bits, r, k, fake):
+        e_real = (e - e_f) % q
+        z_real = (k_i + e_real * r_i) % q
+        if b == 0:
+            e0.append(e_real)
+            z0.append(z_real)
+            z1.append(z_f)
+        else:
+            e0.append(e_f)
+            z0.append(z_f)
+            z1.append(z_real)
+    return BitProof(commitments, a0, a1, e0, z0, z1)
+
+
+def _verify_bits_terms(params, h, commitment, n, proof, transcript, weight):
+    """
+    Weighted multi-exponentiation terms that multiply to the identity for a
+    valid proof, as (pairs, g exponent), or None if the proof is malformed.
+    """
+    q = params.q
+    fields = (proof.commitments, proof.a0, proof.a1, proof.e0, proof.z0, proof.z1)
+    if any(len(f) != n for f in fields):
+        return None
+    if not _valid_elements(params, (*proof.commitments, *proof.a0, *proof.a1)):
+        return None
+
+    transcript.elements(*proof.commitments, *proof.a0, *proof.a1)
+    e = transcript.challenge()
+
+    # sum of 2^i * C_i must reopen the commitment: C * prod C_i^-(2^i) == 1
+    sigma = randbits(WEIGHT_BITS) | 1
+    pairs = [(commitment, sigma * weight)]
+    h_exponent = 0
+    g_exponent = 0
+    for i in range(n):
+        c, e0 = proof.commitments[i], proof.e0[i]
+        e1 = (e - e0) % q
+        rho0, rho1 = randbits(WEIGHT_BITS) | 1, randbits(WEIGHT_BITS) | 1
+        # h^z0 == a0 * C^e0 and h^z1 == a1 * (C/g)^e1
+        h_exponent += rho0 * proof.z0[i] + rho1 * proof.z1[i]
+        g_exponent += rho1 * e1
+        pairs.append((proof.a0[i], -rho0 * weight))
+        pairs.append((proof.a1[i], -rho1 * weight))
+        pairs.append((c, -(rho0 * e0 + rho1 * e1 + (sigma << i)) * weight))
+    pairs.append((h, h_exponent * weight))
+    return pairs, g_exponent * weight
+
+
+# --- Bulletproofs ---------------------------------------------------------------------------
+
+def _prove_inner_product(params, G, H, u_point, a, b, transcript):
+    """Halve (G, H, a, b) until one element is left; u_point already carries the w challenge."""
+    q = params.q
+    L, R = [], []
+    while len(a) > 1:
+        half = len(a) // 2
+        a_lo, a_hi, b_lo, b_hi = a[:half], a[half:], b[:half], b[half:]
+        G_lo, G_hi, H_lo, H_hi = G[:half], G[half:], H[:half], H[half:]
+
+        c_l, c_r = _inner(a_lo, b_hi, q), _inner(a_hi, b_lo, q)
+        L.append(params.multi_exp([*zip(G_hi, a_lo), *zip(H_lo, b_hi), (u_point, c_l)]))
+        R.append(params.multi_exp([*zip(G_lo, a_hi), *zip(H_hi, b_lo), (u_point, c_r)]))
+        transcript.elements(L[-1], R[-1])
+        u = transcript.challenge()
+        u_inv = _inverse(u, q)
+
+        a = [(x * u + y * u_inv) % q for x, y in zip(a_lo, a_hi)]
+        b = [(x * u_inv + y * u) % q for x, y in zip(b_lo, b_hi)]
+        G = [params.multi_exp([(x, u_inv), (y, u)]) for x, y in zip(G_lo, G_hi)]
+        H = [params.multi_exp([(x, u), (y, u_inv)]) for x, y in zip(H_lo, H_hi)]
+    return InnerProductProof(L, R, a[0], b[0])
+
+
+def _prove_bulletproof(params, h, value, blinding, n, transcript):
+    q = params.q
+    G, H, U = vector_generators(params, n)
+
+    a_l = [(value >> i) & 1 for i in range(n)]
+    a_r = [(bit - 1) % q for bit in a_l]
+    alpha, rho = params.random_scalar(), params.random_scalar()
+    s_l = [params.random_scalar() for _ in range(n)]
+    s_r = [params.random_scalar() for _ in range(n)]
+    A = params.multi_exp([(h, alpha), *zip(G, a_l), *zip(H, a_r)])
+    S = params.multi_exp([(h, rho), *zip(G, s_l), *zip(H, s_r)])
+
+    transcript.elements(A, S)
+    y = transcript.challenge()
+    z = transcript.challenge()
+    y_n, two_n = _powers(y, n, q), _powers(2, n, q)
+    z2 = z * z % q
+
+    # l(X) = l0 + l1 X and r(X) = r0 + r1 X, with t(X) = <l(X), r(X)>
+    l0 = [(x - z) % q for x in a_l]
+    r0 = [(y_i * (x + z) + z2 * t) % q for y_i, x, t in zip(y_n, a_r, two_n)]
+    r1 = [y_i * x % q for y_i, x in zip(y_n, s_r)]
+    t1 = (_inner(l0, r1, q) + _inner(s_l, r0, q)) % q
+    t2 = _inner(s_l, r1, q)
+    tau1, tau2 = params.random_scalar(), params.random_scalar()
+    T1 = params.multi_exp([(h, tau1)], t1)
+    T2 = params.multi_exp([(h, tau2)], t2)
+
+    transcript.elements(T1, T2)
+    x = transcript.challenge()
+    l_vec = [(a + b * x) % q for a, b in zip(l0, s_l)]
+    r_vec = [(a + b * x) % q for a, b in zip(r0, r1)]
+    t_hat = _inner(l_vec, r_vec, q)
+    tau_x = (tau2 * x * x + tau1 * x + z2 * blinding) % q
+    mu = (alpha + rho * x) % q
+
+    transcript.scalars(tau_x, mu, t_hat)
+    w = transcript.challenge()
+    y_inv_n = _powers(_inverse(y, q), n, q)
+    H_prime = [params.exp(x_i, e) for x_i, e in zip(H, y_inv_n)]
+    ipp = _prove_inner_product(params, G, H_prime, params.exp(U, w), l_vec, r_vec, transcript)
+    return Bulletproof(A, S, T1, T2, tau_x, mu, t_hat, ipp)
+
+
+def _verify_bulletproof_terms(params, h, commitment, n, proof, transcript, weight):
+    """Weighted terms of both Bulletproofs equations, or None if the proof is malformed."""
+    q = params.q
+    rounds = n.bit_length() - 1
+    ipp = proof.ipp
+    if len(ipp.L) != rounds or len(ipp.R) != rounds:
+        return None
+    if not _valid_elements(params, (proof.A, proof.S, proof.T1, proof.T2, *ipp.L, *ipp.R)):
+        return None
+    G, H, U = vector_generators(params, n)
+
+    transcript.elements(proof.A, proof.S)
+    y = transcript.challenge()
+    z = transcript.challenge()
+    transcript.elements(proof.T1, proof.T2)
+    x = transcript.challenge()
+    transcript.scalars(proof.tau_x, proof.mu, proof.t_hat)
+    w = transcript.challenge()
+    challenges = []
+    for L_j, R_j in zip(ipp.L, ipp.R):
+        transcript.elements(L_j, R_j)
+        challenges.append(transcript.challenge())
+
+    y_n, two_n = _powers(y, n, q), _powers(2, n, q)
+    y_inv_n = _powers(_inverse(y, q), n, q)
+    z2 = z * z % q
+    delta = ((z - z2) * sum(y_n) - z2 * z * sum(two_n)) % q
+
+    # s_i = prod_j u_j^(+1 if bit (rounds-1-j) of i is set else -1); doubling the
+    # list adds the next factor as the new top bit, so the last round goes first
+    inverses = [_inverse(u, q) for u in challenges]
+    s = [1]
+    for u, u_inv in zip(reversed(challenges), reversed(inverses)):
+        s = [v * u_inv % q for v in s] + [v * u % q for v in s]
+
+    c = randbits(WEIGHT_BITS) | 1
+    a, b = ipp.a, ipp.b
+    s_inv = s[::-1]  # s_i^-1 = s_(n-1-i), since flipping every bit inverts each factor
+    pairs = [
+        (h, (proof.mu + c * proof.tau_x) * weight),
+        (commitment, -c * z2 * weight),
+        (proof.T1, -c * x * weight),
+        (proof.T2, -c * x * x * weight),
+        (proof.A, -weight),
+        (proof.S, -x * weight),
+        (U, w * (a * b - proof.t_hat) * weight),
+    ]
+    for i in range(n):
+        pairs.append((G[i], (a * s[i] + z) * weight))
+        pairs.append((H[i], (y_inv_n[i] * (b * s_inv[i] - z2 * two_n[i]) - z) * weight))
+    for L_j, R_j, u, u_inv in zip(ipp.L, ipp.R, challenges, inverses):
+        pairs.append((L_j, -u * u * weight))
+        pairs.append((R_j, -u_inv * u_inv * weight))
+    return pairs, c * (proof.t_hat - delta) * weight
+
+
+_PROVERS = {'bits': _prove_bits, 'bulletproof': _prove_bulletproof}
+_VERIFIERS = {'bits': _verify_bits_terms, 'bulletproof': _verify_bulletproof_terms}
+
+
+def _transcript(params, mode, bits, lower, upper, commitment, part, context):
+    context = context.encode() if isinstance(context, str) else context
+    transcript = Transcript(params, f'range/{mode}', context)
+    transcript.append(str(bits).encode(), str(lower).encode(), str(upper).encode(), str(part).encode())
+    transcript.elements(commitment)
+    return transcript
+
+
+def prove_range(value, blinding, lower, upper, params=None, mode='bulletproof', context=''):
+    """
+    Prove that the commitment g^value * h^blinding opens to a value in
+    [lower, upper].  Raises ValueError if value is outside the range.
+    """
+    params = get_params(params)
+    if mode not in _PROVERS:
+        raise ValueError(f'Unknown range proof mode: {mode}')
+    if not lower <= value <= upper:
+        raise ValueError('Value is outside the range')
+    bits = range_bits(lower, upper, mode)
+    _check_params(params, bits)
+
+    h = pedersen_h(params)
+    commitment = commit(value, blinding, params)
+    parts = []
+    for index, (derived, sign, offset) in enumerate(_derived(params, commitment, lower, upper, bits)):
+        transcript = _transcript(params, mode, bits, lower, upper, derived, index, context)
+        parts.append(_PROVERS[mode](params, h, sign * value + offset, sign * blinding % params.q,
+                                    bits, transcript))
+    return RangeProof(mode, bits, lower, upper, parts)
+
+
+def verify_range(commitment, proof, lower, upper, params=None, context=''):
+    """
+    Check that commitment opens to a value in [lower, upper] with one
+    multi-exponentiation.  The range is the verifier's: a proof made for
+    any other range is rejected.
+    """
+    params = get_params(params)
+    if (proof.lower, proof.upper) != (lower, upper):
+        return False
+    if proof.mode not in _VERIFIERS or proof.bits != range_bits(lower, upper, proof.mode):
+        return False
+    if not _valid_elements(params, (commitment,)):
+        return False
+    _check_params(params, proof.bits)
+
+    h = pedersen_h(params)
+    derived = _derived(params, commitment, lower, upper, proof.bits)
+    if len(derived) != len(proof.parts):
+        return False
+
+    pairs, g_exponent = [], 0
+    for index, ((part_commitment, _, _), part) in enumerate(zip(derived, proof.parts)):
+        transcript = _transcript(params, proof.mode, proof.bits, lower, upper, part_commitment, index, context)
+        weight = randbits(WEIGHT_BITS) | 1
+        terms = _VERIFIERS[proof.mode](params, h, part_commitment, proof.bits, part, transcript, weight)
+        if terms is None:
+            return False
+        pairs.extend(terms[0])
+        g_exponent += terms[1]
+    result = params.multi_exp(pairs, g_exponent)
+    if params.cofactored:
+        result = params.clear_cofactor(result)
+    return result == params.identity()
+
+
+def proof_size(proof, params=None):
+    """(group elements, scalars, bytes) of a range proof as sent over the wire."""
+    params = get_params(params)
+    elements = scalars = 0
+    for part in proof.parts:
+        if proof.mode == 'bits':
+            elements += 3 * proof.bits
+            scalars += 3 * proof.bits
+        else:
+            elements += 4 + len(part.ipp.L) + len(part.ipp.R)
+            scalars += 5
+    element_bytes = len(params.encode(params.g))
+    scalar_bytes = (params.q_bits + 7) // 8
+    return elements, scalars, elements * element_bytes + scalars * scalar_bytes
+
+
+def range_proof_steps(value, lower, upper, params=None, mode='bulletproof', context=''):
+    """
+    Commit to value, prove lower <= value <= upper and verify the proof,
+    yielding a Step for each stage; returns the verifier's verdict.
+    """
+    params = get_params(params)
+    blinding = params.random_scalar()
+    commitment = commit(value, blinding, params)
+    yield Step('info', 'range.committed', commitment)
+
+    yield Step('round', 'range.round', mode, round=1)
+    proof = prove_range(value, blinding, lower, upper, params, mode, context)
+    yield Step('step', f'range.{mode}', proof.bits, len(proof.parts))
+    yield Step('step', 'range.size', *proof_size(proof, params))
+
+    valid = verify_range(commitment, proof, lower, upper, params, context)
+    yield Step('verification', 'range.check')
+    if not valid:
+        yield Step('error', 'round.failed', round=1)
+        return False
+    if not replay_guard().check_proof(params, 'range', commitment):
+        yield Step('error', 'round.replayed', round=1)
+        return False
+    yield Step('success', 'range.passed', lower, upper, round=1)
+    return True
@@ -0,0 +1,244 @@
+"""
+User registry for password authentication.
+
+Registration draws a random salt, stretches the password with scrypt (a
+memory-hard KDF) into the secret x and stores only the salt, the KDF
+settings and the public key y = g^x; neither the password nor x is kept.
+Logging in is a lookup of that record followed by the Schnorr proof: the
+prover re-derives x from the password and the stored salt, the verifier
+only needs y.
+
+Records live in a store: MemoryStore for a single process, capped at
+ZKP_USER_LIMIT users so open registration cannot exhaust memory, or
+SqliteStore (ZKP_USER_DB=path) when several worker processes must see the
+same users.  A bounded LRU cache sits in front of either, so the request
+path for a known user is a dictionary hit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+from zkp.params import get_params
+
+
+USER_DB_ENV = 'ZKP_USER_DB'
+USER_CACHE_ENV = 'ZKP_USER_CACHE'
+USER_KDF_ENV = 'ZKP_USER_KDF'
+USER_LIMIT_ENV = 'ZKP_USER_LIMIT'
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_MEMORY_USERS = 10_000
+SALT_BYTES = 16
+
+# scrypt cost: 2^14 * 128 * 8 bytes = 16 MiB and a few tens of ms per derivation
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+DEFAULT_KDF = f'scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}'
+
+# kdf records the derivation settings so they can be raised without locking out old users
+UserRecord = namedtuple('UserRecord', 'username group salt kdf public_key')
+
+
+class UserExists(ValueError):
+    """A username is already registered for the parameter set."""
+
+
+class RegistryFull(ValueError):
+    """The in-memory store holds its maximum number of users."""
+
+
+def parse_kdf(kdf):
+    """(n, r, p) from a 'scrypt$n$r$p' string."""
+    name, *costs = kdf.split('$')
+    if name != 'scrypt' or len(costs) != 3:
+        raise ValueError(f'Unsupported KDF: {kdf}')
+    return tuple(int(c) for c in costs)
+
+
+def derive_secret(password, salt, params=None, kdf=DEFAULT_KDF):
+    """Stretch a password and salt into a non-zero scalar mod q."""
+    params = get_params(params)
+    n, r, p = parse_kdf(kdf)
+    # 128 extra bits keep the reduction mod q statistically uniform
+    size = (params.q_bits + 7) // 8 + 16
+    key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * (n + p + 2),
+                         dklen=size)
+    return int.from_bytes(key, 'big') % (params.q - 1) + 1
+
+
+class MemoryStore:
+    """Records in a dict, at most max_records of them; private to one process."""
+
+    def __init__(self, max_records=DEFAULT_MEMORY_USERS):
+        self.max_records = max_records
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def get(self, group, username):
+        return self._records.get((group, username))
+
+    def records(self, group, limit):
+        """Up to limit records of a parameter set."""
+        found = [r for (g, _), r in list(self._records.items()) if g == group]
+        return found[:limit]
+
+    def add(self, record):
+        """Insert a record; False if the username is taken, RegistryFull if the store is."""
+        with self._lock:
+            key = (record.group, record.username)
+            if key in self._records:
+                return False
+            if len(self._records) >= self.max_records:
+                raise RegistryFull(f'The in-memory user store is full ({self.max_records} users); '
+                                   f'set {USER_DB_ENV} for more')
+            self._records[key] = record
+            return True
+
+
+class SqliteStore:
+    """Records in an SQLite file shared by every process that opens it."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS users ('
+                       'grp TEXT, username TEXT, salt BLOB, kdf TEXT, public_key TEXT, '
+                       'PRIMARY KEY (grp, username))')
+
+    def _connection(self):
+        # One connection per thread and process; connections must not cross a fork
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.db = sqlite3.connect(self.path, timeout=10)
+            local.pid = os.getpid()
+        return local.db
+
+    @staticmethod
+    def _record(group, username, salt, kdf, public_key):
+        return UserRecord(username, group, bytes(salt), kdf, get_params(group).from_wire(json.loads(public_key)))
+
+    def get(self, group, username):
+        row = self._connection().execute(
+            'SELECT salt, kdf, public_key FROM users WHERE grp = ? AND username = ?',
+            (group, username)).fetchone()
+        return None if row is None else self._record(group, username, *row)
+
+    def records(self, group, limit):
+        rows = self._connection().execute(
+            'SELECT username, salt, kdf, public_key FROM users WHERE grp = ? LIMIT ?', (group, limit))
+        return [self._record(group, *row) for row in rows]
+
+    def add(self, record):
+        params = get_params(record.group)
+        try:
+            with self._connection() as db:
+                db.execute('INSERT INTO users VALUES (?, ?, ?, ?, ?)',
+                           (record.group, record.username, record.salt, record.kdf,
+                            json.dumps(params.to_wire(record.public_key))))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class UserRegistry:
+    """Registration and cached public-key lookup in front of a store."""
+
+    def __init__(self, store=None, cache_size=DEFAULT_CACHE_SIZE, kdf=DEFAULT_KDF):
+        self.store = MemoryStore() if store is None else store
+        self.cache = LRUCache(cache_size)
+        self.kdf = kdf
+
+    def register(self, username, password, params=None, salt=None):
+        """
+        Derive and store a user's public key; UserExists if the name is
+        taken.  salt is random unless given (for accounts seeded with a
+        known password, which gain nothing from a random one).
+        """
+        params = get_params(params)
+        if not username or not password:
+            raise ValueError('Username and password are required')
+        # Refuse a taken name before paying for scrypt; the store still decides races
+        if self.lookup(username, params) is not None:
+            raise UserExists(f'User {username!r} is already registered')
+        salt = os.urandom(SALT_BYTES) if salt is None else salt
+        secret = derive_secret(password, salt, params, self.kdf)
+        record = UserRecord(username, params.name, salt, self.kdf, params.base_exp(secret))
+        if not self.store.add(record):
+            raise UserExists(f'User {username!r} is already registered')
+        self.cache.put((params.name, username), record)
+        return record
+
+    def lookup(self, username, params=None):
+        """The user's record, or None if they are not registered."""
+        params = get_params(params)
+        key = (params.name, username)
+        record = self.cache.get(key)
+        if record is None:
+            record = self.store.get(params.name, username)
+            if record is not None:
+                self.cache.put(key, record)
+        return record
+
+    def preload(self, params=None):
+        """
+        Fill the cache with a parameter set's records, up to its size, e.g.
+        in a server's master so forked workers share them; returns the count.
+        """
+        params = get_params(params)
+        records = self.store.records(params.name, self.cache.maxsize)
+        for record in records:
+            self.cache.put((params.name, record.username), record)
+        return len(records)
+
+    def stats(self):
+        return {'cached': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses}
+
+
+def open_store():
+    """The store named by ZKP_USER_DB, or an in-memory one."""
+    path = os.environ.get(USER_DB_ENV, '').strip()
+    if path:
+        return SqliteStore(path)
+    return MemoryStore(int(os.environ.get(USER_LIMIT_ENV, DEFAULT_MEMORY_USERS)))
+
+
+def user_registry():
+    """A registry over the configured store, cache size and KDF settings for new users."""
+    kdf = os.environ.get(USER_KDF_ENV, '').strip() or DEFAULT_KDF
+    parse_kdf(kdf)
+    return UserRegistry(open_store(), int(os.environ.get(USER_CACHE_ENV, DEFAULT_CACHE_SIZE)), kdf)
@@ -0,0 +1,196 @@
+"""
+Replay protection with fixed memory.
+
+A verifier that accepts non-interactive or cross-request proofs must
+refuse a proof it has already accepted, without keeping every proof it
+has ever seen.  ReplayGuard remembers proof fingerprints for a window of
+time in two structures:
+
+- a rotating Bloom filter: window / buckets seconds per filter, buckets + 1
+  filters in a ring, the oldest cleared and reused on rotation.  Memory is
+  fixed by the expected proofs per window (capacity) and the
+  false-positive rate; beyond capacity the filter refuses more honest
+  proofs rather than forgetting replays.
+- an exact LRU of recent fingerprints.  A Bloom hit that the LRU does not
+  confirm is a false positive as long as the LRU has not dropped anything
+  from inside the window; the proof is then accepted.  Only once traffic
+  outgrows the LRU is a Bloom hit taken at its word, and an honest proof is
+  refused with the filter's (small) false-positive probability.
+
+A proof is refused only if its fingerprint was seen within the window, so
+the window must cover the time a proof stays acceptable (for example the
+challenge token lifetime).  State is per process; instances that share
+traffic each keep their own.  Groups with fewer than MIN_GROUP_BITS of
+order are not guarded: their commitments repeat by chance within a few
+hundred proofs.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+REPLAY_WINDOW_ENV = 'ZKP_REPLAY_WINDOW'
+REPLAY_CAPACITY_ENV = 'ZKP_REPLAY_CAPACITY'
+REPLAY_EXACT_ENV = 'ZKP_REPLAY_EXACT'
+DEFAULT_WINDOW = 300
+DEFAULT_CAPACITY = 100_000
+DEFAULT_EXACT_SIZE = 16_384
+DEFAULT_ERROR_RATE = 1e-6
+DEFAULT_BUCKETS = 4
+MIN_GROUP_BITS = 128
+
+FINGERPRINT_DOMAIN = b'zkp-demo/replay/v1'
+
+
+def proof_fingerprint(params, label, *elements):
+    """A 16-byte digest identifying a proof by its group, kind and group elements."""
+    h = hashlib.blake2b(digest_size=16, person=b'zkp-replay')
+    for part in (FINGERPRINT_DOMAIN, params.name.encode(), label.encode(),
+                 *(params.encode(x) for x in elements)):
+        h.update(len(part).to_bytes(4, 'big'))
+        h.update(part)
+    return h.digest()
+
+
+class RotatingBloomFilter:
+    """Bloom filters over consecutive time buckets; membership means 'seen in the window'."""
+
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE, window=DEFAULT_WINDOW,
+                 buckets=DEFAULT_BUCKETS, clock=time.monotonic):
+        # A burst can put the whole window's capacity into one bucket, so every
+        # filter is sized for all of it; a lookup consults every live filter,
+        # so each gets a share of the error budget
+        capacity = max(1, capacity)
+        rate = error_rate / (buckets + 1)
+        bits = math.ceil(-capacity * math.log(rate) / math.log(2) ** 2)
+        self.size = (bits + 7) // 8 * 8
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.span = window / buckets
+        self.clock = clock
+        self._filters = [bytearray(self.size // 8) for _ in range(buckets + 1)]
+        self._current = 0
+        self._epoch = 0
+        self._start = clock()
+
+    @property
+    def memory(self):
+        """Bytes held by the filter bits."""
+        return sum(len(f) for f in self._filters)
+
+    def _indices(self, digest):
+        # Double hashing: h1 + i * h2 covers k positions from one digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def _rotate(self, now):
+        epoch = int((now - self._start) // self.span)
+        steps = min(epoch - self._epoch, len(self._filters))
+        for _ in range(steps):
+            self._current = (self._current + 1) % len(self._filters)
+            self._filters[self._current][:] = bytes(self.size // 8)
+        self._epoch = epoch
+
+    def __contains__(self, digest):
+        self._rotate(self.clock())
+        indices = self._indices(digest)
+        return any(all(f[i >> 3] & (1 << (i & 7)) for i in indices) for f in self._filters)
+
+    def add(self, digest):
+        self._rotate(self.clock())
+        current = self._filters[self._current]
+        for i in self._indices(digest):
+            current[i >> 3] |= 1 << (i & 7)
+
+
+class ReplayGuard:
+    """Accepts each proof fingerprint once per window."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW, exact_size=DEFAULT_EXACT_SIZE,
+                 error_rate=DEFAULT_ERROR_RATE, buckets=DEFAULT_BUCKETS, clock=time.monotonic):
+        self.window = window
+        self.exact_size = exact_size
+        self.clock = clock
+        self.bloom = RotatingBloomFilter(capacity, error_rate, window, buckets, clock)
+        self.accepted = self.replays = self.false_positives = 0
+        self._recent = OrderedDict()
+        # Insertion time of the newest fingerprint the LRU had to drop early
+        self._dropped_at = None
+        self._lock = threading.Lock()
+
+    def _exact_covers_window(self, now):
+        return self._dropped_at is None or self._dropped_at < now - self.window
+
+    def check_and_add(self, digest):
+        """Record a fingerprint; False if it was already seen within the window."""
+        with self._lock:
+            now = self.clock()
+            recent = self._recent
+            while recent:
+                oldest, seen_at = next(iter(recent.items()))
+                if seen_at >= now - self.window:
+                    break
+                del recent[oldest]
+
+            if digest in recent:
+                self.replays += 1
+                return False
+            if digest in self.bloom:
+                if not self._exact_covers_window(now):
+                    self.replays += 1
+                    return False
+                self.false_positives += 1
+
+            self.bloom.add(digest)
+            recent[digest] = now
+            if len(recent) > self.exact_size:
+                _, self._dropped_at = recent.popitem(last=False)
+            self.accepted += 1
+            return True
+
+    def check_proof(self, params, label, *elements):
+        """check_and_add for a proof's fingerprint; always True in toy-sized groups."""
+        if params.q_bits < MIN_GROUP_BITS:
+            return True
+        return self.check_and_add(proof_fingerprint(params, label, *elements))
+
+    def stats(self):
+        return {'accepted': self.accepted, 'replays': self.replays,
+                'false_positives': self.false_positives, 'recent': len(self._recent),
+                'bloom_bytes': self.bloom.memory}
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def replay_guard():
+    """The process-wide guard, sized from ZKP_REPLAY_WINDOW/CAPACITY/EXACT on first use."""
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                _guard = ReplayGuard(
+                    capacity=int(os.environ.get(REPLAY_CAPACITY_ENV, DEFAULT_CAPACITY)),
+                    window=float(os.environ.get(REPLAY_WINDOW_ENV, DEFAULT_WINDOW)),
+                    exact_size=int(os.environ.get(REPLAY_EXACT_ENV, DEFAULT_EXACT_SIZE)))
+    return _guard
+
+
+def _after_fork_in_child():
+    global _guard_lock
+    _guard_lock = threading.Lock()
+    if _guard is not None:
+        _guard._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,80 @@
+"""
+Buffered cryptographic randomness for nonces, challenges and weights.
+
+Every round draws several uniform scalars, and secrets.randbelow() makes
+one os.urandom() system call per draw.  BufferedRandom reads os.urandom()
+in large blocks and slices integers out of them instead; a scalar below n
+takes bit_length(n) bits and is rejected when it is >= n, so it stays
+exactly uniform.
+
+Candidates are decoded a block at a time and kept per bound (there are
+only a few: the group orders and the batch-weight sizes), so a draw is
+usually one list pop.  Each thread has its own buffers, so no lock is
+taken on the hot path.
+Buffers are thrown away in a forked child: a child that kept its parent's
+buffered bytes would hand out the same nonces as the parent, and two
+Schnorr responses with the same nonce reveal the secret.
+"""
+
+import os
+import threading
+
+
+BLOCK_SIZE = 4096
+# Distinct bounds buffered per thread before the buffers are dropped
+MAX_BOUNDS = 16
+
+
+class BufferedRandom:
+    """Uniform integers sliced from os.urandom() blocks, one buffer per thread."""
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._local = threading.local()
+
+    def _refill(self, n):
+        """Slice a fresh block into candidates below 2^bit_length(n) and keep those below n."""
+        k = n.bit_length()
+        size, shift = (k + 7) // 8, -k % 8
+        block = os.urandom(max(self.block_size // size, 1) * size)
+        from_bytes = int.from_bytes
+        values = [from_bytes(block[i:i + size], 'big') >> shift for i in range(0, len(block), size)]
+        return [v for v in values if v < n]
+
+    def randbelow(self, n):
+        """A uniform integer in [0, n), by rejection sampling."""
+        try:
+            buffers = self._local.buffers
+        except AttributeError:
+            buffers = self._local.buffers = {}
+        values = buffers.get(n)
+        while not values:
+            if n <= 0:
+                raise ValueError('randbelow() needs a positive bound')
+            if len(buffers) >= MAX_BOUNDS:
+                buffers.clear()
+            values = buffers[n] = self._refill(n)
+        return values.pop()
+
+    def randbits(self, k):
+        """A uniform integer in [0, 2^k)."""
+        return self.randbelow(1 << k) if k > 0 else 0
+
+    def random_scalar(self, q):
+        """A uniform non-zero scalar mod q."""
+        return self.randbelow(q - 1) + 1
+
+    def _reset_after_fork(self):
+        # Every thread's buffer hangs off the old local, so this drops them all
+        self._local = threading.local()
+
+
+# The process-wide source used throughout the zkp package
+rng = BufferedRandom()
+randbits = rng.randbits
+randbelow = rng.randbelow
+random_scalar = rng.random_scalar
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=rng._reset_after_fork)
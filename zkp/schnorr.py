@@ -0,0 +1,121 @@
+"""
+Schnorr transcript verification, one at a time or in batches.
+
+A transcript (y, t, e, s) is valid when g^s == t * y^e in the group.  Batch
+verification draws a random small exponent r_i per transcript and checks
+the single combined equation
+
+    g^(-sum r_i * s_i) * prod t_i^r_i * y_i^(r_i * e_i) == 1
+
+with one multi-exponentiation.  The combined check fails with probability
+at most 2^-security_bits when any transcript is invalid in the order-q
+subgroup.
+
+None of the groups here has prime order as a whole: Z_p^* and the curve
+have cofactors with small factors, and the random weights cannot cancel a
+small-order component reliably (with order 7, one batch in seven would
+accept it).  Both paths deal with those components the same way, so batch
+and individual verification accept exactly the same transcripts:
+
+- Ed25519 is cofactored: the equation's result is multiplied by 8 before
+  it is compared with the identity, so small-order components of y and t
+  drop out and only is_canonical() is checked.
+- Groups mod p require y and t to lie in the order-q subgroup.  Keys are
+  tested once each (and cached, since they repeat across proofs); every
+  commitment is tested.  For the safe-prime modp-* sets that test is a
+  Jacobi symbol, which is cheap.  The schnorr-* sets need an exponentiation
+  by q per commitment, which is where most of their batch time goes.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from zkp.params import get_params
+from zkp.rng import randbits
+
+
+SchnorrTranscript = namedtuple('SchnorrTranscript', 'public_key commitment challenge response')
+
+BATCH_SECURITY_BITS = 128
+
+# Below this size a failing batch is resolved with individual checks
+_BISECT_LEAF_SIZE = 4
+
+
+@lru_cache(maxsize=4096)
+def _key_in_subgroup(params, y):
+    return params.contains(y)
+
+
+def _elements_ok(params, y, t):
+    """The element checks shared by both paths."""
+    if params.cofactored:
+        return params.is_canonical(y) and params.is_canonical(t)
+    return params.is_canonical(y) and _key_in_subgroup(params, y) and params.contains(t)
+
+
+def _is_identity(params, element):
+    if params.cofactored:
+        element = params.clear_cofactor(element)
+    return element == params.identity()
+
+
+def verify_transcript(transcript, params=None):
+    """Check one transcript with the plain verification equation."""
+    params = get_params(params)
+    y, t, e, s = transcript
+    if not _elements_ok(params, y, t):
+        return False
+    if params.cofactored:
+        return _is_identity(params, params.multi_exp([(y, -e), (t, -1)], s))
+    return params.multi_exp([(y, -e)], s) == t
+
+
+def _combined_check(transcripts, params, security_bits):
+    q = params.q
+    g_exponent = 0
+    key_exponents = {}
+    pairs = []
+    for y, t, e, s in transcripts:
+        r = randbits(security_bits) | 1
+        g_exponent += r * s
+        key_exponents[y] = (key_exponents.get(y, 0) + r * e) % q
+        pairs.append((t, r))
+    pairs.extend(key_exponents.items())
+    return _is_identity(params, params.multi_exp(pairs, -g_exponent))
+
+
+def _bisect(transcripts, indices, params, security_bits):
+    """Return the failing indices of a group whose combined check failed."""
+    if len(indices) <= _BISECT_LEAF_SIZE:
+        return [i for i in indices if not verify_transcript(transcripts[i], params)]
+    failed = []
+    mid = len(indices) // 2
+    for half in (indices[:mid], indices[mid:]):
+        if not _combined_check([transcripts[i] for i in half], params, security_bits):
+            failed.extend(_bisect(transcripts, half, params, security_bits))
+    return failed
+
+
+def batch_verify(transcripts, params=None, security_bits=BATCH_SECURITY_BITS):
+    """
+    Verify many Schnorr transcripts with one combined equation.
+
+    Returns (all_valid, failed_indices).  The combined check runs once; only
+    when it fails is the batch bisected, down to individual checks, to find
+    the transcripts responsible.
+    """
+    params = get_params(params)
+    transcripts = [SchnorrTranscript(*t) for t in transcripts]
+
+    failed = []
+    indices = []
+    for i, (y, t, _, _) in enumerate(transcripts):
+        if _elements_ok(params, y, t):
+            indices.append(i)
+        else:
+            failed.append(i)
+
+    if indices and not _combined_check([transcripts[i] for i in indices], params, security_bits):
+        failed = sorted(failed + _bisect(transcripts, indices, params, security_bits))
+    return not failed, failed
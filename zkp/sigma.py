@@ -0,0 +1,123 @@
+"""
+Shared engine for the interactive Schnorr-style demos.
+
+Every demo proves knowledge of a witness x for the statement y = g^x with
+the same three-move round: the prover commits t = g^k, the verifier sends a
+challenge e, the prover answers s = k + e*x mod q and the verifier checks
+g^s * y^-e == t.  Demos differ only in how they derive x and in the wording
+of their steps, so the round loop lives here once and picks up the nonce
+pool, fixed-base tables and multi-exponentiation from the group.
+"""
+
+from zkp.nonce_pool import commitment_pool
+from zkp.params import get_params
+from zkp.replay import replay_guard
+from zkp.schnorr import SchnorrTranscript, batch_verify
+from zkp.steps import Step
+
+
+# Round values shown by each step code; a code missing here is not emitted
+DEFAULT_ROUND_FIELDS = {
+    'commitment': ('t',),
+    'challenge': ('e',),
+    'response': ('s',),
+    'check': ('left', 'right'),
+}
+
+# The password demo also shows the nonce and modulus and prints t separately
+PASSWORD_ROUND_FIELDS = {
+    'commitment': ('k', 't'),
+    'challenge': ('e',),
+    'response': ('q', 's'),
+    'check': ('s', 'e', 'left'),
+    'expected': ('right',),
+}
+
+
+class SigmaProtocol:
+    """
+    N-round proof of knowledge of x with y = g^x.
+
+    name prefixes the step message codes ('password', 'age', ...) and
+    fields overrides which round values each of them shows.  passed_values
+    are the extra template arguments of the '<name>.passed' message.
+    A round whose commitment the replay guard has already accepted for
+    the same key fails: a reused t means a reused nonce.
+    """
+
+    def __init__(self, name, params=None, rounds=3, fields=None, passed_values=()):
+        self.name = name
+        self.params = get_params(params)
+        self.rounds = rounds
+        self.fields = DEFAULT_ROUND_FIELDS if fields is None else fields
+        self.passed_values = tuple(passed_values)
+        self.pool = commitment_pool(self.params)
+        self.replay = replay_guard()
+
+    def statement(self, witness):
+        """The public value y = g^x for a witness."""
+        return self.params.base_exp(witness)
+
+    def challenge(self):
+        return self.params.random_scalar()
+
+    def round(self, public_key, witness):
+        """Run one round without checking it: (nonce, transcript)."""
+        k, t = self.pool.take()
+        e = self.challenge()
+        s = (k + e * witness) % self.params.q
+        return k, SchnorrTranscript(public_key, t, e, s)
+
+    def check(self, transcript):
+        """The verifier's left-hand side g^s * y^-e, which must equal t."""
+        y, _, e, s = transcript
+        return self.params.multi_exp([(y, -e)], s)
+
+    def _step(self, type, field, values):
+        names = self.fields.get(field)
+        if names is None:
+            return None
+        return Step(type, f'{self.name}.{field}', *(values[n] for n in names))
+
+    def steps(self, public_key, witness, rounds=None):
+        """
+        Run the rounds interactively, yielding a Step for every move.
+        Stops at the first failed round; returns whether all rounds passed.
+        """
+        rounds = self.rounds if rounds is None else rounds
+        for round_num in range(1, rounds + 1):
+            yield Step('round', f'{self.name}.round', round=round_num)
+
+            k, transcript = self.round(public_key, witness)
+            _, t, e, s = transcript
+            values = {'k': k, 't': t, 'e': e, 's': s, 'q': self.params.q}
+            for field in ('commitment', 'challenge', 'response'):
+                step = self._step('step', field, values)
+                if step is not None:
+                    yield step
+
+            values['left'] = left = self.check(transcript)
+            values['right'] = t
+            for field in ('check', 'expected'):
+                step = self._step('verification', field, values)
+                if step is not None:
+                    yield step
+
+            if left != t:
+                yield Step('error', 'round.failed', round=round_num)
+                return False
+            if not self.replay.check_proof(self.params, self.name, public_key, t):
+                yield Step('error', 'round.replayed', round=round_num)
+                return False
+            yield Step('success', f'{self.name}.passed', *self.passed_values, round=round_num)
+
+        return True
+
+    def prove(self, public_key, witness, rounds=None):
+        """All rounds' transcripts, for verifying together with verify()."""
+        rounds = self.rounds if rounds is None else rounds
+        return [self.round(public_key, witness)[1] for _ in range(rounds)]
+
+    def verify(self, transcripts):
+        """Batch-verify transcripts: (all_valid, failed_indices)."""
+        return batch_verify(transcripts, self.params)
@@ -0,0 +1,168 @@
+"""
+Compact protocol step records.
+
+A step is stored as its display type, a message code and the raw values it
+refers to.  Nothing is formatted until a client asks for it: the decimal
+rendering of 2048-bit integers and their JSON encoding cost more than the
+arithmetic, so terse responses skip it entirely.
+
+Verbosity levels used by the API:
+    0 - verdict and summary counters only
+    1 - raw records: type, code, round and values (large integers as hex)
+    2 - records with their formatted human-readable message (the default)
+"""
+
+from time import perf_counter
+
+VERBOSE_SUMMARY = 0
+VERBOSE_RECORDS = 1
+VERBOSE_MESSAGES = 2
+
+# Message templates by code; {0}, {1}... are the step values, {round} its round
+MESSAGES = {
+    'params': '🔧 Public parameters: {0}',
+    'round.failed': '❌ Round {round} FAILED!',
+    'round.replayed': '❌ Round {round} FAILED: proof already seen (replay)',
+
+    'password.user': '👤 User {0}: secret derived from the password and a per-user salt with {1}',
+    'password.public_key': '🔑 Server public key: {0}',
+    'password.round': '🔄 Round {round} - Schnorr Protocol',
+    'password.commitment': '📤 Client commitment: t = g^{0} = {1}',
+    'password.challenge': '🎯 Server challenge: e = {0}',
+    'password.response': '📥 Client response: s = (k + e * secret) mod {0} = {1}',
+    'password.check': '✅ Verification: g^{0} * (public_key)^-{1} = {2}',
+    'password.expected': '🎯 Expected: t = {0}',
+    'password.passed': '✅ Round {round} SUCCESS!',
+
+    'age.intro': '🎂 Age Verification: Proving age >= {0} without revealing exact age',
+    'age.too_young': '❌ Age verification failed: You must be at least {0} years old',
+    'age.committed': '🔐 Age commitment generated (hiding exact age)',
+    'age.round': '🔄 Round {round} - Age Range Proof',
+    'age.commitment': '📤 Prover commitment: C = g^r = {0}',
+    'age.challenge': '🎯 Verifier challenge: e = {0}',
+    'age.response': '📥 Prover response: s = (r + e * age_proof) mod q = {0}',
+    'age.check': '✅ Verification: g^s * commitment^-e = {0}, C = {1}',
+    'age.passed': '✅ Round {round} SUCCESS! Age >= {0} verified',
+
+    'range.intro': '📊 Range Proof: Proving number ∈ [{0}, {1}] without revealing it',
+    'range.invalid_number': '❌ Invalid number provided',
+    'range.out_of_range': '❌ Number not in valid range [{0}, {1}]',
+    'range.unsupported_group': '❌ Range proofs need a prime-order group; {0} is not one',
+    'range.committed': '🔐 Pedersen commitment C = g^v * h^r = {0} (hides the number)',
+    'range.round': '🔄 Round {round} - Range Proof ({0} mode)',
+    'range.bits': '🧩 Bit decomposition: {0} bit commitments per bound, each with an OR-proof that it hides 0 or 1 ({1} bound proofs)',
+    'range.bulletproof': '🪶 Inner-product argument over {0} bits, halved every round instead of one proof per bit ({1} bound proofs)',
+    'range.size': '📦 Proof size: {0} group elements + {1} scalars = {2} bytes',
+    'range.check': '✅ Verification: every proof equation checked in one multi-exponentiation',
+    'range.passed': '✅ Round {round} SUCCESS! Number in range [{0}, {1}] verified',
+
+    'membership.intro': '👥 Membership Proof: Proving membership in a group of {0} members',
+    'membership.invalid_claim': '❌ Invalid member claim',
+    'membership.not_member': '❌ Member not in group',
+    'membership.root': '🌳 Merkle root over {0} member keys: {1}',
+    'membership.leaf': '🔑 Member key y = g^x = {0} at leaf {1} (x stays secret; the key shows which member is proving, the OR mode hides it)',
+    'membership.path': '✅ Authentication path: {0} sibling hashes lead from the leaf to the root',
+    'membership.path_invalid': '❌ Authentication path does not match the Merkle root',
+    'membership.ring': '💍 OR-proof over all {0} member keys: the verifier learns that one secret is known, not whose',
+    'membership.or_proof': '🎭 Simulated {0} transcripts and answered one for real; the challenges sum to the hash of all commitments',
+    'membership.or_size': '📦 Proof size: {0} group elements + {1} scalars = {2} bytes',
+    'membership.or_check': '✅ Verification: challenge sum checked, {0} Schnorr equations in one multi-exponentiation',
+    'membership.round': '🔄 Round {round} - Membership Proof Protocol',
+    'membership.commitment': '📤 Commitment: C = g^r = {0}',
+    'membership.challenge': '🎯 Challenge: e = {0}',
+    'membership.response': '📥 Response: s = (r + e * x) mod q = {0}',
+    'membership.check': '✅ Verification: g^s * y^-e = {0}, C = {1}',
+    'membership.passed': '✅ Round {round} SUCCESS! Group membership verified',
+}
+
+# Integers wider than a JavaScript double's mantissa are sent as hex strings
+_MAX_JSON_INT_BITS = 53
+
+
+def wire_value(value):
+    """JSON-friendly form of a raw step value, without decimal formatting."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value.bit_length() <= _MAX_JSON_INT_BITS else hex(value)
+    if isinstance(value, (str, bool, list, tuple)) or value is None:
+        return value
+    return str(value)
+
+
+class Step:
+    """One protocol step: display type, message code, raw values and round."""
+
+    __slots__ = ('type', 'code', 'values', 'round')
+
+    def __init__(self, type, code, *values, round=None):
+        self.type = type
+        self.code = code
+        self.values = values
+        self.round = round
+
+    def message(self):
+        return MESSAGES[self.code].format(*self.values, round=self.round)
+
+    def render(self, verbose=VERBOSE_MESSAGES):
+        """The step as a JSON-ready dict at the requested verbosity (1 or 2)."""
+        record = {'type': self.type}
+        if self.round is not None:
+            record['round'] = self.round
+        if verbose >= VERBOSE_MESSAGES:
+            record['message'] = self.message()
+        else:
+            record['code'] = self.code
+            record['values'] = [wire_value(v) for v in self.values]
+        return record
+
+    def __repr__(self):
+        return f'Step({self.type!r}, {self.code!r}, round={self.round})'
+
+
+def new_summary():
+    return {'steps': 0, 'rounds': 0, 'rounds_passed': 0}
+
+
+def render_steps(step_iter, summary, verbose=VERBOSE_MESSAGES, timings=None):
+    """
+    Yield each step rendered at the given verbosity while updating the
+    summary counters; at verbosity 0 nothing is rendered or yielded.
+    The generator's return value is the protocol's verdict.
+
+    If a timings dict is given, the seconds spent producing steps and
+    rendering them are added to its 'compute' and 'format' entries.
+    """
+    while True:
+        if timings is not None:
+            start = perf_counter()
+        try:
+            step = next(step_iter)
+        except StopIteration as stop:
+            if timings is not None:
+                timings['compute'] = timings.get('compute', 0.0) + perf_counter() - start
+            return stop.value
+        if timings is not None:
+            produced = perf_counter()
+            timings['compute'] = timings.get('compute', 0.0) + produced - start
+
+        summary['steps'] += 1
+        if step.type == 'round':
+            summary['rounds'] += 1
+        elif step.type == 'success':
+            summary['rounds_passed'] += 1
+        if verbose:
+            record = step.render(verbose)
+            if timings is not None:
+                timings['format'] = timings.get('format', 0.0) + perf_counter() - produced
+            yield record
+
+
+def drain_steps(step_iter, verbose=VERBOSE_MESSAGES, timings=None):
+    """Run a step generator to completion: (success, rendered steps, summary)."""
+    summary = new_summary()
+    rendered = render_steps(step_iter, summary, verbose, timings)
+    steps = []
+    while True:
+        try:
+            steps.append(next(rendered))
+        except StopIteration as stop:
+            return stop.value, steps, summary